@@ -0,0 +1,181 @@
+"""
+Gerador de árvores de projeto sintéticas para os benchmarks (e testes de carga).
+
+    <raiz>/3 Desenvolvimento/<disciplina>/1.ENTREGAS/
+        P-PETER_BAL-991-OAE-ARQ-EX-DTE-G.001-IMP-TER-LAY-PTB-R00.pdf … -R20.pdf
+        … modelos .rvt grandes, nomes fora do padrão …
+        AP/1.AP - Entrega-1-OBSOLETO, …   PE/2.PE - Entrega-1, …
+
+Os nomes seguem o esquema do nomenclaturas.json (N° DOCUMENTO sequencial, demais
+campos sorteados); uma fração recebe um token inválido ou perde a revisão. Cada
+documento tem uma cadeia de revisões R00…Rnn, todas presentes na 1.ENTREGAS, e o
+histórico de entregas AP/PE é feito pelo fluxo real (processar_entrega_arquivos_tipo):
+a entrega k leva a revisão k de cada documento (ou a última, se a cadeia for menor).
+Tudo é determinístico pela semente.
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import entrega
+
+NOMENCLATURAS_JSON = os.path.join(os.path.dirname(__file__), "..", "nomenclaturas.json")
+
+
+@dataclass
+class Disciplina:
+    nome: str
+    pasta_entregas: Path
+    # documento (nome sem revisão e extensão) → caminhos das revisões, em ordem
+    cadeias: dict[str, list[Path]] = field(default_factory=dict)
+    invalidos: list[Path] = field(default_factory=list)
+    entregas: list[Path] = field(default_factory=list)
+
+    def arquivos(self) -> list[Path]:
+        return [p for cadeia in self.cadeias.values() for p in cadeia] + self.invalidos
+
+    def ultimas(self) -> list[Path]:
+        return [cadeia[-1] for cadeia in self.cadeias.values()]
+
+
+@dataclass
+class ProjetoSintetico:
+    raiz: Path
+    esquema: dict
+    disciplinas: list[Disciplina]
+
+    def resumo(self) -> dict:
+        arquivos = [p for d in self.disciplinas for p in d.arquivos()]
+        return {
+            "disciplinas": len(self.disciplinas),
+            "documentos": sum(len(d.cadeias) for d in self.disciplinas),
+            "arquivos": len(arquivos),
+            "invalidos": sum(len(d.invalidos) for d in self.disciplinas),
+            "entregas": sum(len(d.entregas) for d in self.disciplinas),
+            "bytes": sum(p.stat().st_size for p in arquivos),
+        }
+
+
+def carregar_esquema(projeto: str = "991", caminho: str = NOMENCLATURAS_JSON) -> dict:
+    with open(caminho, encoding="utf-8") as f:
+        return json.load(f)[projeto]
+
+
+def _valores(campo: dict) -> list[str]:
+    return [f["value"] if isinstance(f, dict) else str(f) for f in campo.get("valores_fixos", [])]
+
+
+def _nome_documento(campos: list[dict], sigla: str, numero: int, rnd: random.Random,
+                    invalido: bool) -> str:
+    partes = []
+    errado = rnd.randrange(len(campos)) if invalido else -1
+    for i, c in enumerate(campos):
+        if i == errado:
+            val = "ERRO"
+        elif c["nome"] == "SIGLA DISCIPLINA":
+            val = sigla
+        elif c["nome"] == "N° DOCUMENTO":
+            val = f"{numero:03d}"
+        else:
+            val = rnd.choice(_valores(c) or ["X"])
+        partes.append(val)
+        partes.append(c.get("separador") or "-")
+    return "".join(partes)
+
+
+def gerar_projeto(
+    raiz: Path,
+    esquema: dict,
+    disciplinas: int = 3,
+    documentos: int = 300,
+    max_revisoes: int = 20,
+    taxa_invalidos: float = 0.05,
+    modelos: int = 5,
+    tamanho_pdf_kb: tuple[int, int] = (4, 64),
+    tamanho_modelo_kb: int = 2048,
+    entregas_ap: int = 3,
+    entregas_pe: int = 2,
+    semente: int = 42,
+) -> ProjetoSintetico:
+    """
+    documentos: por disciplina (PDFs pequenos, cadeias de 1 a max_revisoes+1 revisões);
+    modelos: documentos .rvt de tamanho_modelo_kb por disciplina (cadeias de até 3 revisões);
+    entregas_ap/entregas_pe: entregas feitas em cada disciplina, nessa ordem.
+    """
+    rnd = random.Random(semente)
+    raiz = Path(raiz)
+    campos = [c for c in esquema["campos"] if c.get("nome") != "REVISÃO_ESPECIAL"]
+    siglas = next((_valores(c) for c in campos if c["nome"] == "SIGLA DISCIPLINA"), ["DISC"])
+    projeto = ProjetoSintetico(raiz, esquema, [])
+
+    for d in range(disciplinas):
+        sigla = siglas[d % len(siglas)]
+        nome_disc = sigla if d < len(siglas) else f"{sigla}-{d}"
+        pasta = raiz / entrega.PASTA_DISCIPLINAS / nome_disc / entrega.PASTA_ENTREGAS
+        pasta.mkdir(parents=True)
+        disc = Disciplina(nome_disc, pasta)
+
+        for i in range(documentos + modelos):
+            modelo = i >= documentos
+            invalido = rnd.random() < taxa_invalidos
+            base = _nome_documento(campos, sigla, i + 1, rnd, invalido)
+            ext = ".rvt" if modelo else ".pdf"
+            if not modelo and rnd.random() < taxa_invalidos:
+                # sem revisão no nome: fica fora das cadeias
+                p = pasta / (base.rstrip("-.") + ext)
+                p.write_bytes(rnd.randbytes(rnd.randint(*tamanho_pdf_kb) * 1024))
+                disc.invalidos.append(p)
+                continue
+            n_rev = rnd.randint(1, 3 if modelo else max_revisoes + 1)
+            cadeia = []
+            for r in range(n_rev):
+                p = pasta / f"{base}R{r:02d}{ext}"
+                tamanho = tamanho_modelo_kb if modelo else rnd.randint(*tamanho_pdf_kb)
+                p.write_bytes(rnd.randbytes(tamanho * 1024))
+                cadeia.append(p)
+            (disc.invalidos if invalido else disc.cadeias.setdefault(base, [])).extend(cadeia)
+
+        projeto.disciplinas.append(disc)
+        gerar_historico(disc, entregas_ap, entregas_pe)
+    return projeto
+
+
+def gerar_historico(disc: Disciplina, entregas_ap: int, entregas_pe: int,
+                    inicio: int = 0) -> None:
+    """Entregas AP e depois PE; a entrega k leva a revisão min(k, última) de cada documento."""
+    for k, tipo in enumerate(["AP"] * entregas_ap + ["PE"] * entregas_pe, start=inicio):
+        arquivos = [cadeia[min(k, len(cadeia) - 1)] for cadeia in disc.cadeias.values()]
+        disc.entregas.append(entrega.processar_entrega_arquivos_tipo(arquivos, disc.pasta_entregas, tipo))
+
+
+def isolar_caches(pasta: Path, template: Optional[Path] = None) -> None:
+    """
+    Catálogo, índices e pré-cálculos locais (~/.oae_eng) apontados para `pasta`, para o
+    benchmark não misturar dados com os do usuário. Sem o GRD_template.xlsx do repositório,
+    um template mínimo é criado em `pasta`.
+    """
+    from openpyxl import Workbook
+    from utils import hash_cache, indice_projeto, precalculo
+
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+    entrega.CATALOGO_DB = str(pasta / "catalogo_entregas.sqlite3")
+    indice_projeto.PASTA_INDICES = pasta / "indices"
+    precalculo.PASTA_PRECALCULO = pasta / "precalculo"
+    hash_cache.PASTA_CACHE_LOCAL = pasta / "cache_hashes"
+    if template is None and not entrega.TEMPLATE_XLSX.exists():
+        template = pasta / "GRD_template.xlsx"
+        wb = Workbook()
+        ws = wb.active
+        ws["A3"] = "Gerado em"
+        ws["A5"] = "Grupo"
+        ws["B5"] = "Extens."
+        wb.save(template)
+    if template is not None:
+        entrega.TEMPLATE_XLSX = Path(template)
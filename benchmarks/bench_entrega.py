@@ -0,0 +1,183 @@
+"""
+Benchmark dos caminhos quentes da entrega numa árvore de projeto sintética
+(benchmarks/arvore_sintetica.py), com resultado em JSON para comparar execuções.
+
+    python benchmarks/bench_entrega.py --saida bench_entrega.json
+    python benchmarks/bench_entrega.py --documentos 1000 --base bench_entrega.json
+
+Mede: listar_arquivos_no_diretorio, verificar_tokens, identificar_revisoes,
+comparar_arquivos, processar_entrega_arquivos_tipo (normal e deduplicada) e
+criar_arquivo_controle (completo e incremental). Cada medida é o melhor de
+--repeticoes; com --base, imprime a razão contra um JSON de uma execução anterior.
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from arvore_sintetica import carregar_esquema, gerar_projeto, isolar_caches, NOMENCLATURAS_JSON
+from utils import entrega, hash_cache
+from utils.comparacao import ComparadorArquivos, MODOS, MODO_PADRAO
+from utils.file_operations import listar_arquivos_no_diretorio
+from utils.nomenclatura import tokenizar
+
+
+def cronometrar(func, repeticoes: int, preparar=None) -> dict:
+    """Melhor e média de `repeticoes` chamadas; preparar() roda antes de cada uma, fora do tempo."""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar:
+            preparar()
+        t0 = time.perf_counter()
+        func()
+        tempos.append(time.perf_counter() - t0)
+    return {"segundos": round(min(tempos), 6), "media": round(sum(tempos) / len(tempos), 6),
+            "repeticoes": repeticoes}
+
+
+def _versao_git() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def executar(args, raiz: Path) -> dict:
+    isolar_caches(raiz / "_caches")
+    esquema = carregar_esquema(args.projeto, args.json)
+
+    t0 = time.perf_counter()
+    projeto = gerar_projeto(raiz / "projeto", esquema, disciplinas=args.disciplinas,
+                            documentos=args.documentos, max_revisoes=args.max_revisoes,
+                            modelos=args.modelos, tamanho_modelo_kb=args.tamanho_modelo_kb,
+                            entregas_ap=args.entregas_ap, entregas_pe=args.entregas_pe, semente=args.semente)
+    geracao = time.perf_counter() - t0
+    disc = projeto.disciplinas[0]
+    nomes = [p.name for d in projeto.disciplinas for p in d.arquivos()]
+    lista = [{"Nome do Arquivo": n} for n in nomes]
+    rep = args.repeticoes
+    medidas: dict[str, dict] = {}
+
+    def medir(nome, func, itens, preparar=None):
+        m = cronometrar(func, rep, preparar)
+        m["itens"] = itens
+        m["itens_por_s"] = round(itens / m["segundos"], 1) if m["segundos"] else None
+        medidas[nome] = m
+        print(f"{nome:<36}{m['segundos']:10.4f} s{m['itens_por_s'] or 0:14.1f} itens/s", file=sys.stderr)
+
+    n_disc = len(disc.arquivos())
+    medir("listar_arquivos_no_diretorio", lambda: listar_arquivos_no_diretorio(str(disc.pasta_entregas)),
+          n_disc)
+    medir("verificar_tokens",
+          lambda: [entrega.verificar_tokens(tokenizar(os.path.splitext(n)[0]), esquema) for n in nomes],
+          len(nomes))
+    medir("identificar_revisoes", lambda: entrega.identificar_revisoes(lista), len(lista))
+
+    # duas últimas entregas AP da primeira disciplina (a anterior já renomeada -OBSOLETO),
+    # pelo número da entrega como em _listar_entregas_tipo (Entrega-10 vem depois de Entrega-9)
+    ap = sorted((p for p in (disc.pasta_entregas / "AP").iterdir() if entrega.ENTREGA_ANTERIOR_RE.match(p.name)),
+                key=lambda p: int(entrega.ENTREGA_ANTERIOR_RE.match(p.name).group(2)))
+    nova, anterior = ap[-1], ap[-2] if len(ap) > 1 else None
+    n_comp = len(list(nova.iterdir()))
+    # sem o cache de hashes a cada repetição: a entrega acabou de calcular os hashes dessas pastas
+    medir("comparar_arquivos", lambda: entrega.comparar_arquivos(nova, anterior, ComparadorArquivos(args.comparacao)),
+          n_comp, preparar=lambda: _limpar_cache_hashes(disc.pasta_entregas))
+
+    ultimas = disc.ultimas()
+    medir("processar_entrega_arquivos_tipo",
+          lambda: entrega.processar_entrega_arquivos_tipo(ultimas, disc.pasta_entregas, "PE"), len(ultimas))
+    medir("processar_entrega_dedup",
+          lambda: entrega.processar_entrega_arquivos_tipo(ultimas, disc.pasta_entregas, "PE", dedup=True,
+                                                          comparador=ComparadorArquivos(args.comparacao)),
+          len(ultimas))
+
+    grd = disc.pasta_entregas / "GRD.xlsx"
+    medir("criar_arquivo_controle_completo", lambda: entrega.criar_arquivo_controle(disc.pasta_entregas, completo=True),
+          len(list(entrega.iterar_historico(disc.pasta_entregas))))
+    # incremental: a GRD sem a última coluna é refeita fora do tempo antes de cada medida
+    medir("criar_arquivo_controle_incremental", lambda: entrega.criar_arquivo_controle(disc.pasta_entregas),
+          len(ultimas), preparar=lambda: _grd_sem_ultima_coluna(grd))
+
+    return {
+        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "versao": _versao_git(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("saida", "base", "json", "pasta")},
+        "arvore": {**projeto.resumo(), "segundos_geracao": round(geracao, 3)},
+        "medidas": medidas,
+    }
+
+
+def _limpar_cache_hashes(pasta_entregas: Path) -> None:
+    with hash_cache._caches_lock:
+        hash_cache._caches.clear()
+    (pasta_entregas / hash_cache.CACHE_HASHES_NOME).unlink(missing_ok=True)
+
+
+def _grd_sem_ultima_coluna(grd: Path) -> None:
+    from openpyxl import load_workbook
+    wb = load_workbook(grd)
+    ws = wb.active
+    col = entrega.GRD_COL_INICIO + entrega._colunas_entrega_preenchidas(ws) - 1
+    ws.delete_cols(col)
+    wb.save(grd)
+
+
+def comparar_com_base(atual: dict, caminho_base: str) -> None:
+    with open(caminho_base, encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\ncontra {caminho_base} ({base.get('versao')}, {base.get('data')}):", file=sys.stderr)
+    for nome, m in atual["medidas"].items():
+        b = base.get("medidas", {}).get(nome)
+        if b and m["segundos"]:
+            print(f"{nome:<36}{b['segundos']:10.4f} ➜ {m['segundos']:8.4f} s  x{b['segundos'] / m['segundos']:.2f}",
+                  file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark dos caminhos quentes da entrega.")
+    ap.add_argument("--projeto", default="991", help="esquema do nomenclaturas.json usado nos nomes")
+    ap.add_argument("--json", default=NOMENCLATURAS_JSON)
+    ap.add_argument("--disciplinas", type=int, default=3)
+    ap.add_argument("--documentos", type=int, default=300, help="documentos (PDF) por disciplina")
+    ap.add_argument("--max-revisoes", type=int, default=20)
+    ap.add_argument("--modelos", type=int, default=5, help="modelos .rvt grandes por disciplina")
+    ap.add_argument("--tamanho-modelo-kb", type=int, default=2048)
+    ap.add_argument("--entregas-ap", type=int, default=3)
+    ap.add_argument("--entregas-pe", type=int, default=2)
+    ap.add_argument("--comparacao", choices=MODOS, default=MODO_PADRAO)
+    ap.add_argument("--repeticoes", type=int, default=3)
+    ap.add_argument("--semente", type=int, default=42)
+    ap.add_argument("--pasta", help="gera a árvore aqui (padrão: pasta temporária, apagada no fim)")
+    ap.add_argument("--saida", default="bench_entrega.json", help="arquivo JSON do resultado")
+    ap.add_argument("--base", help="JSON de uma execução anterior para comparar")
+    args = ap.parse_args(argv)
+
+    if args.pasta:
+        Path(args.pasta).mkdir(parents=True, exist_ok=False)
+        resultado = executar(args, Path(args.pasta))
+    else:
+        with tempfile.TemporaryDirectory(prefix="bench_entrega_") as tmp:
+            resultado = executar(args, Path(tmp))
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"resultado gravado em {args.saida}", file=sys.stderr)
+    if args.base:
+        comparar_com_base(resultado, args.base)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Compara o loop sequencial antigo (MD5, buffer de 8 KB, um arquivo por vez)
+com o motor paralelo de utils.hashing em uma árvore sintética.
+
+    python benchmarks/bench_hashing.py --arquivos 400 --tamanho-kb 512
+    python benchmarks/bench_hashing.py --latencia-ms 2   # simula drive de rede
+
+Com --latencia-ms cada leitura espera o tempo indicado antes de retornar,
+imitando o round-trip de um drive compartilhado.
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.hashing import calcular_hashes, HASH_BUFFER
+
+
+class _ArquivoLento:
+    def __init__(self, f, latencia: float):
+        self._f = f
+        self._latencia = latencia
+
+    def read(self, n=-1):
+        time.sleep(self._latencia)
+        return self._f.read(n)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._f.close()
+
+
+def simular_latencia(latencia_ms: float):
+    abrir_original = Path.open
+
+    def abrir_lento(self, *args, **kwargs):
+        return _ArquivoLento(abrir_original(self, *args, **kwargs), latencia_ms / 1000)
+
+    Path.open = abrir_lento
+
+
+def gerar_arvore(raiz: Path, n_arquivos: int, tamanho_kb: int) -> list[Path]:
+    caminhos = []
+    for i in range(n_arquivos):
+        pasta = raiz / f"DISC-{i % 10:02d}"
+        pasta.mkdir(exist_ok=True)
+        p = pasta / f"P-CLI-999-OAE-ARQ-EX-DTE-G.{i:03d}-IMP-TER-LAY-PTB-R01.pdf"
+        p.write_bytes(os.urandom(tamanho_kb * 1024))
+        caminhos.append(p)
+    return caminhos
+
+
+def loop_sequencial(caminhos: list[Path]) -> dict[Path, str]:
+    res = {}
+    for path in caminhos:
+        h = hashlib.md5()
+        with path.open("rb") as f:
+            while chunk := f.read(8192):
+                h.update(chunk)
+        res[path] = h.hexdigest()
+    return res
+
+
+def cronometrar(func, repeticoes: int) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - t0)
+    return melhor
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--arquivos", type=int, default=400)
+    ap.add_argument("--tamanho-kb", type=int, default=512)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    ap.add_argument("--buffer-kb", type=int, default=HASH_BUFFER // 1024)
+    ap.add_argument("--repeticoes", type=int, default=3)
+    ap.add_argument("--latencia-ms", type=float, default=0.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminhos = gerar_arvore(Path(tmp), args.arquivos, args.tamanho_kb)
+        if args.latencia_ms:
+            simular_latencia(args.latencia_ms)
+        total_mb = args.arquivos * args.tamanho_kb / 1024
+
+        base = cronometrar(lambda: loop_sequencial(caminhos), args.repeticoes)
+        print(f"{args.arquivos} arquivos, {total_mb:.1f} MB, latência {args.latencia_ms} ms/leitura")
+        print(f"{'sequencial (8 KB)':<24}{base:8.3f} s{total_mb / base:10.1f} MB/s")
+        for w in args.workers:
+            t = cronometrar(
+                lambda: dict(calcular_hashes(caminhos, max_workers=w,
+                                             buf=args.buffer_kb * 1024, usar_cache=False)),
+                args.repeticoes,
+            )
+            print(f"{f'paralelo ({w} workers)':<24}{t:8.3f} s{total_mb / t:10.1f} MB/s  x{base / t:.2f}")
+
+
+if __name__ == "__main__":
+    main()
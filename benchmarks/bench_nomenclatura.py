@@ -0,0 +1,98 @@
+"""
+Compara a validação de nomenclatura anterior (verificar_tokens refazendo a lista
+de tokens esperados a cada arquivo) com o validador compilado de utils.nomenclatura,
+em nomes gerados a partir do esquema do nomenclaturas.json.
+
+    python benchmarks/bench_nomenclatura.py --nomes 50000 --projeto 991
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.nomenclatura import compilar_nomenclatura, STATUS_TOKEN, tokenizar
+
+
+def verificar_tokens_anterior(tokens, nomenclatura):
+    # cópia da implementação anterior de ui.telas.verificar_tokens, usada como referência
+    if not nomenclatura or "campos" not in nomenclatura:
+        return ["mismatch"] * len(tokens)
+    campos_cfg = nomenclatura["campos"]
+    tokens_esperados = []
+    for idx, cinfo in enumerate(campos_cfg):
+        tokens_esperados.append(("campo", cinfo))
+        if idx < len(campos_cfg) - 1:
+            tokens_esperados.append(("sep", cinfo.get("separador", "-")))
+    result_tags = []
+    idx_exp = idx_tok = 0
+    while idx_tok < len(tokens) and idx_exp < len(tokens_esperados):
+        t = tokens[idx_tok]
+        tipo_esp, conteudo_esp = tokens_esperados[idx_exp]
+        if tipo_esp == "sep":
+            result_tags.append("ok" if t == conteudo_esp else "mismatch")
+        else:
+            fixos = conteudo_esp.get("valores_fixos", [])
+            if conteudo_esp.get("tipo", "Fixo") == "Fixo" and fixos:
+                permitidos = [f.get("value", "") if isinstance(f, dict) else str(f) for f in fixos]
+                result_tags.append("mismatch" if permitidos and t not in permitidos else "ok")
+            else:
+                result_tags.append("ok")
+        idx_tok += 1
+        idx_exp += 1
+    result_tags += ["mismatch"] * (len(tokens) - idx_tok)
+    result_tags += ["missing"] * (len(tokens_esperados) - idx_exp)
+    return result_tags
+
+
+def gerar_nomes(esquema: dict, n: int, semente: int = 42) -> list[str]:
+    rnd = random.Random(semente)
+    campos = [c for c in esquema["campos"] if c.get("nome") != "REVISÃO_ESPECIAL"]
+    nomes = []
+    for _ in range(n):
+        partes = []
+        for i, c in enumerate(campos):
+            fixos = [f["value"] if isinstance(f, dict) else str(f) for f in c.get("valores_fixos", [])]
+            val = rnd.choice(fixos) if fixos else "X"
+            if rnd.random() < 0.03:
+                val = "ERRO"
+            partes.append(val)
+            partes.append(c.get("separador", "-"))
+        nome = "".join(partes) + f"R{rnd.randint(0, 20):02d}"
+        if rnd.random() < 0.05:
+            nome = nome.rsplit("-", 2)[0]
+        nomes.append(nome + rnd.choice([".pdf", ".dwg", ".rvt"]))
+    return nomes
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--nomes", type=int, default=50_000)
+    ap.add_argument("--projeto", default="991")
+    ap.add_argument("--json", default=os.path.join(os.path.dirname(__file__), "..", "nomenclaturas.json"))
+    args = ap.parse_args()
+
+    with open(args.json, encoding="utf-8") as f:
+        esquema = json.load(f)[args.projeto]
+    nomes = gerar_nomes(esquema, args.nomes)
+
+    t0 = time.perf_counter()
+    anterior = [verificar_tokens_anterior(tokenizar(os.path.splitext(n)[0]), esquema) for n in nomes]
+    t_ant = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    validador = compilar_nomenclatura(esquema)
+    lote = validador.validar_lote(nomes)
+    t_lote = time.perf_counter() - t0
+
+    iguais = all([STATUS_TOKEN[c] for c in cod] == ant for cod, ant in zip(lote, anterior))
+    print(f"{args.nomes} nomes (projeto {args.projeto}) – resultados idênticos: {iguais}")
+    print(f"{'verificar_tokens anterior':<28}{t_ant:8.3f} s")
+    print(f"{'validar_lote compilado':<28}{t_lote:8.3f} s  x{t_ant / t_lote:.1f}")
+
+
+if __name__ == "__main__":
+    main()
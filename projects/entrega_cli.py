@@ -0,0 +1,101 @@
+"""
+Entrega sem interface gráfica (não importa tkinter), para lotes agendados.
+
+    python projects/entrega_cli.py --projeto 991 --disciplina "ARQ" --arquivos "*.pdf" --tipo AP
+
+Roda o mesmo fluxo das telas: nomenclatura ➜ revisões ➜ entrega ➜ GRD, e imprime
+no stdout um JSON com o resultado (o log vai para o stderr e para debug_entregas.log).
+
+Códigos de saída: 0 ok, 1 erro, 2 nomenclatura fora do padrão, 3 nenhum arquivo.
+"""
+import os
+import sys
+import json
+import glob
+import logging
+import argparse
+from pathlib import Path
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import entrega
+from utils.comparacao import MODOS, MODO_PADRAO, ALGORITMO_PADRAO, configurar_comparacao
+from utils import instrumentacao
+
+SAIDA_OK, SAIDA_ERRO, SAIDA_NOMENCLATURA, SAIDA_SEM_ARQUIVOS = 0, 1, 2, 3
+
+
+def _argumentos(argv=None):
+    ap = argparse.ArgumentParser(description="Entrega de arquivos sem interface gráfica.")
+    ap.add_argument("--projeto", required=True, help="número do projeto")
+    ap.add_argument("--disciplina", required=True,
+                    help="pasta da disciplina em '3 Desenvolvimento' (ou caminho da pasta)")
+    ap.add_argument("--arquivos", required=True, action="append",
+                    help="glob dos arquivos, relativo à pasta 1.ENTREGAS (pode repetir)")
+    ap.add_argument("--tipo", required=True, choices=("AP", "PE"))
+    ap.add_argument("--caminho-projeto", help="pasta do projeto (padrão: diretorios_projetos.json)")
+    ap.add_argument("--regras", help="JSON de nomenclaturas (padrão: o do drive compartilhado)")
+    ap.add_argument("--dedup", action="store_true", help="vincular arquivos inalterados")
+    ap.add_argument("--comparacao", choices=MODOS,
+                    help=f"rapido: tamanho + amostra; paranoico: confirma com o hash completo (padrão: {MODO_PADRAO}). "
+                         "O --dedup só vincula arquivos confirmados pelo hash completo, em qualquer modo")
+    ap.add_argument("--algoritmo", help=f"hash da comparação: md5, blake2b, sha256… (padrão: {ALGORITMO_PADRAO})")
+    ap.add_argument("--forcar", action="store_true", help="entregar mesmo com nomenclatura fora do padrão")
+    ap.add_argument("--simular", action="store_true", help="só valida e separa revisões")
+    ap.add_argument("--instrumentar", nargs="?", const=str(instrumentacao.ARQUIVO_PADRAO), metavar="ARQUIVO",
+                    help=f"mede tempo e I/O por etapa; grava uma linha JSON por entrega (padrão: "
+                         f"{instrumentacao.ARQUIVO_PADRAO})")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    return ap.parse_args(argv)
+
+
+def _pasta_entregas(args) -> Path:
+    pasta_disc = Path(args.disciplina)
+    if not pasta_disc.is_dir():
+        caminho_proj = args.caminho_projeto or entrega.carregar_diretorios_projetos()[str(args.projeto)]
+        pasta_disc = Path(caminho_proj) / entrega.PASTA_DISCIPLINAS / args.disciplina
+    nome = entrega.localizar_pasta_entregas(pasta_disc)
+    if not nome:
+        raise FileNotFoundError(f"Pasta {entrega.PASTA_ENTREGAS} não encontrada em {pasta_disc}")
+    return pasta_disc / nome
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        datefmt="%d/%m/%Y %H:%M:%S",
+        handlers=[logging.FileHandler("debug_entregas.log", encoding="utf-8"),
+                  logging.StreamHandler(sys.stderr)],
+    )
+    if args.regras:
+        entrega.NOMENCLATURA_REGRAS_JSON = args.regras
+    try:
+        configurar_comparacao(args.comparacao, args.algoritmo)
+        if args.instrumentar:
+            instrumentacao.ativar(args.instrumentar)
+        pasta_entregas = _pasta_entregas(args)
+        caminhos = []
+        for padrao in args.arquivos:
+            base = padrao if os.path.isabs(padrao) else os.path.join(glob.escape(str(pasta_entregas)), padrao)
+            caminhos.extend(p for p in sorted(glob.glob(base)) if os.path.isfile(p))
+        caminhos = list(dict.fromkeys(caminhos))
+        if not caminhos:
+            print(json.dumps({"ok": False, "erro": "sem_arquivos", "pasta_entregas": str(pasta_entregas)},
+                             ensure_ascii=False))
+            return SAIDA_SEM_ARQUIVOS
+        resumo = entrega.executar_entrega(args.projeto, pasta_entregas, caminhos, args.tipo,
+                                          dedup=args.dedup, forcar=args.forcar, simular=args.simular)
+    except Exception as e:
+        logging.exception("Falha na entrega")
+        print(json.dumps({"ok": False, "erro": type(e).__name__, "mensagem": str(e)}, ensure_ascii=False))
+        return SAIDA_ERRO
+
+    print(json.dumps(resumo, ensure_ascii=False))
+    if resumo.get("erro") == "nomenclatura":
+        return SAIDA_NOMENCLATURA
+    return SAIDA_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
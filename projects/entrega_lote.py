@@ -0,0 +1,76 @@
+"""
+Entrega em lote de várias disciplinas/projetos (fechamento do mês), sem interface gráfica.
+
+    python projects/entrega_lote.py --projetos 991 992 --arquivos "*.pdf" --tipo PE --processos 4 --io 2
+
+Sem --projetos, todos os projetos de diretorios_projetos.json entram no lote.
+Cada disciplina com pasta 1.ENTREGAS e arquivos no glob vira uma tarefa; tarefas da
+mesma 1.ENTREGAS rodam em sequência. Imprime o relatório agregado em JSON no stdout.
+
+Código de saída: 0 se todas as tarefas deram certo, 1 se alguma falhou.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import entrega
+from utils.comparacao import MODOS, MODO_PADRAO, ALGORITMO_PADRAO, configurar_comparacao
+from utils import instrumentacao
+from utils.lote import planejar_lote, executar_lote, LOTE_PROCESSOS, LOTE_LIMITE_IO
+
+
+def _argumentos(argv=None):
+    ap = argparse.ArgumentParser(description="Entrega em lote de várias disciplinas.")
+    ap.add_argument("--projetos", nargs="*", help="números dos projetos (padrão: todos)")
+    ap.add_argument("--projetos-json", default=entrega.PROJETOS_JSON,
+                    help="JSON número → pasta do projeto")
+    ap.add_argument("--disciplinas", nargs="*", help="só estas disciplinas")
+    ap.add_argument("--arquivos", required=True, action="append",
+                    help="glob dos arquivos, relativo à pasta 1.ENTREGAS (pode repetir)")
+    ap.add_argument("--tipo", required=True, choices=("AP", "PE"))
+    ap.add_argument("--processos", type=int, default=LOTE_PROCESSOS)
+    ap.add_argument("--io", type=int, default=LOTE_LIMITE_IO, help="cópias simultâneas no lote todo")
+    ap.add_argument("--regras", help="JSON de nomenclaturas (padrão: o do drive compartilhado)")
+    ap.add_argument("--relatorio", help="grava o relatório JSON também neste arquivo")
+    ap.add_argument("--dedup", action="store_true")
+    ap.add_argument("--comparacao", choices=MODOS, help=f"comparação de arquivos (padrão: {MODO_PADRAO}; o --dedup sempre confirma pelo hash completo)")
+    ap.add_argument("--algoritmo", help=f"hash da comparação (padrão: {ALGORITMO_PADRAO})")
+    ap.add_argument("--instrumentar", nargs="?", const=str(instrumentacao.ARQUIVO_PADRAO), metavar="ARQUIVO",
+                    help="mede tempo e I/O por etapa; uma linha JSON por entrega, de todos os processos")
+    ap.add_argument("--forcar", action="store_true")
+    ap.add_argument("--simular", action="store_true")
+    return ap.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[logging.StreamHandler(sys.stderr)])
+
+    configurar_comparacao(args.comparacao, args.algoritmo)  # algoritmo inválido falha antes do lote
+    projetos = entrega.carregar_diretorios_projetos(args.projetos_json)
+    if args.projetos:
+        faltando = [p for p in args.projetos if p not in projetos]
+        if faltando:
+            logging.warning("Projetos fora de %s: %s", args.projetos_json, ", ".join(faltando))
+        projetos = {p: projetos[p] for p in args.projetos if p in projetos}
+
+    tarefas = planejar_lote(projetos, args.arquivos, args.tipo, args.disciplinas,
+                            dedup=args.dedup, forcar=args.forcar, simular=args.simular)
+    relatorio = executar_lote(tarefas, max_processos=args.processos, limite_io=args.io, regras=args.regras,
+                              comparacao=args.comparacao, algoritmo=args.algoritmo,
+                              instrumentar=args.instrumentar)
+
+    saida = json.dumps(relatorio, ensure_ascii=False)
+    if args.relatorio:
+        with open(args.relatorio, "w", encoding="utf-8") as f:
+            f.write(saida)
+    print(saida)
+    return 0 if relatorio["falhas"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
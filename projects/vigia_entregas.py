@@ -0,0 +1,67 @@
+"""
+Vigia opcional das pastas 1.ENTREGAS: pré-calcula hashes, validação de nomenclatura
+e revisões enquanto os arquivos chegam, para a entrega encontrar tudo pronto.
+
+    python projects/vigia_entregas.py --projetos 991 992
+    python projects/vigia_entregas.py --pastas "D:/991/3 Desenvolvimento/ARQ/1.ENTREGAS" --projeto 991
+
+Sem --projetos/--pastas vigia todos os projetos de diretorios_projetos.json.
+Usa inotify no Linux e polling nos demais casos (--polling força o polling). Ctrl+C encerra.
+"""
+import os
+import sys
+import logging
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import entrega
+from utils.vigia import VigiaEntregas, pastas_de_entrega, VIGIA_DEBOUNCE_S, VIGIA_INTERVALO_S
+
+
+def _argumentos(argv=None):
+    ap = argparse.ArgumentParser(description="Pré-cálculo das entregas em segundo plano.")
+    ap.add_argument("--projetos", nargs="*", help="números dos projetos (padrão: todos)")
+    ap.add_argument("--projetos-json", default=entrega.PROJETOS_JSON,
+                    help="JSON número → pasta do projeto")
+    ap.add_argument("--pastas", nargs="*", help="pastas 1.ENTREGAS específicas (exige --projeto)")
+    ap.add_argument("--projeto", help="número do projeto das --pastas")
+    ap.add_argument("--regras", help="JSON de nomenclaturas (padrão: o do drive compartilhado)")
+    ap.add_argument("--debounce", type=float, default=VIGIA_DEBOUNCE_S, help="segundos sem eventos antes de calcular")
+    ap.add_argument("--intervalo", type=float, default=VIGIA_INTERVALO_S, help="intervalo do polling (s)")
+    ap.add_argument("--polling", action="store_true", help="não usar inotify")
+    args = ap.parse_args(argv)
+    if args.pastas and not args.projeto:
+        ap.error("--pastas exige --projeto")
+    return args
+
+
+def main(argv=None) -> int:
+    args = _argumentos(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s",
+                        handlers=[logging.StreamHandler(sys.stderr)])
+    if args.regras:
+        entrega.NOMENCLATURA_REGRAS_JSON = args.regras
+
+    if args.pastas:
+        pastas = {p: str(args.projeto) for p in args.pastas}
+    else:
+        projetos = entrega.carregar_diretorios_projetos(args.projetos_json)
+        if args.projetos:
+            projetos = {p: projetos[p] for p in args.projetos if p in projetos}
+        pastas = pastas_de_entrega(projetos)
+    if not pastas:
+        logging.error("Nenhuma pasta %s para vigiar", entrega.PASTA_ENTREGAS)
+        return 1
+
+    logging.info("Vigiando %d pastas de entrega", len(pastas))
+    vigia = VigiaEntregas(pastas, debounce_s=args.debounce, intervalo_s=args.intervalo,
+                          usar_inotify=False if args.polling else None)
+    try:
+        vigia.rodar()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
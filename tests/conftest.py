@@ -0,0 +1,16 @@
+import pytest
+from utils import entrega, hash_cache, indice_projeto, instrumentacao, precalculo, regras_nomenclatura
+
+@pytest.fixture(autouse=True)
+def caches_locais_isolados(tmp_path_factory, monkeypatch):
+    # nada dos testes vai para ~/.oae_eng: caches, índices, regras, catálogo e instrumentação
+    local = tmp_path_factory.mktemp("oae_eng")
+    monkeypatch.setattr(hash_cache, "PASTA_CACHE_LOCAL", local / "cache_hashes")
+    monkeypatch.setattr(precalculo, "PASTA_PRECALCULO", local / "precalculo")
+    monkeypatch.setattr(indice_projeto, "PASTA_INDICES", local / "indices")
+    monkeypatch.setattr(regras_nomenclatura, "PASTA_REGRAS_LOCAL", local / "nomenclaturas")
+    monkeypatch.setattr(instrumentacao, "ARQUIVO_PADRAO", local / "instrumentacao.jsonl")
+    monkeypatch.setattr(entrega, "CATALOGO_DB", str(local / "catalogo_entregas.sqlite3"))
+    hash_cache._caches.clear()
+    yield local
+    hash_cache._caches.clear()
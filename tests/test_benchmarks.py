@@ -0,0 +1,55 @@
+import json
+import sys
+from pathlib import Path
+from utils import entrega, hash_cache
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / "benchmarks"))
+import bench_entrega
+from arvore_sintetica import carregar_esquema, gerar_projeto, isolar_caches
+
+def _restaurar_globais(monkeypatch):
+    # isolar_caches() também troca o template da GRD; os caminhos locais já vêm do conftest
+    monkeypatch.setattr(entrega, "TEMPLATE_XLSX", entrega.TEMPLATE_XLSX)
+
+def test_gerar_projeto(tmp_path, monkeypatch):
+    _restaurar_globais(monkeypatch)
+    isolar_caches(tmp_path / "caches")
+    proj = gerar_projeto(tmp_path / "p", carregar_esquema(), disciplinas=2, documentos=20, max_revisoes=4,
+                         modelos=1, tamanho_modelo_kb=256, entregas_ap=2, entregas_pe=1, semente=1)
+    disc = proj.disciplinas[0]
+    assert disc.pasta_entregas == tmp_path / "p" / "3 Desenvolvimento" / disc.nome / "1.ENTREGAS"
+    assert all(p.exists() for p in disc.arquivos())
+    assert [e.parent.name for e in disc.entregas] == ["AP", "AP", "PE"]
+    assert (disc.pasta_entregas / "AP" / "1.AP - Entrega-1-OBSOLETO").is_dir()
+    assert proj.resumo()["documentos"] == sum(len(d.cadeias) for d in proj.disciplinas)
+    # mesma semente ➜ mesmos nomes
+    outro = gerar_projeto(tmp_path / "q", carregar_esquema(), disciplinas=1, documentos=20, max_revisoes=4,
+                          modelos=1, tamanho_modelo_kb=256, entregas_ap=0, entregas_pe=0, semente=1)
+    assert [p.name for p in outro.disciplinas[0].arquivos()] == [p.name for p in disc.arquivos()]
+
+def test_bench_entrega_grava_json(tmp_path, monkeypatch):
+    _restaurar_globais(monkeypatch)
+    saida = tmp_path / "bench.json"
+    assert bench_entrega.main(["--disciplinas", "1", "--documentos", "15", "--max-revisoes", "3",
+                               "--modelos", "1", "--tamanho-modelo-kb", "256", "--repeticoes", "1",
+                               "--pasta", str(tmp_path / "arvore"), "--saida", str(saida)]) == 0
+    res = json.loads(saida.read_text(encoding="utf-8"))
+    assert set(res["medidas"]) >= {"comparar_arquivos", "processar_entrega_arquivos_tipo", "criar_arquivo_controle_completo",
+                                   "verificar_tokens", "identificar_revisoes", "listar_arquivos_no_diretorio"}
+    assert all(m["segundos"] >= 0 for m in res["medidas"].values())
+
+def test_bench_compara_as_duas_ultimas_entregas_sem_cache(tmp_path, monkeypatch):
+    _restaurar_globais(monkeypatch)
+    chamadas = []
+    original = entrega.comparar_arquivos
+
+    def _espiar(nova, anterior, comparador):
+        chamadas.append((nova.name, anterior.name, dict(hash_cache._caches)))
+        return original(nova, anterior, comparador)
+
+    monkeypatch.setattr(entrega, "comparar_arquivos", _espiar)
+    assert bench_entrega.main(["--disciplinas", "1", "--documentos", "5", "--max-revisoes", "2", "--modelos", "0",
+                               "--entregas-ap", "11", "--entregas-pe", "0", "--repeticoes", "2",
+                               "--pasta", str(tmp_path / "arvore"), "--saida", str(tmp_path / "b.json")]) == 0
+    assert [c[:2] for c in chamadas] == [("1.AP - Entrega-11", "1.AP - Entrega-10-OBSOLETO")] * 2
+    assert all(not c[2] for c in chamadas)
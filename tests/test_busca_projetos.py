@@ -0,0 +1,25 @@
+from utils.busca_projetos import IndiceBusca, normalizar
+
+PROJETOS = [
+    ("991", "OAE-991 - Edifício Peter Bal", "/p/991"),
+    ("992", "OAE-992 - Residencial Aurora", "/p/992"),
+    ("1003", "OAE-1003 - Galpão Logístico Sul", "/p/1003"),
+    ("1010", "OAE-1010 - Torre Peterson", "/p/1010"),
+]
+
+def _nomes(idx, consulta):
+    return [idx.itens[i][0] for i in idx.buscar(consulta)]
+
+def test_busca_ranqueada_sem_acentos():
+    idx = IndiceBusca(PROJETOS)
+    assert normalizar("Galpão Logístico") == "galpao logistico"
+    assert _nomes(idx, "") == ["991", "992", "1003", "1010"]
+    assert _nomes(idx, "logistico") == ["1003"]
+    assert _nomes(idx, "992") == ["992"]
+    # palavra inteira antes de prefixo
+    assert _nomes(idx, "peter") == ["991", "1010"]
+    assert _nomes(idx, "pet bal") == ["991"]
+    # trecho no meio da palavra (busca antiga) e erro de digitação
+    assert _nomes(idx, "rora") == ["992"]
+    assert _nomes(idx, "residencal") == ["992"]
+    assert _nomes(idx, "xyz") == []
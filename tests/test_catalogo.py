@@ -0,0 +1,29 @@
+import json
+from utils.catalogo import Catalogo, importar_json_legado
+
+def _registro(pasta, nomes):
+    return {"data": "2025-06-04 14:28:21", "tipo_entrega": "AP", "etapa": 1,
+            "pasta_entrega": pasta, "arquivos_entregues": nomes}
+
+def test_catalogo_entregas_e_revisoes(tmp_path):
+    cat = Catalogo(tmp_path / "catalogo.sqlite3")
+    doc = "P-CLI-991-OAE-ARQ-EX-DTE-G.001-IMP-TER-LAY-PTB"
+    cat.registrar_entrega("991", tmp_path, _registro("E1", [f"{doc}-R01.pdf"]), hashes={f"{doc}-R01.pdf": "aa"})
+    cat.registrar_entrega("991", tmp_path, _registro("E2", [f"{doc}-R02.pdf", "X-R05.dwg"]))
+
+    assert cat.revisoes_do_projeto("991") == [(doc, "R01", "E1"), (doc, "R02", "E2"), ("X", "R05", "E2")]
+    assert [e["pasta_entrega"] for e in cat.entregas_com_documento(doc)] == ["E1", "E2"]
+    assert cat.incrementar_indice("991") == 2
+    assert cat._con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+def test_importar_json_legado(tmp_path):
+    contadores = tmp_path / "contadores"
+    contadores.mkdir()
+    (contadores / "contador_entregas_448.json").write_text(json.dumps({"proximo": 7}), encoding="utf-8")
+    hist = tmp_path / "historico_arquivos.json"
+    hist.write_text(json.dumps({"a.pdf": {"numero": 1, "data": 1.0, "status": "Atual"}}), encoding="utf-8")
+
+    cat = Catalogo(tmp_path / "catalogo.sqlite3")
+    importar_json_legado(cat, contadores, hist)
+    assert cat.proximo_indice("448") == 7
+    assert cat._con.execute("SELECT COUNT(*) FROM historico_arquivos").fetchone()[0] == 1
@@ -0,0 +1,82 @@
+import hashlib
+import pytest
+from utils import comparacao, entrega
+from utils.comparacao import ComparadorArquivos, MODO_RAPIDO, MODO_PARANOICO
+from utils.entrega import comparar_arquivos
+from utils.manifesto import ler_manifesto
+
+BLOCO = 4096
+
+def _par(tmp_path, a: bytes, b: bytes):
+    (tmp_path / "a").mkdir(exist_ok=True)
+    (tmp_path / "b").mkdir(exist_ok=True)
+    pa, pb = tmp_path / "a" / "x.bin", tmp_path / "b" / "x.bin"
+    pa.write_bytes(a)
+    pb.write_bytes(b)
+    return pa, pb
+
+def test_tamanho_diferente_decide_sem_ler(tmp_path):
+    pa, pb = _par(tmp_path, b"a" * 100_000, b"a" * 100_001)
+    comp = ComparadorArquivos(bloco=BLOCO)
+    assert comp.iguais(pa, pb) is False
+    assert comp.bytes_lidos == 0 and comp.decididos["tamanho"] == 1
+
+def test_amostra_acha_diferenca_no_meio(tmp_path):
+    base = bytearray(b"a" * 100_000)
+    outro = bytearray(base)
+    outro[50_000] = ord("b")
+    pa, pb = _par(tmp_path, bytes(base), bytes(outro))
+    comp = ComparadorArquivos(bloco=BLOCO)
+    assert comp.iguais(pa, pb) is False
+    assert comp.decididos["amostra"] == 1 and comp.bytes_lidos == 2 * 3 * BLOCO
+
+@pytest.mark.parametrize("modo, esperado", [(MODO_RAPIDO, True), (MODO_PARANOICO, False)])
+def test_diferenca_fora_da_amostra(tmp_path, modo, esperado):
+    base = bytearray(b"a" * 100_000)
+    outro = bytearray(base)
+    outro[20_000] = ord("b")  # entre o bloco do início e o do meio
+    pa, pb = _par(tmp_path, bytes(base), bytes(outro))
+    assert ComparadorArquivos(modo, bloco=BLOCO).iguais(pa, pb) is esperado
+
+def test_cache_evita_reler(tmp_path):
+    pa, pb = _par(tmp_path, b"z" * 100_000, b"z" * 100_000)
+    assert ComparadorArquivos(algoritmo="blake2b", bloco=BLOCO).iguais(pa, pb) is True
+    comp = ComparadorArquivos(algoritmo="blake2b", bloco=BLOCO)
+    assert comp.iguais(pa, pb) is True
+    assert comp.bytes_lidos == 0 and comp.decididos["cache"] == 1
+
+def test_configuracao_invalida():
+    with pytest.raises(ValueError):
+        ComparadorArquivos("turbo")
+    with pytest.raises(ValueError):
+        comparacao.configurar_comparacao(algoritmo="nao-existe")
+
+def test_comparar_arquivos_usa_o_comparador(tmp_path):
+    nova, ant = tmp_path / "nova", tmp_path / "ant"
+    nova.mkdir()
+    ant.mkdir()
+    for pasta, conteudo in ((nova, {"a.pdf": "1", "b.pdf": "2", "c.pdf": "3"}),
+                            (ant, {"a.pdf": "1", "b.pdf": "x", "d.pdf": "4"})):
+        for nome, texto in conteudo.items():
+            (pasta / nome).write_text(texto)
+    comp = ComparadorArquivos()
+    res = comparar_arquivos(nova, ant, comp)
+    assert {n: r["status"] for n, r in res.items()} == {
+        "a.pdf": "nao_modificado", "b.pdf": "modificado", "c.pdf": "novo", "d.pdf": "removido"}
+    assert sum(comp.decididos.values()) == 2
+
+def test_dedup_rapido_confirma_pelo_hash_completo(tmp_path, monkeypatch):
+    monkeypatch.setattr(comparacao, "_modo_padrao", MODO_RAPIDO)
+    monkeypatch.setattr(entrega, "criar_arquivo_controle", lambda *_: None)
+    origem = tmp_path / "origem"
+    origem.mkdir()
+    fonte = origem / "A-R01.rvt"
+    dados = bytearray(b"a" * 1_000_000)
+    fonte.write_bytes(bytes(dados))
+    entrega.processar_entrega_arquivos_tipo([fonte], tmp_path / "1.ENTREGAS", "AP")
+    dados[300_000] = ord("b")  # fora dos blocos de início, meio e fim
+    fonte.write_bytes(bytes(dados))
+    nova = entrega.processar_entrega_arquivos_tipo([fonte], tmp_path / "1.ENTREGAS", "AP", dedup=True,
+                                                   comparador=ComparadorArquivos(MODO_RAPIDO))
+    assert (nova / "A-R01.rvt").read_bytes() == fonte.read_bytes()
+    assert ler_manifesto(nova)["arquivos"]["A-R01.rvt"]["hash"] == hashlib.md5(fonte.read_bytes()).hexdigest()
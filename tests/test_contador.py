@@ -0,0 +1,46 @@
+import os
+import json
+import threading
+import pytest
+from utils import contador, entrega
+from utils.contador import ErroContador, incrementar_contador, ler_contador
+
+def test_dois_catalogos_usam_o_mesmo_contador(tmp_path, monkeypatch):
+    monkeypatch.setattr(entrega, "JSON_CONTADORES_DIR", str(tmp_path / "drive"))
+    maquina_a, maquina_b = str(tmp_path / "a.sqlite3"), str(tmp_path / "b.sqlite3")
+
+    monkeypatch.setattr(entrega, "CATALOGO_DB", maquina_a)
+    assert entrega.obter_proximo_indice("991") == 1
+    assert entrega.incrementar_indice("991") == 2
+
+    monkeypatch.setattr(entrega, "CATALOGO_DB", maquina_b)
+    assert entrega.obter_proximo_indice("991") == 2
+    assert entrega.incrementar_indice("991") == 3
+
+    monkeypatch.setattr(entrega, "CATALOGO_DB", maquina_a)
+    assert entrega.obter_proximo_indice("991") == 3
+    assert entrega._catalogo().proximo_indice("991") == 3
+    dados = json.loads((tmp_path / "drive" / "contador_entregas_991.json").read_text(encoding="utf-8"))
+    assert dados["proximo"] == 3
+
+def test_incrementos_concorrentes_nao_se_perdem(tmp_path):
+    caminho = tmp_path / "contador_entregas_1.json"
+    threads = [threading.Thread(target=lambda: [incrementar_contador(caminho) for _ in range(10)])
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert ler_contador(caminho)["proximo"] == 81
+    assert sorted(os.listdir(tmp_path)) == ["contador_entregas_1.json"]
+
+def test_trava_ocupada_e_abandonada(tmp_path, monkeypatch):
+    caminho = tmp_path / "contador_entregas_1.json"
+    trava = tmp_path / "contador_entregas_1.json.lock"
+    trava.write_text("outra máquina")
+    with pytest.raises(ErroContador):
+        with contador._travado(caminho, tempo_limite=0.1):
+            pass
+    monkeypatch.setattr(contador, "TRAVA_ABANDONADA_S", 0)
+    os.utime(trava, (0, 0))
+    assert incrementar_contador(caminho) == 2 and not trava.exists()
@@ -0,0 +1,100 @@
+import os
+import hashlib
+import threading
+import pytest
+from utils import copia
+from utils.copia import copiar_com_hash, copiar_em_lote, vincular_arquivo
+from utils.hash_cache import cache_para_arquivo
+
+def test_copiar_com_hash(tmp_path):
+    src = tmp_path / "origem.rvt"
+    dados = os.urandom(300_000)
+    src.write_bytes(dados)
+    os.utime(src, (1_600_000_000, 1_600_000_000))
+    dst = tmp_path / "destino.rvt"
+
+    digest = copiar_com_hash(src, dst, buf=4096)
+    assert digest == hashlib.md5(dados).hexdigest()
+    assert dst.read_bytes() == dados
+    assert os.path.getmtime(dst) == os.path.getmtime(src)
+    assert cache_para_arquivo(dst).obter(dst) == digest
+
+def test_copiar_em_lote_progresso_e_retomada(tmp_path):
+    origem = tmp_path / "origem"
+    destino = tmp_path / "destino"
+    origem.mkdir()
+    destino.mkdir()
+    pares = []
+    for i in range(10):
+        p = origem / f"{i}.pdf"
+        p.write_bytes(os.urandom(10_000 + i))
+        pares.append((p, destino / p.name))
+
+    progresso = []
+    resumo = copiar_em_lote(pares, max_workers=3, buf=1024,
+                            on_progresso=lambda feito, total: progresso.append((feito, total)))
+    total = sum(os.path.getsize(s) for s, _ in pares)
+    assert resumo["arquivos"] == 10 and resumo["bytes"] == total
+    assert max(feito for feito, _ in progresso) == total
+    for src, dst in pares:
+        assert resumo["hashes"][dst] == hashlib.md5(src.read_bytes()).hexdigest()
+
+    resumo2 = copiar_em_lote(pares)
+    assert resumo2["pulados"] == 10
+    assert resumo2["hashes"] == resumo["hashes"]
+
+def test_limite_io_vale_por_arquivo(tmp_path, monkeypatch):
+    class Limite:
+        def __init__(self):
+            self.sem, self.lock = threading.Semaphore(1), threading.Lock()
+            self.vagas = self.ocupadas = self.maximo = 0
+
+        def __enter__(self):
+            self.sem.acquire()
+            with self.lock:
+                self.vagas += 1
+                self.ocupadas += 1
+                self.maximo = max(self.maximo, self.ocupadas)
+
+        def __exit__(self, *exc):
+            with self.lock:
+                self.ocupadas -= 1
+            self.sem.release()
+
+    limite = Limite()
+    monkeypatch.setattr(copia, "_limite_io", limite)
+    pares = []
+    for i in range(6):
+        p = tmp_path / f"{i}.pdf"
+        p.write_bytes(os.urandom(5_000))
+        pares.append((p, tmp_path / f"{i}-copia.pdf"))
+    copiar_em_lote(pares, max_workers=3)
+    assert limite.vagas == 6 and limite.maximo == 1
+
+def test_falha_cancela_copias_na_fila(tmp_path):
+    pares = []
+    for i in range(5):
+        p = tmp_path / f"{i}.pdf"
+        p.write_bytes(os.urandom(5_000))
+        pares.append((p, tmp_path / f"{i}-copia.pdf"))
+
+    iniciados = []
+
+    def _cancelar(src, *_):
+        iniciados.append(src)
+        if len(iniciados) == 1:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        copiar_em_lote(pares, max_workers=1, on_arquivo=_cancelar)
+    assert len(iniciados) == 1
+
+def test_vincular_arquivo(tmp_path):
+    anterior = tmp_path / "anterior.nwd"
+    anterior.write_bytes(b"modelo")
+    dst = tmp_path / "novo.nwd"
+
+    modo = vincular_arquivo(anterior, dst, hashlib.md5(b"modelo").hexdigest())
+    assert modo in ("hardlink", "reflink", "copia")
+    assert dst.read_bytes() == b"modelo"
+    assert cache_para_arquivo(dst).obter(dst) == hashlib.md5(b"modelo").hexdigest()
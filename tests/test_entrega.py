@@ -0,0 +1,55 @@
+import sys
+import subprocess
+import json
+from utils import entrega
+
+def _esquema():
+    with open("nomenclaturas.json", encoding="utf-8") as f:
+        return json.load(f)["991"]
+
+def test_executar_entrega_simulada(tmp_path, monkeypatch):
+    monkeypatch.setattr(entrega, "carregar_regras_nomenclatura", lambda _: _esquema())
+    base = "P-PETER_BAL-991-OAE-ARQ-EX-DTE-G.001-IMP-TER-LAY-PTB-"
+    caminhos = []
+    for rev in ("R00", "R01"):
+        p = tmp_path / f"{base}{rev}.pdf"
+        p.write_text(rev)
+        caminhos.append(str(p))
+
+    resumo = entrega.executar_entrega("991", tmp_path, caminhos, "AP", simular=True)
+    assert resumo["ok"] and resumo["invalidos"] == []
+    assert resumo["revisados"] == [f"{base}R01.pdf"] and resumo["obsoletos"] == [f"{base}R00.pdf"]
+
+    ruim = tmp_path / "X-errado.pdf"
+    ruim.write_text("x")
+    resumo = entrega.executar_entrega("991", tmp_path, caminhos + [str(ruim)], "AP")
+    assert not resumo["ok"] and resumo["erro"] == "nomenclatura"
+    assert not (tmp_path / "AP").exists()
+
+def test_entrega_nao_importa_tkinter():
+    cod = "import sys, utils.entrega; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", cod]).returncode == 0
+
+def test_entrega_interrompida_na_copia_remove_pasta_nova(tmp_path):
+    origem = tmp_path / "orig.pdf"
+    origem.write_bytes(b"x" * 1000)
+
+    class Cancelada(Exception):
+        pass
+
+    def _cancelar(feito, total):
+        raise Cancelada()
+
+    try:
+        entrega.processar_entrega_arquivos_tipo([origem], tmp_path / "ENT", "AP", on_progresso=_cancelar)
+    except Cancelada:
+        pass
+    else:
+        raise AssertionError("cancelamento não propagado")
+    assert list((tmp_path / "ENT" / "AP").iterdir()) == []
+
+def test_obter_entrega_anterior(tmp_path):
+    assert entrega.obter_entrega_anterior(tmp_path) is None
+    for nome in ("Entrega_02", "Entrega_10", "Entrega_11_OBS", "Entrega_xx", "Outra"):
+        (tmp_path / nome).mkdir()
+    assert entrega.obter_entrega_anterior(tmp_path) == tmp_path / "Entrega_10"
@@ -2,9 +2,12 @@ import pytest
 from utils.file_operations import listar_arquivos_no_diretorio
 from utils.json_operations import carregar_nomenclatura_json
 
-def test_listar_arquivos_no_diretorio():
-    arquivos = listar_arquivos_no_diretorio("test_dir")
+def test_listar_arquivos_no_diretorio(tmp_path):
+    (tmp_path / "A-R01.pdf").write_text("a")
+    (tmp_path / "foto.jpg").write_text("ignorado")
+    arquivos = listar_arquivos_no_diretorio(str(tmp_path))
     assert isinstance(arquivos, list)
+    assert [a[1] for a in arquivos] == ["A-R01.pdf"]
 
 def test_carregar_nomenclatura_json():
     nomenclatura = carregar_nomenclatura_json("123", "nomenclaturas.json")
@@ -0,0 +1,37 @@
+from openpyxl import Workbook, load_workbook
+from openpyxl.worksheet.datavalidation import DataValidation
+from utils.grd import escrever_grd_streaming
+
+def _template(caminho):
+    wb = Workbook()
+    ws = wb.active
+    ws["A3"] = "Gerado em"
+    ws["A5"] = "Grupo"
+    ws["B5"] = "Extens."
+    ws["C5"] = "Z.AP.ENT 01 - ENTREGUE"
+    ws.column_dimensions["C"].width = 40
+    dv = DataValidation(type="list", formula1='"OK,PENDENTE"', allow_blank=True)
+    dv.add("C6:C2000")
+    ws.add_data_validation(dv)
+    wb.save(caminho)
+
+def test_escrever_grd_streaming(tmp_path):
+    tpl = tmp_path / "GRD_template.xlsx"
+    _template(tpl)
+    entregas = [
+        ("Z.AP.ENT 01 - ENTREGUE", [("a-R01.pdf", "novo"), ("b-R01.dwg", "novo")]),
+        ("Z.PE.ENT 02 - ENTREGUE", [("a-R02.pdf", "revisado"), ("b-R01.dwg", "igual")]),
+    ]
+    out = tmp_path / "GRD.xlsx"
+    escrever_grd_streaming(tpl, iter(entregas), out)
+
+    ws = load_workbook(out).active
+    assert ws["A5"].value == "Grupo"
+    assert ws["B3"].value
+    assert ws["D5"].value == "Z.PE.ENT 02 - ENTREGUE"
+    assert ws["C8"].value == "a-R01.pdf" and ws["C8"].fill.fgColor.rgb == "00C6EFCE"
+    assert ws["D8"].fill.fgColor.rgb == "009BC2E6"
+    assert ws["D9"].fill.fill_type is None
+    assert ws["B9"].value == ".DWG"
+    assert ws.column_dimensions["D"].width == 40
+    assert any("D6:D2000" in str(dv.sqref) for dv in ws.data_validations.dataValidation)
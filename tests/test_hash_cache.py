@@ -0,0 +1,47 @@
+import os
+import hashlib
+from pathlib import Path
+from utils import hash_cache
+from utils.hash_cache import CacheHashes, localizar_raiz_entregas, cache_para_arquivo, CACHE_HASHES_NOME
+
+def test_cache_hashes_reutiliza_e_invalida(tmp_path):
+    arq = tmp_path / "a.pdf"
+    arq.write_bytes(b"conteudo")
+    cache = CacheHashes(tmp_path / CACHE_HASHES_NOME)
+    assert cache.hash_arquivo(arq) == hashlib.md5(b"conteudo").hexdigest()
+    assert cache.hash_arquivo(arq) == hashlib.md5(b"conteudo").hexdigest()
+    assert cache.acertos == 1
+
+    arq.write_bytes(b"outro conteudo")
+    os.utime(arq, ns=(0, 10**9))
+    assert cache.hash_arquivo(arq) == hashlib.md5(b"outro conteudo").hexdigest()
+
+def test_cache_hashes_persiste_e_limita(tmp_path):
+    arquivos = []
+    for i in range(3):
+        p = tmp_path / f"{i}.pdf"
+        p.write_bytes(bytes([i]))
+        arquivos.append(p)
+    cache = CacheHashes(tmp_path / CACHE_HASHES_NOME, max_entradas=2)
+    for p in arquivos:
+        cache.hash_arquivo(p)
+    cache.salvar()
+
+    recarregado = CacheHashes(tmp_path / CACHE_HASHES_NOME)
+    assert recarregado.obter(arquivos[0]) is None
+    assert recarregado.obter(arquivos[2]) == hashlib.md5(bytes([2])).hexdigest()
+
+def test_localizar_raiz_entregas():
+    p = Path("1.ENTREGAS") / "AP" / "1.AP - Entrega-3" / "a.pdf"
+    assert localizar_raiz_entregas(p) == Path("1.ENTREGAS")
+
+def test_arquivo_fora_das_entregas_usa_cache_local(tmp_path):
+    local = hash_cache.PASTA_CACHE_LOCAL  # isolado em tmp pelo conftest
+    assert localizar_raiz_entregas(Path("1.ENTREGAS") / "a.pdf") == Path("1.ENTREGAS")
+    solto = tmp_path / "Desktop" / "a.pdf"
+    solto.parent.mkdir()
+    solto.write_bytes(b"x")
+    cache = cache_para_arquivo(solto)
+    cache.hash_arquivo(solto)
+    cache.salvar()
+    assert (local / CACHE_HASHES_NOME).exists() and not (solto.parent / CACHE_HASHES_NOME).exists()
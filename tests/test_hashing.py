@@ -0,0 +1,15 @@
+import hashlib
+from utils.hashing import hashes_por_caminho
+
+def test_hashes_por_caminho(tmp_path):
+    caminhos = []
+    for i in range(20):
+        p = tmp_path / f"{i}.pdf"
+        p.write_bytes(str(i).encode() * 1000)
+        caminhos.append(p)
+    inexistente = tmp_path / "nao_existe.pdf"
+
+    res = hashes_por_caminho(caminhos + [inexistente], max_workers=4, buf=64, usar_cache=False)
+    assert res[inexistente] is None
+    for i, p in enumerate(caminhos):
+        assert res[p] == hashlib.md5(str(i).encode() * 1000).hexdigest()
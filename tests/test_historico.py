@@ -0,0 +1,38 @@
+import json
+import pytest
+from utils.historico import (registrar_entrega, iterar_historico, ultimo_registro,
+                             compactar_historico, HISTORICO_JOURNAL, HISTORICO_LEGADO, ErroHistoricoLegado)
+
+def test_migra_legado_e_anexa(tmp_path):
+    legado = [{"pasta_entrega": f"E{i}", "arquivos_entregues": []} for i in range(3)]
+    (tmp_path / HISTORICO_LEGADO).write_text(json.dumps(legado), encoding="utf-8")
+
+    assert registrar_entrega(tmp_path, {"pasta_entrega": "E3", "arquivos_entregues": ["a.pdf"]}) == 4
+    assert not (tmp_path / HISTORICO_LEGADO).exists()
+    assert [r["pasta_entrega"] for r in iterar_historico(tmp_path)] == ["E0", "E1", "E2", "E3"]
+    assert ultimo_registro(tmp_path)["arquivos_entregues"] == ["a.pdf"]
+
+def test_linha_incompleta_e_compactacao(tmp_path):
+    registrar_entrega(tmp_path, {"pasta_entrega": "E0"})
+    journal = tmp_path / HISTORICO_JOURNAL
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write('lixo\n{"pasta_entrega": "E1", "se')
+
+    assert registrar_entrega(tmp_path, {"pasta_entrega": "E2"}) == 2
+    assert [r["pasta_entrega"] for r in iterar_historico(tmp_path)] == ["E0", "E2"]
+    assert compactar_historico(tmp_path) == 2
+    assert journal.read_text(encoding="utf-8").count("\n") == 2
+
+def test_legado_ilegivel_bloqueia_e_depois_e_mesclado(tmp_path):
+    legado = tmp_path / HISTORICO_LEGADO
+    legado.write_text('[{"pasta_entrega": "E0"', encoding="utf-8")
+    with pytest.raises(ErroHistoricoLegado):
+        registrar_entrega(tmp_path, {"pasta_entrega": "E1"})
+    assert not (tmp_path / HISTORICO_JOURNAL).exists()
+
+    # journal criado por uma versão anterior enquanto o legado estava ilegível
+    (tmp_path / HISTORICO_JOURNAL).write_text('{"pasta_entrega": "E1", "seq": 1}\n', encoding="utf-8")
+    legado.write_text('[{"pasta_entrega": "E0"}]', encoding="utf-8")
+    assert registrar_entrega(tmp_path, {"pasta_entrega": "E2"}) == 3
+    assert [(r["pasta_entrega"], r["seq"]) for r in iterar_historico(tmp_path)] == [("E0", 1), ("E1", 2), ("E2", 3)]
+    assert not legado.exists()
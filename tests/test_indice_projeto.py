@@ -0,0 +1,51 @@
+import os
+from utils.indice_projeto import IndiceProjeto
+
+def _envelhecer(raiz):
+    # mtime antigo para passar da MARGEM_MTIME_NS (senão a pasta é relida de propósito)
+    for atual, pastas, arqs in os.walk(raiz):
+        for nome in arqs + pastas:
+            os.utime(os.path.join(atual, nome), ns=(10**18, 10**18))
+        os.utime(atual, ns=(10**18, 10**18))
+
+def test_indice_incremental_e_persistente(tmp_path):
+    proj = tmp_path / "proj"
+    for disc in ("ARQ", "EST"):
+        ent = proj / "3 Desenvolvimento" / disc / "1 - Entregas"
+        (ent / "AP" / "1.AP - Entrega-1").mkdir(parents=True)
+        (ent / f"{disc}-R01.pdf").write_text("x")
+    _envelhecer(proj)
+
+    idx = IndiceProjeto(proj, pasta_indices=tmp_path / "idx")
+    # raiz + 2 disciplinas: 1.ENTREGAS e as pastas de entrega não são percorridas
+    assert idx.vazio and idx.atualizar()["lidas"] == 3
+    assert [n for n, _ in idx.disciplinas()] == ["ARQ", "EST"]
+    assert idx.pasta_entregas("ARQ") == "1 - Entregas"
+    assert idx.subpastas("ARQ/1 - Entregas") == []
+
+    # segunda abertura: sai do disco, nenhuma pasta relida
+    idx2 = IndiceProjeto(proj, pasta_indices=tmp_path / "idx")
+    assert not idx2.vazio
+    assert idx2.atualizar() == {"lidas": 0, "reaproveitadas": 3, "alterado": False}
+
+    # uma entrega nova não muda nada no índice
+    (proj / "3 Desenvolvimento" / "EST" / "1 - Entregas" / "AP" / "1.AP - Entrega-2").mkdir()
+    assert idx2.atualizar()["lidas"] == 0
+
+    (proj / "3 Desenvolvimento" / "ELE" / "1.ENTREGAS").mkdir(parents=True)
+    res = idx2.atualizar()
+    assert res["alterado"] and res["lidas"] == 2
+    assert idx2.pasta_entregas("ELE") == "1.ENTREGAS"
+
+def test_pasta_recem_alterada_mostra_o_mtime_real(tmp_path):
+    proj = tmp_path / "proj"
+    (proj / "3 Desenvolvimento" / "ARQ" / "1.ENTREGAS").mkdir(parents=True)
+    _envelhecer(proj)
+    (proj / "3 Desenvolvimento" / "ARQ" / "novo.txt").write_text("x")  # ARQ tocada logo antes da varredura
+    mtime = os.stat(proj / "3 Desenvolvimento" / "ARQ").st_mtime_ns
+
+    idx = IndiceProjeto(proj, pasta_indices=tmp_path / "idx")
+    idx.atualizar()
+    assert idx.disciplinas() == [("ARQ", mtime)]
+    # marcada como recente: relida na varredura seguinte mesmo com o mesmo mtime
+    assert idx.atualizar()["lidas"] == 1
@@ -0,0 +1,58 @@
+from utils import entrega
+from utils.catalogo import Catalogo
+from utils.nomenclatura import ValidadorNomenclatura
+from utils.indice_revisoes import indice_revisoes, atualizar_indice_revisoes, REVISADO, MESMA_REVISAO, REGRESSAO, NOVO
+
+ALFA = ValidadorNomenclatura({"campos": [], "revisao_opcao": "Alfabético", "revisao_prefixo": "V",
+                              "revisao_ndigitos": 1, "revisao_separador": "_"})
+
+def _registro(pasta, nomes):
+    return {"data": "2025-06-04 14:28:21", "tipo_entrega": "AP", "etapa": 1,
+            "pasta_entrega": pasta, "arquivos_entregues": nomes}
+
+def test_indice_revisoes_com_esquema_do_projeto(tmp_path):
+    cat = Catalogo(tmp_path / "catalogo.sqlite3")
+    nomes = ["PLANTA_VB.pdf", "CORTE_VA.dwg"]
+    cat.registrar_entrega("7", tmp_path, _registro("E1", nomes), revisoes=entrega.revisoes_por_nome(nomes, ALFA))
+
+    idx = indice_revisoes("7", ALFA, cat)
+    assert idx.ultima("PLANTA") == "VB" and idx.ultima("FACHADA") is None
+    assert [idx.situacao("PLANTA", r) for r in ("VC", "VB", "VA")] == [REVISADO, MESMA_REVISAO, REGRESSAO]
+    assert idx.situacao("FACHADA", "VA") == NOVO
+
+    # entrega seguinte: índice já carregado é atualizado sem reler o catálogo
+    revs = entrega.revisoes_por_nome(["PLANTA_VD.pdf"], ALFA)
+    cat.registrar_entrega("7", tmp_path, _registro("E2", ["PLANTA_VD.pdf"]), revisoes=revs)
+    atualizar_indice_revisoes("7", cat, revs.values(), "E2")
+    assert idx.ultima("PLANTA") == "VD" and idx.historico("PLANTA") == [("VB", "E1"), ("VD", "E2")]
+    assert indice_revisoes("7", ALFA, cat) is idx
+
+def test_identificar_revisoes_usa_o_esquema():
+    lista = [{"Nome do Arquivo": n} for n in ("PLANTA_VB.pdf", "PLANTA_VA.pdf", "CORTE_X.pdf")]
+    arrv, aobs = entrega.identificar_revisoes(lista, validador=ALFA)
+    assert [a["Nome do Arquivo"] for a in arrv] == ["PLANTA_VB.pdf", "CORTE_X.pdf"]
+    assert [a["Nome do Arquivo"] for a in aobs] == ["PLANTA_VA.pdf"]
+    assert entrega.chave_revisao("A-B-R03.pdf") == ("A-B", "R03")
+    assert entrega.chave_revisao("A-B-X.pdf") == ("A-B", "R00")
+
+def test_indice_reconcilia_com_o_historico_compartilhado(tmp_path):
+    from utils.historico import registrar_entrega
+    cat = Catalogo(tmp_path / "catalogo.sqlite3")
+    pasta = tmp_path / "1.ENTREGAS"
+    pasta.mkdir()
+    # entrega feita em outra máquina: só no histórico ao lado da 1.ENTREGAS
+    registrar_entrega(pasta, _registro("E1", ["PLANTA_VC.pdf"]))
+    idx = indice_revisoes("8", ALFA, cat, pasta)
+    assert idx.ultima("PLANTA") == "VC" and idx.eh_regressao("PLANTA", "VB")
+
+    # a mesma entrega também no catálogo não se repete; nova entrega no journal é relida
+    cat.registrar_entrega("8", pasta, _registro("E1", ["PLANTA_VC.pdf"]),
+                          revisoes=entrega.revisoes_por_nome(["PLANTA_VC.pdf"], ALFA))
+    registrar_entrega(pasta, _registro("E2", ["PLANTA_VD.pdf"]))
+    assert indice_revisoes("8", ALFA, cat, pasta) is idx
+    assert idx.historico("PLANTA") == [("VC", "E1"), ("VD", "E2")]
+
+    # outro separador de revisão: índice refeito com o novo esquema
+    ponto = ValidadorNomenclatura({"campos": [], "revisao_opcao": "Alfabético", "revisao_prefixo": "V",
+                                   "revisao_ndigitos": 1, "revisao_separador": "."})
+    assert indice_revisoes("8", ponto, cat, pasta) is not idx
@@ -0,0 +1,62 @@
+import json
+import pytest
+from utils import entrega, instrumentacao
+from utils.instrumentacao import medir, medido, contar, anotar
+
+@pytest.fixture
+def saida(tmp_path, monkeypatch):
+    monkeypatch.setattr(instrumentacao, "_ativo", False)
+    monkeypatch.setattr(instrumentacao, "_destino", None)
+    arquivo = tmp_path / "instrumentacao.jsonl"
+    instrumentacao.ativar(arquivo)
+    return arquivo
+
+def _registros(arquivo):
+    return [json.loads(l) for l in arquivo.read_text(encoding="utf-8").splitlines()]
+
+def test_desligada_nao_mede(monkeypatch):
+    monkeypatch.setattr(instrumentacao, "_ativo", False)
+    antes = dict(instrumentacao._contadores)
+    with medir("x") as m:
+        contar("bytes_lidos", 10)
+        anotar(a=1)
+    assert m.resumo() is None and instrumentacao._contadores == antes
+    assert medir("y") is medir("z")  # mesmo contexto vazio, sem alocação
+
+def test_etapas_aninhadas(saida):
+    @medido()
+    def interna():
+        contar("arquivos_hash")
+        contar("bytes_lidos", 100)
+
+    with medir("raiz", pasta="p") as raiz:
+        with medir("copia"):
+            contar("arquivos_copiados", 2)
+            interna()
+        anotar(extra=True)
+    reg = raiz.resumo()
+    assert reg["nome"] == "raiz" and reg["pasta"] == "p" and reg["extra"] is True
+    assert reg["bytes_lidos"] == 100 and reg["arquivos_copiados"] == 2
+    assert [(e["nome"], e["nivel"]) for e in reg["etapas"]] == [("copia", 1), ("interna", 2)]
+    assert reg["etapas"][1]["arquivos_hash"] == 1
+    assert _registros(saida) == [reg]
+    assert "interna" in instrumentacao.formatar_resumo(reg)
+
+def test_erro_fica_no_registro(saida):
+    with pytest.raises(KeyError):
+        with medir("falha"):
+            raise KeyError("x")
+    assert _registros(saida)[0]["erro"] == "KeyError"
+
+def test_entrega_gera_um_registro(saida, tmp_path, monkeypatch):
+    monkeypatch.setattr(entrega, "criar_arquivo_controle", lambda *_: None)
+    origem = tmp_path / "origem"
+    origem.mkdir()
+    for nome in ("A-R01.pdf", "B-R01.pdf"):
+        (origem / nome).write_bytes(b"x" * 1000)
+    nova = entrega.processar_entrega_arquivos_tipo(sorted(origem.iterdir()), tmp_path / "1.ENTREGAS", "AP")
+    (reg,) = _registros(saida)
+    assert reg["nome"] == "entrega" and reg["pasta_entrega"] == str(nova)
+    assert reg["arquivos_copiados"] == 2 and reg["bytes_gravados"] == 2000
+    nomes = [e["nome"] for e in reg["etapas"]]
+    assert nomes[:2] == ["listagem", "copia"] and "manifesto" in nomes and "historico" in nomes
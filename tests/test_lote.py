@@ -0,0 +1,17 @@
+from utils.lote import planejar_lote, executar_lote
+
+def test_planejar_lote_uma_tarefa_por_disciplina(tmp_path):
+    for disc, arquivos in (("ARQ", ["a-R00.pdf", "b-R00.dwg"]), ("EST", []), ("HID", ["c-R01.pdf"])):
+        ent = tmp_path / "3 Desenvolvimento" / disc / "1 - Entregas"
+        ent.mkdir(parents=True)
+        for a in arquivos:
+            (ent / a).write_text("x")
+
+    tarefas = planejar_lote({"991": str(tmp_path)}, ["*.pdf"], "AP", dedup=True)
+    assert [t["disciplina"] for t in tarefas] == ["ARQ", "HID"]
+    assert all(len(t["caminhos"]) == 1 and t["dedup"] for t in tarefas)
+    assert planejar_lote({"991": str(tmp_path)}, ["*.pdf"], "AP", disciplinas=["hid"])[0]["disciplina"] == "HID"
+
+def test_executar_lote_vazio():
+    rel = executar_lote([])
+    assert rel["tarefas"] == 0 and rel["falhas"] == 0
@@ -0,0 +1,54 @@
+import json
+import pytest
+from utils import entrega
+from utils.manifesto import MANIFESTO_NOME, ler_manifesto, montar_manifesto, gravar_manifesto
+from utils.nomenclatura import ValidadorNomenclatura
+
+def _entregar(tmp_path, arquivos):
+    origem = tmp_path / "origem"
+    origem.mkdir(exist_ok=True)
+    caminhos = []
+    for nome, conteudo in arquivos.items():
+        (origem / nome).write_text(conteudo)
+        caminhos.append(origem / nome)
+    return entrega.processar_entrega_arquivos_tipo(caminhos, tmp_path / "1.ENTREGAS", "AP")
+
+def test_manifesto_liga_a_entrega_anterior(tmp_path, monkeypatch):
+    monkeypatch.setattr(entrega, "criar_arquivo_controle", lambda *_: None)
+    e1 = _entregar(tmp_path, {"A-R01.pdf": "a1", "B-R01.pdf": "b1", "C-R01.pdf": "c1"})
+    e2 = _entregar(tmp_path, {"A-R02.pdf": "a2", "B-R01.pdf": "b1", "C-R01.pdf": "c2", "D-R01.pdf": "d"})
+
+    man = ler_manifesto(e2)
+    assert man["anterior"] == "1.AP - Entrega-1-OBSOLETO"
+    assert {n: i["status"] for n, i in man["arquivos"].items()} == {
+        "A-R02.pdf": "revisado", "B-R01.pdf": "igual", "C-R01.pdf": "mod_sem_rev", "D-R01.pdf": "novo"}
+    assert man["arquivos"]["A-R02.pdf"]["documento"] == "A" and man["arquivos"]["A-R02.pdf"]["revisao"] == "R02"
+    controle = json.loads((e2 / "_controle_entrega.json").read_text(encoding="utf-8"))
+    assert controle["A-R01.pdf"]["status"] == "removido" and controle["B-R01.pdf"]["status"] == "nao_modificado"
+    assert (tmp_path / "1.ENTREGAS" / "AP" / "1.AP - Entrega-1-OBSOLETO" / MANIFESTO_NOME).exists()
+
+    # a GRD só lê o manifesto
+    monkeypatch.setattr(entrega, "hashes_por_caminho", lambda *_: pytest.fail("leu os arquivos"))
+    (e2 / "_controle_entrega.json").unlink()
+    ent = {"pasta_entrega": str(e2), "arquivos_entregues": ["A-R02.pdf", "D-R01.pdf"]}
+    assert entrega._status_grd_entrega(ent) == {"A-R02.pdf": "revisado", "D-R01.pdf": "novo"}
+
+def test_entrega_antiga_usa_a_anterior_explicita(tmp_path):
+    tipo = tmp_path / "AP"
+    for nome, conteudo in (("1.AP - Entrega-1-OBSOLETO", "velho"), ("1.AP - Entrega-2-OBSOLETO", "x1"),
+                           ("1.AP - Entrega-3", "x2")):
+        (tipo / nome).mkdir(parents=True)
+        (tipo / nome / "X-R01.pdf").write_text(conteudo)
+    assert entrega._entrega_anterior(tipo / "1.AP - Entrega-3").name == "1.AP - Entrega-2-OBSOLETO"
+    ent = {"pasta_entrega": str(tipo / "1.AP - Entrega-3"), "arquivos_entregues": ["X-R01.pdf"]}
+    assert entrega._status_grd_entrega(ent) == {"X-R01.pdf": "mod_sem_rev"}
+
+def test_maior_revisao_pela_ordem_do_esquema(tmp_path):
+    alfa = ValidadorNomenclatura({"campos": [], "revisao_opcao": "Alfabético", "revisao_prefixo": "V",
+                                  "revisao_ndigitos": 1, "revisao_separador": "_"})
+    for nome in ("PLANTA_VB.pdf", "PLANTA_Va.pdf"):
+        (tmp_path / nome).write_text(nome)
+    man = montar_manifesto(tmp_path, {"PLANTA_VB.pdf": "b", "PLANTA_Va.pdf": "a"}, None, alfa)
+    assert man["documentos"]["PLANTA.pdf"]["revisao"] == "VB"  # no texto, "Va" > "VB"
+    gravar_manifesto(tmp_path, man)
+    assert ler_manifesto(tmp_path)["documentos"]["PLANTA.pdf"]["revisao"] == "VB"
@@ -0,0 +1,24 @@
+import json
+from utils.nomenclatura import compilar_nomenclatura, tokenizar, OK, MISMATCH, MISSING
+
+def _esquema():
+    with open("nomenclaturas.json", encoding="utf-8") as f:
+        return json.load(f)["991"]
+
+def test_validador_compilado():
+    esquema = _esquema()
+    v = compilar_nomenclatura(esquema)
+    assert compilar_nomenclatura(esquema) is v
+
+    ok = "P-PETER_BAL-991-OAE-ARQ-EX-DTE-G.001-IMP-TER-LAY-PTB-R01"
+    assert set(v.validar_tokens(tokenizar(ok))) == {"ok"}
+
+    errado = "X-PETER_BAL-991-OAE-ARQ-EX-DTE-G.001-IMP-TER-LAY-PTB-R01"
+    assert v.validar_tokens(tokenizar(errado))[0] == "mismatch"
+
+    curto, = v.validar_lote(["P-PETER_BAL-991.pdf"])
+    assert curto[:5] == bytes([OK, OK, OK, OK, OK]) and curto[-1] == MISSING
+    assert v.revisao_valida("R01") and not v.revisao_valida("R1")
+
+def test_sem_esquema_tudo_mismatch():
+    assert compilar_nomenclatura({}).codigos(["a", "-", "b"]) == bytes([MISMATCH]) * 3
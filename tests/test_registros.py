@@ -0,0 +1,15 @@
+from utils.registros import RegistroArquivo, RepositorioRegistros
+
+def test_registro_compativel_com_dict():
+    reg = RegistroArquivo("P-CLI-991-OAE-ARQ-EX-DTE-G.001-B1-T-S-LAY-R02.pdf", caminho="/x/a.pdf")
+    assert reg["Conjunto"] == "G" and reg["N° do Documento"] == "001"
+    assert reg["Revisão"] == "R02" and reg.get("Extensão") == ".pdf"
+    assert reg.get("inexistente", "") == ""
+    assert len(reg.como_dict()) == 19
+    assert not hasattr(reg, "__dict__")
+
+def test_repositorio_reaproveita_por_caminho():
+    repo = RepositorioRegistros()
+    a, b = repo.obter_lote(["/p/X-1.dwg", "/p/Y-2.dwg"])
+    assert repo.obter("/p/X-1.dwg") is a and len(repo) == 2
+    assert b["Nome do Arquivo"] == "Y-2.dwg"
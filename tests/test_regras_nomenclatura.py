@@ -0,0 +1,43 @@
+import os
+import json
+import threading
+from utils.regras_nomenclatura import RegrasNomenclatura, INDICE_REGRAS, _gravar_json
+
+def test_regras_shards_invalidacao_e_offline(tmp_path):
+    origem = tmp_path / "nomenclaturas.json"
+    local = tmp_path / "local"
+    origem.write_text(json.dumps({"1": {"campos": [{"nome": "A"}]}, "2": {"campos": []}}), encoding="utf-8")
+
+    regras = RegrasNomenclatura(origem, local)
+    assert regras.obter("1") == {"campos": [{"nome": "A"}]}
+    assert (local / INDICE_REGRAS).exists() and (local / "2.json").exists()
+    assert regras.obter(2) is regras.obter("2")  # mesmo objeto em memória
+
+    origem.write_text(json.dumps({"1": {"campos": [{"nome": "B"}]}}), encoding="utf-8")
+    os.utime(origem, ns=(1, 1))
+    assert regras.obter("1")["campos"][0]["nome"] == "B"
+    assert not (local / "2.json").exists()
+
+    # drive fora do ar: nova instância lê só o shard local
+    origem.unlink()
+    assert RegrasNomenclatura(origem, local).obter("1")["campos"][0]["nome"] == "B"
+
+def test_gravacao_concorrente_do_mesmo_shard(tmp_path):
+    destino = tmp_path / "991.json"
+    erros = []
+
+    def _gravar(i):
+        try:
+            for _ in range(30):
+                _gravar_json(destino, {"campos": [i] * 200})
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=_gravar, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert erros == []
+    assert len(json.loads(destino.read_text(encoding="utf-8"))["campos"]) == 200
+    assert [p.name for p in tmp_path.iterdir()] == ["991.json"]
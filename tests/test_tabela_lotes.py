@@ -0,0 +1,50 @@
+import tkinter as tk
+import pytest
+from ui.tabela_lotes import InsercaoEmLotes
+
+class _TreeFalso:
+    def __init__(self):
+        self.linhas, self.agendados = [], []
+
+    def after_idle(self, func):
+        self.agendados.append(func)
+        return len(self.agendados)
+
+    def after(self, _ms, func):
+        return self.after_idle(func)
+
+    def after_cancel(self, _id):
+        self.agendados.clear()
+
+    def winfo_exists(self):
+        return not getattr(self, "destruido", False)
+
+    def insert(self, _pai, _pos, iid=None, values=(), tags=()):
+        if getattr(self, "destruido", False) or (iid is not None and iid in [l[0] for l in self.linhas]):
+            raise tk.TclError(f"Item {iid} already exists" if iid else "invalid command name")
+        self.linhas.append((iid, values, tags))
+
+def test_insercao_em_lotes_nao_bloqueia_e_conclui():
+    tree = _TreeFalso()
+    fim = []
+    ins = InsercaoEmLotes(tree, ((None, (i,), ()) for i in range(1000)), ao_terminar=lambda: fim.append(1),
+                          orcamento_s=0).iniciar()
+    assert tree.linhas == []  # nada é inserido antes da janela aparecer
+    tree.agendados.pop(0)()
+    assert len(tree.linhas) == 1 and len(tree.agendados) == 1
+
+    ins.concluir()
+    assert len(tree.linhas) == 1000 and ins.concluida and fim == [1]
+    assert not tree.agendados
+
+def test_insercao_em_lotes_so_ignora_erro_de_tree_destruido():
+    tree = _TreeFalso()
+    InsercaoEmLotes(tree, [("a", (), ()), ("a", (), ())]).iniciar()
+    with pytest.raises(tk.TclError):
+        tree.agendados.pop(0)()
+
+    tree = _TreeFalso()
+    ins = InsercaoEmLotes(tree, [("a", (), ())]).iniciar()
+    tree.destruido = True
+    tree.agendados.pop(0)()
+    assert tree.linhas == [] and not ins.concluida
@@ -0,0 +1,43 @@
+import time
+from ui.tarefas import ExecutorTarefas
+
+class _LoopFalso:
+    """Só o after() do Tk: os callbacks agendados rodam em rodar()."""
+    def __init__(self):
+        self.agendados = []
+
+    def after(self, _ms, func):
+        self.agendados.append(func)
+
+    def rodar(self, limite=5.0):
+        fim = time.time() + limite
+        while self.agendados and time.time() < fim:
+            self.agendados.pop(0)()
+            time.sleep(0.01)
+
+def test_executor_entrega_resultado_progresso_e_cancelamento():
+    loop = _LoopFalso()
+    ex = ExecutorTarefas(loop)
+    eventos = []
+
+    def _trabalho(tarefa, n):
+        for i in range(1, n + 1):
+            tarefa.progresso(i, n)
+        return n * 2
+
+    ex.executar(_trabalho, 3, ao_concluir=lambda r: eventos.append(("ok", r)),
+                ao_progresso=lambda f, t: eventos.append(("prog", f, t)))
+
+    def _lento(tarefa):
+        while True:
+            tarefa.verificar()
+            time.sleep(0.005)
+
+    t = ex.executar(_lento, ao_cancelar=lambda: eventos.append(("cancelado",)))
+    t.cancelar()
+    ex.executar(lambda _t: 1 / 0, ao_erro=lambda e: eventos.append(("erro", type(e).__name__)))
+    loop.rodar()
+
+    assert ("ok", 6) in eventos and ("cancelado",) in eventos and ("erro", "ZeroDivisionError") in eventos
+    assert all(e[1] <= e[2] for e in eventos if e[0] == "prog")
+    assert not loop.agendados  # a fila para de ser consultada quando não há tarefas
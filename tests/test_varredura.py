@@ -0,0 +1,20 @@
+import os
+from utils.varredura import varrer, subpastas
+from utils.file_operations import listar_arquivos_no_diretorio
+
+def test_varredura_filtra_antes_e_poda(tmp_path):
+    (tmp_path / "sub" / "fundo").mkdir(parents=True)
+    (tmp_path / "podada").mkdir()
+    for rel in ("A-R01.pdf", "foto.PNG", "GRD-ENTREGA.01.xlsx", "dados_execucao_anterior.json",
+                "sub/B-R02.dwg", "sub/fundo/C.pdf", "podada/D.pdf"):
+        (tmp_path / rel).write_text("x")
+
+    nomes = {e.name for e in varrer(tmp_path, extensoes_ignoradas=[".png"], prefixos_ignorados=("GRD-ENTREGA.",),
+                                    nomes_ignorados=["dados_execucao_anterior.json"],
+                                    podar=lambda e: e.name == "podada")}
+    assert nomes == {"A-R01.pdf", "B-R02.dwg", "C.pdf"}
+    assert sorted(e.name for e in subpastas(tmp_path)) == ["podada", "sub"]
+
+    saida = {a: (rv, tam) for rv, a, tam, cam, _ in listar_arquivos_no_diretorio(str(tmp_path))}
+    assert saida["A-R01.pdf"] == ("R01", 1) and "foto.PNG" not in saida and "D.pdf" in saida
+    assert os.path.isabs(next(iter(listar_arquivos_no_diretorio(str(tmp_path))))[3])
@@ -0,0 +1,77 @@
+import json
+import time
+import pytest
+from utils import entrega, precalculo
+from utils.hash_cache import cache_para_arquivo
+from utils.nomenclatura import ValidadorNomenclatura
+from utils.vigia import VigiaEntregas, preparar_pasta
+
+BASE = "P-PETER_BAL-991-OAE-ARQ-EX-DTE-G.001-IMP-TER-LAY-PTB-"
+
+def _esquema():
+    with open("nomenclaturas.json", encoding="utf-8") as f:
+        return json.load(f)["991"]
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(precalculo, "_precalculos", {})
+    monkeypatch.setattr(entrega, "carregar_regras_nomenclatura", lambda _: _esquema())
+    ent = tmp_path / "1.ENTREGAS"
+    ent.mkdir()
+    return ent
+
+def test_preparar_pasta_e_entrega_usa_o_precalculo(pasta, monkeypatch):
+    for rev in ("R00", "R01"):
+        (pasta / f"{BASE}{rev}.pdf").write_text(rev)
+    res = preparar_pasta(pasta, _esquema())
+    assert res["arquivos"] == 2 and res["nomes_novos"] == 2
+    assert preparar_pasta(pasta, _esquema())["nomes_novos"] == 0
+    assert cache_para_arquivo(pasta / f"{BASE}R01.pdf").obter(pasta / f"{BASE}R01.pdf") is not None
+
+    # na entrega, nomes pré-calculados não passam pelo validador
+    monkeypatch.setattr(ValidadorNomenclatura, "validar_lote", lambda *_: pytest.fail("validou de novo"))
+    monkeypatch.setattr(entrega, "chave_revisao", lambda _: pytest.fail("agrupou de novo"))
+    caminhos = sorted(str(p) for p in pasta.glob("*.pdf"))
+    resumo = entrega.executar_entrega("991", pasta, caminhos, "AP", simular=True)
+    assert resumo["invalidos"] == [] and resumo["revisados"] == [f"{BASE}R01.pdf"]
+
+@pytest.mark.parametrize("usar_inotify", [True, False])
+def test_vigia_debounce(pasta, usar_inotify):
+    preparados = []
+    vigia = VigiaEntregas({str(pasta): "991"}, debounce_s=0.2, intervalo_s=0.1,
+                          usar_inotify=usar_inotify, ao_preparar=preparados.append).iniciar()
+    try:
+        limite = time.monotonic() + 5
+        while not preparados and time.monotonic() < limite:
+            time.sleep(0.02)
+        assert preparados and preparados[0]["arquivos"] == 0  # varredura inicial
+        for i in range(5):  # rajada de eventos ➜ um só pré-cálculo
+            (pasta / f"{BASE}R0{i}.pdf").write_text(str(i))
+        limite = time.monotonic() + 5
+        while len(preparados) < 2 and time.monotonic() < limite:
+            time.sleep(0.02)
+        time.sleep(0.4)
+    finally:
+        vigia.parar(5)
+    assert [p["arquivos"] for p in preparados[1:]] == [5]
+
+def test_chaves_do_vigia_nao_valem_com_outras_regras(pasta, monkeypatch):
+    for rev in ("R01", "R02"):
+        (pasta / f"{BASE}{rev}.pdf").write_text(rev)
+    preparar_pasta(pasta, _esquema())
+    novo = _esquema()
+    rev = next(c for c in novo["campos"] if c["nome"] == "REVISÃO_ESPECIAL")
+    rev["revisao_separador"] = "."  # REVISÃO_ESPECIAL alterado depois do pré-cálculo
+    pre = precalculo.precalculo_para_pasta(pasta)
+    assert len(pre.chaves_revisao(precalculo.assinatura_esquema(_esquema()))) == 2
+    assert pre.chaves_revisao(precalculo.assinatura_esquema(novo)) == {}
+    assert pre.chaves_revisao(None) == {}
+
+    recebidas = []
+    original = entrega.identificar_revisoes
+    monkeypatch.setattr(entrega, "identificar_revisoes",
+                        lambda lista, chaves, v: recebidas.append(chaves) or original(lista, chaves, v))
+    monkeypatch.setattr(entrega, "carregar_regras_nomenclatura", lambda _: novo)
+    caminhos = sorted(str(p) for p in pasta.glob("*.pdf"))
+    entrega.executar_entrega("991", pasta, caminhos, "AP", simular=True, forcar=True)
+    assert recebidas == [{}]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+import time
+import logging
+import tkinter as tk
+from typing import Callable, Iterable, Iterator, Optional
+
+ORCAMENTO_LOTE_S = 0.012  # tempo máximo de inserção por passo, para o Tk continuar redesenhando
+INTERVALO_LOTE_MS = 1
+
+# cada linha: (iid ou None, valores, tags)
+Linha = tuple[Optional[str], tuple, tuple]
+
+
+class InsercaoEmLotes:
+    """
+    Preenche um ttk.Treeview aos poucos, entre eventos do Tk.
+
+    As linhas vêm de um iterável preguiçoso (pode calcular tokens/validação linha a
+    linha); cada passo insere o que couber em ORCAMENTO_LOTE_S e devolve o controle
+    ao loop. A janela aparece vazia e vai sendo preenchida, com qualquer tamanho de lista.
+    concluir() insere o restante na hora (ex.: antes de ler todas as linhas da tabela).
+    """
+
+    def __init__(self, tree, linhas: Iterable[Linha], ao_terminar: Optional[Callable[[], None]] = None,
+                 orcamento_s: float = ORCAMENTO_LOTE_S):
+        self.tree = tree
+        self._linhas: Iterator[Linha] = iter(linhas)
+        self._ao_terminar = ao_terminar
+        self._orcamento = orcamento_s
+        self._agendado = None
+        self.inseridas = 0
+        self.concluida = False
+
+    def iniciar(self) -> "InsercaoEmLotes":
+        self._agendado = self.tree.after_idle(self._passo)
+        return self
+
+    def _inserir(self, linha: Linha) -> None:
+        iid, valores, tags = linha
+        if iid is None:
+            self.tree.insert("", tk.END, values=valores, tags=tags)
+        else:
+            self.tree.insert("", tk.END, iid=iid, values=valores, tags=tags)
+        self.inseridas += 1
+
+    def _existe(self) -> bool:
+        try:
+            return bool(self.tree.winfo_exists())
+        except tk.TclError:
+            return False  # interpretador do Tk já encerrado
+
+    def _terminar(self) -> None:
+        self.concluida = True
+        self._agendado = None
+        if self._ao_terminar:
+            self._ao_terminar()
+
+    def _passo(self) -> None:
+        self._agendado = None
+        if not self._existe():
+            return
+        try:
+            limite = time.perf_counter() + self._orcamento
+            for linha in self._linhas:
+                self._inserir(linha)
+                if time.perf_counter() >= limite:
+                    self._agendado = self.tree.after(INTERVALO_LOTE_MS, self._passo)
+                    return
+        except tk.TclError:
+            if self._existe():
+                raise  # erro real da linha (iid repetido, valores inválidos…)
+            logging.debug("Treeview destruído durante a inserção em lotes")
+            return
+        self._terminar()
+
+    def concluir(self) -> None:
+        if self.concluida:
+            return
+        if self._agendado is not None:
+            self.tree.after_cancel(self._agendado)
+            self._agendado = None
+        for linha in self._linhas:
+            self._inserir(linha)
+        self._terminar()
+
+    def cancelar(self) -> None:
+        if self._agendado is not None:
+            try:
+                self.tree.after_cancel(self._agendado)
+            except tk.TclError:
+                if self._existe():
+                    raise
+            self._agendado = None
+
+
+def inserir_em_lotes(tree, linhas: Iterable[Linha], ao_terminar: Optional[Callable[[], None]] = None
+                     ) -> InsercaoEmLotes:
+    return InsercaoEmLotes(tree, linhas, ao_terminar).iniciar()
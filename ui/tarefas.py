@@ -0,0 +1,191 @@
+from __future__ import annotations
+import queue
+import logging
+import threading
+import tkinter as tk
+from tkinter import ttk, messagebox
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+INTERVALO_FILA_MS = 50
+TAREFAS_WORKERS = 2
+
+
+class TarefaCancelada(Exception):
+    pass
+
+
+class Tarefa:
+    """
+    Uma função rodando fora do loop do Tk.
+
+    A função recebe a tarefa como primeiro argumento e pode chamar
+    tarefa.progresso(feito, total) (que também serve de ponto de cancelamento)
+    ou tarefa.verificar() em laços longos.
+    """
+
+    def __init__(self, executor: "ExecutorTarefas"):
+        self._executor = executor
+        self._cancelar = threading.Event()
+
+    @property
+    def cancelada(self) -> bool:
+        return self._cancelar.is_set()
+
+    def cancelar(self) -> None:
+        self._cancelar.set()
+
+    def verificar(self) -> None:
+        if self._cancelar.is_set():
+            raise TarefaCancelada()
+
+    def progresso(self, feito: int, total: int) -> None:
+        self.verificar()
+        self._executor._fila.put((self, "progresso", (feito, total)))
+
+
+class ExecutorTarefas:
+    """
+    Threads de trabalho + fila lida pelo loop do Tk via after().
+
+    Todos os callbacks (ao_concluir, ao_erro, ao_progresso, ao_cancelar) rodam na
+    thread do Tk, então podem mexer em widgets. Sem ao_erro, a exceção vira um
+    messagebox.showerror. A fila só é consultada enquanto há tarefas em andamento.
+    """
+
+    def __init__(self, widget: tk.Misc, max_workers: int = TAREFAS_WORKERS,
+                 intervalo_ms: int = INTERVALO_FILA_MS):
+        self._widget = widget
+        self._intervalo = intervalo_ms
+        self._fila: "queue.Queue[tuple]" = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tarefa-tk")
+        self._callbacks: dict[Tarefa, dict] = {}
+        self._lendo = False
+
+    def executar(
+        self,
+        funcao: Callable,
+        *args,
+        ao_concluir: Optional[Callable] = None,
+        ao_erro: Optional[Callable[[BaseException], None]] = None,
+        ao_progresso: Optional[Callable[[int, int], None]] = None,
+        ao_cancelar: Optional[Callable[[], None]] = None,
+        titulo_erro: str = "Falha na operação",
+        **kwargs,
+    ) -> Tarefa:
+        tarefa = Tarefa(self)
+        self._callbacks[tarefa] = {
+            "concluido": ao_concluir, "erro": ao_erro, "progresso": ao_progresso,
+            "cancelado": ao_cancelar, "titulo_erro": titulo_erro,
+        }
+
+        def _rodar():
+            try:
+                resultado = funcao(tarefa, *args, **kwargs)
+            except TarefaCancelada:
+                self._fila.put((tarefa, "cancelado", ()))
+            except BaseException as e:
+                logging.exception("Falha em tarefa de segundo plano %s", getattr(funcao, "__name__", funcao))
+                self._fila.put((tarefa, "erro", (e,)))
+            else:
+                # cancelamento só vale se a função o verificou; senão o resultado é entregue
+                self._fila.put((tarefa, "concluido", (resultado,)))
+
+        self._pool.submit(_rodar)
+        if not self._lendo:
+            self._lendo = True
+            self._widget.after(self._intervalo, self._ler_fila)
+        return tarefa
+
+    def _ler_fila(self) -> None:
+        progresso: dict[Tarefa, tuple] = {}
+        while True:
+            try:
+                tarefa, evento, args = self._fila.get_nowait()
+            except queue.Empty:
+                break
+            if evento == "progresso":
+                progresso[tarefa] = args  # só o último valor de cada tarefa interessa
+                continue
+            progresso.pop(tarefa, None)
+            cbs = self._callbacks.pop(tarefa, {})
+            try:
+                if evento == "erro" and cbs.get("erro") is None:
+                    messagebox.showerror("Erro", f"{cbs.get('titulo_erro', 'Falha')}:\n{args[0]}")
+                elif cbs.get(evento):
+                    cbs[evento](*args)
+            except Exception:
+                logging.exception("Falha no callback da tarefa (%s)", evento)
+        for tarefa, args in progresso.items():
+            cb = self._callbacks.get(tarefa, {}).get("progresso")
+            if cb:
+                cb(*args)
+
+        if self._callbacks:
+            self._widget.after(self._intervalo, self._ler_fila)
+        else:
+            self._lendo = False
+
+
+_executores: dict[str, ExecutorTarefas] = {}
+
+
+def executor_tk(widget: tk.Misc) -> ExecutorTarefas:
+    """Executor único por Tk raiz (o after() fica na raiz, que vive mais que as Toplevel)."""
+    raiz = widget._root()
+    ex = _executores.get(str(raiz))
+    if ex is None or ex._widget is not raiz:
+        ex = _executores[str(raiz)] = ExecutorTarefas(raiz)
+    return ex
+
+
+class JanelaProgresso:
+    """Janela modal com barra de progresso e botão Cancelar ligado a uma Tarefa."""
+
+    def __init__(self, master: tk.Misc, titulo: str, texto: str = "", indeterminada: bool = False):
+        self.win = tk.Toplevel(master)
+        self.win.title(titulo)
+        self.win.transient(master)
+        self.win.resizable(False, False)
+        self.win.protocol("WM_DELETE_WINDOW", self._cancelar)
+        self.tarefa: Optional[Tarefa] = None
+
+        self.lbl = ttk.Label(self.win, text=texto, width=60)
+        self.lbl.pack(padx=20, pady=(15, 5), anchor="w")
+        self.barra = ttk.Progressbar(self.win, length=420,
+                                     mode="indeterminate" if indeterminada else "determinate")
+        self.barra.pack(padx=20, pady=5)
+        self.btn = ttk.Button(self.win, text="Cancelar", command=self._cancelar)
+        self.btn.pack(pady=(5, 15))
+        if indeterminada:
+            self.barra.start(15)
+        self.win.grab_set()
+
+    def ligar(self, tarefa: Tarefa) -> Tarefa:
+        self.tarefa = tarefa
+        return tarefa
+
+    def atualizar(self, feito: int, total: int, texto_final: str = "") -> None:
+        if not total:
+            return
+        self.barra.configure(maximum=total, value=feito)
+        if feito >= total and texto_final:
+            # passou do ponto em que dá para cancelar
+            self.btn.configure(state="disabled")
+            self.lbl.configure(text=texto_final)
+        else:
+            self.lbl.configure(text=f"{feito / (1024 * 1024):.1f} de {total / (1024 * 1024):.1f} MB "
+                                    f"({100 * feito / total:.0f}%)")
+
+    def _cancelar(self) -> None:
+        if self.tarefa is not None and not self.tarefa.cancelada:
+            self.tarefa.cancelar()
+            self.btn.configure(state="disabled")
+            self.lbl.configure(text="Cancelando…")
+
+    def fechar(self) -> None:
+        try:
+            self.win.grab_release()
+            self.win.destroy()
+        except tk.TclError:
+            pass
@@ -1,31 +1,39 @@
 from __future__ import annotations
-import re
 import os
 import sys
 import json
-import shutil
-import hashlib
 import logging
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-from openpyxl import Workbook, load_workbook
-from openpyxl.worksheet.datavalidation import DataValidation
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict
+from utils.nomenclatura import compilar_nomenclatura, MISMATCH, MISSING
+from utils.registros import REGISTROS, RegistroArquivo, extrair_lote
+from ui.tarefas import executor_tk, JanelaProgresso
+from ui.tabela_lotes import inserir_em_lotes
+from utils.varredura import subpastas
+from utils.indice_projeto import indice_para_projeto
+from utils.precalculo import precalculo_do_lote, assinatura_esquema
+from utils.busca_projetos import IndiceBusca
+# o fluxo de entrega (sem tkinter) fica em utils.entrega; os nomes são reexportados aqui
+from utils.entrega import (
+    JSON_CONTADORES_DIR, CATALOGO_DB, PROJETOS_JSON, NOMENCLATURA_REGRAS_JSON, HISTORICO_JSON,
+    TEMPLATE_XLSX, PASTA_DISCIPLINAS, PASTA_ENTREGAS, AP_PREFIX, PE_PREFIX, ENTREGA_RE,
+    obter_entrega_anterior, listar_arquivos_entrega, comparar_arquivos, gerar_arquivo_controle,
+    salvar_historico_global_entregas, processar_entrega_arquivos_tipo, carregar_regras_nomenclatura,
+    caminho_contador, obter_proximo_indice, incrementar_indice, definir_proximo_indice,
+    carregar_historico_entregas,
+    atualizar_historico, split_including_separators, verificar_tokens, identificar_revisoes,
+    criar_arquivo_controle, localizar_pasta_entregas, _catalogo_projeto, validador_projeto,
+    regressoes_do_lote,
+)
 
 # --------------------- CONFIGURAÇÕES ---------------------
-JSON_CONTADORES_DIR = r"G:\Drives compartilhados\OAE - SCRIPTS\SCRIPTS\tmp_joaoG\JSON_tmp_joao"
-PROJETOS_JSON = r"G:\Drives compartilhados\OAE-JSONS\diretorios_projetos.json"
 SCRIPT_DIR = Path(__file__).parent
-NOMENCLATURA_REGRAS_JSON = r"G:\Drives compartilhados\OAE - SCRIPTS\SCRIPTS\tmp_joaoG\Melhorias\Código_reformulado_teste\OAE_ENG\nomenclaturas.json"
 ULTIMO_DIRETORIO_JSON = "ultimo_diretorio.json"
-HISTORICO_JSON = "historico_arquivos.json"
 JSON_FILE_PATH = "dados_projetos.json"
 MARGIN_SIZE = 10
-TEMPLATE_XLSX = Path(__file__).with_name("GRD_template.xlsx")
+ATRASO_BUSCA_MS = 150  # pausa na digitação antes de filtrar os projetos
 print("DEBUG-PATH:", TEMPLATE_XLSX)
 
 
@@ -40,195 +48,17 @@ logging.basicConfig(
     ]
 )
 
-AP_PREFIX = "1.AP - Entrega-"
-PE_PREFIX = "2.PE - Entrega-"
-ENTREGA_RE = re.compile(r"^(1\.AP|2\.PE) - Entrega-(\d+)$")
-
 
 # -----------------------------------------------------
 # FUNÇÕES AUXILIARES ORIGINAIS
 # -----------------------------------------------------
-def _listar_entregas_tipo(pasta: Path, prefixo: str) -> list[Path]:
-    return sorted(
-        [p for p in pasta.iterdir()
-         if p.is_dir() and p.name.startswith(prefixo) and not p.name.endswith("-OBSOLETO")],
-        key=lambda p: int(ENTREGA_RE.match(p.name).group(2))
-    )
-
-def _proximo_num_entrega(pasta_entregas: Path, prefixo: str) -> int:
-    ativas = _listar_entregas_tipo(pasta_entregas, prefixo)
-    if not ativas:
-        return 1
-    ultimo = ENTREGA_RE.match(ativas[-1].name)
-    return int(ultimo.group(2)) + 1
-
-def _marcar_obsoleta(p: Path):
-    destino = p.with_name(p.name + "-OBSOLETO")
-    seq = 1
-    while destino.exists():
-        seq += 1
-        destino = p.with_name(p.name + f"-OBSOLETO{seq}")
-    p.rename(destino)
-    logging.info("Renomeada %s ➜ %s", p.name, destino.name)
-
-def _hash_file(path: Path, buf=8192) -> str:
-    h = hashlib.md5()
-    with path.open("rb") as f:
-        while chunk := f.read(buf):
-            h.update(chunk)
-    return h.hexdigest()
-
-def obter_entrega_anterior(pasta_entregas: Path) -> Optional[Path]:
-    entregas = sorted(
-        [p for p in pasta_entregas.iterdir()
-         if p.is_dir()
-         and p.name.startswith("Entrega_")
-         and p.name.split("_")[1][:2].isdigit()
-         and not p.name.endswith("_OBS")],
-        key=lambda p: int(p.name.split("_")[1][:2])
-    )
-    return entregas[-1] if entregas else None
-
-def listar_arquivos_entrega(pasta: Path) -> list[Path]:
-    return [p for p in pasta.iterdir() if p.is_file()]
-
-def comparar_arquivos(pasta_nova: Path, pasta_ant: Optional[Path]) -> dict:
-    atual     = {p.name: p for p in listar_arquivos_entrega(pasta_nova)}
-    anterior  = {p.name: p for p in listar_arquivos_entrega(pasta_ant)} if pasta_ant else {}
-    resultado: Dict[str, dict] = {}
-
-    for nome, p in atual.items():
-        if nome == "_controle_entrega.json":
-            continue
-        if nome in anterior:
-            ig = _hash_file(p) == _hash_file(anterior[nome])
-            resultado[nome] = {
-                "status": "nao_modificado" if ig else "modificado",
-                "versao_anterior": str(anterior[nome])
-            }
-        else:
-            resultado[nome] = {"status": "novo"}
-
-    for nome, p_old in anterior.items():
-        if nome not in resultado and nome != "_controle_entrega.json":
-            resultado[nome] = {"status": "removido", "versao_anterior": str(p_old)}
-    return resultado
-
-def gerar_arquivo_controle(nova_pasta: Path, comparacao: dict):
-    with (nova_pasta / "_controle_entrega.json").open("w",  encoding="utf-8") as f:
-        json.dump(comparacao, f, indent=4, ensure_ascii=False)
-
-def salvar_historico_global_entregas(pasta_entregas: Path, registro: dict):
-    historico_path = pasta_entregas / "historico_entregas.json"
-    historico = []
-    if historico_path.exists():
-        with open(historico_path, "r", encoding="utf-8") as f:
-            try:
-                historico = json.load(f)
-            except Exception:
-                historico = []
-    historico.append(registro)
-    with open(historico_path, "w", encoding="utf-8") as f:
-        json.dump(historico, f, indent=4, ensure_ascii=False)
-
-def processar_entrega_arquivos_tipo(arquivos: list[Path], pasta_entregas: Path, tipo: str) -> Path:
-    tipo_subpasta = 'AP' if tipo == "AP" else 'PE'
-    pasta_tipo = pasta_entregas / tipo_subpasta
-    pasta_tipo.mkdir(exist_ok=True, parents=True)
-
-    prefixo = AP_PREFIX if tipo == "AP" else PE_PREFIX
-    etapa = 1 if tipo == "AP" else 2
-
-    ativas = _listar_entregas_tipo(pasta_tipo, prefixo)
-    entrega_ativa = ativas[-1] if ativas else None
-
-    n     = _proximo_num_entrega(pasta_tipo, prefixo)
-    nova  = pasta_tipo / f"{prefixo}{n}"
-    nova.mkdir(parents=True, exist_ok=False)
-    logging.debug("Criada nova entrega: %s", nova)
-
-    comp = comparar_arquivos(nova, entrega_ativa)
-
-    if entrega_ativa:
-        _marcar_obsoleta(entrega_ativa)
-
-    for src in arquivos:
-        shutil.copy2(src, nova / src.name)
-
-    comp.update({"tipo_entrega": tipo, "etapa": etapa})
-    with (nova / "_controle_entrega.json").open("w", encoding="utf-8") as f:
-        json.dump(comp, f, indent=4, ensure_ascii=False)
-
-    registro_historico = {
-        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "tipo_entrega": tipo,
-        "etapa": etapa,
-        "pasta_entrega": str(nova),
-        "arquivos_entregues": [src.name for src in arquivos],
-    }
-    salvar_historico_global_entregas(pasta_entregas, registro_historico)
-
-    try:
-        criar_arquivo_controle(pasta_entregas)
-        logging.debug("GRD.xlsx atualizado em %s", pasta_entregas)
-    except Exception:
-        logging.exception("Falha ao gerar GRD.xlsx")
-
-    return nova
-
-def carregar_regras_nomenclatura(projeto_num: str) -> dict:
-    """
-    Lê o JSON completo e retorna apenas o dicionário de 'campos' para o projeto.
-    Se não existir, retorna {}.
-    """
-    if not os.path.exists(NOMENCLATURA_REGRAS_JSON):
-        logging.warning("Arquivo %s não encontrado", NOMENCLATURA_REGRAS_JSON)
-        return {}
-    try:
-        with open(NOMENCLATURA_REGRAS_JSON, encoding="utf-8") as f:
-            todas_regras = json.load(f)
-    except json.JSONDecodeError as e:
-        logging.error("JSON inválido em %s – %s", NOMENCLATURA_REGRAS_JSON, e)
-        return {}
-
-    projeto_key = str(projeto_num)
-    projeto_entry = todas_regras.get(projeto_key)
-    if not projeto_entry or "campos" not in projeto_entry:
-        logging.warning("Nenhuma regra encontrada para o projeto %s", projeto_key)
-        return {}
-    return projeto_entry  # será um dict com "campos": [...] e possivelmente "REVISÃO_ESPECIAL"
-
-def caminho_contador(projeto_num: str) -> str:
-    os.makedirs(JSON_CONTADORES_DIR, exist_ok=True)
-    return os.path.join(JSON_CONTADORES_DIR, f"contador_entregas_{projeto_num}.json")
-
-def obter_proximo_indice(projeto_num: str) -> int:
-    fp = caminho_contador(projeto_num)
-    data = carregar_json(fp) or {"proximo": 1}
-    return data["proximo"]
-
-def incrementar_indice(projeto_num: str):
-    fp = caminho_contador(projeto_num)
-    data = carregar_json(fp) or {"proximo": 1}
-    data["proximo"] += 1
-    salvar_json(fp, data)
-
-def carregar_historico_entregas(projeto_num: str) -> dict:
-    fp = caminho_contador(projeto_num)
-    if os.path.exists(fp):
-        with open(fp, "r", encoding="utf-8") as f:
-            dados = json.load(f)
-    else:
-        dados = {}
-    dados.setdefault("proximo", 1)
-    dados.setdefault("entregas", [])
-    return dados
-
 def salvar_historico_entregas(projeto_num: str, data: dict) -> None:
-    fp = caminho_contador(projeto_num)
     try:
-        with open(fp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        definir_proximo_indice(projeto_num, data.get("proximo", 1))
+        cat = _catalogo_projeto(projeto_num)
+        for reg in data.get("entregas", []):
+            if "pasta_entrega" in reg and "arquivos_entregues" in reg:
+                cat.registrar_entrega(projeto_num, Path(reg["pasta_entrega"]).parent.parent, reg)
     except Exception as err:
         messagebox.showerror("Erro", f"Falha ao salvar histórico de entregas:\n{err}")
         raise SystemExit
@@ -254,103 +84,11 @@ def salvar_ultimo_diretorio(d):
     with open(ULTIMO_DIRETORIO_JSON, "w", encoding="utf-8") as f:
         json.dump({"ultimo_diretorio": d}, f)
 
-def atualizar_historico(lista_arquivos, c=HISTORICO_JSON):
-    h = {}
-    if os.path.exists(c):
-        with open(c, "r", encoding="utf-8") as f:
-            h = json.load(f)
-    for arq in lista_arquivos:
-        dm = os.path.getmtime(arq)
-        if arq not in h or h[arq]["data"] != dm:
-            h[arq] = {"numero": len(h)+1, "data": dm, "status": "Atual"}
-    mr = max(h, key=lambda x: h[x]["data"])
-    for a in h:
-        h[a]["status"] = "Atual" if a == mr else "Obsoleto"
-    with open(c, "w", encoding="utf-8") as f:
-        json.dump(h, f, indent=4, ensure_ascii=False)
-    return h
-
 def pos_processamento(*args):
     messagebox.showinfo("Concluído", "Processo concluído com sucesso.")
     sys.exit(0)
 
 
-# -----------------------------------------------------
-# FUNÇÕES DE TOKENIZAÇÃO E VALIDAÇÃO 
-# -----------------------------------------------------
-def split_including_separators(nome_sem_ext: str, nomenclatura: dict) -> list[str]:
-    tokens: list[str] = []
-    i = 0
-    while i < len(nome_sem_ext):
-        c = nome_sem_ext[i]
-        if c in ['-', '.']:
-            tokens.append(c)
-            i += 1
-        else:
-            j = i
-            while j < len(nome_sem_ext) and nome_sem_ext[j] not in ['-', '.']:
-                j += 1
-            tokens.append(nome_sem_ext[i:j])
-            i = j
-    return tokens
-
-def verificar_tokens(tokens: list[str], nomenclatura: dict) -> list[str]:
-    if not nomenclatura or "campos" not in nomenclatura:
-        return ["mismatch"] * len(tokens)
-
-    campos_cfg = nomenclatura["campos"]
-    tokens_esperados: list[tuple[str, dict | str]] = []
-    for idx, cinfo in enumerate(campos_cfg):
-        tokens_esperados.append(("campo", cinfo))
-        if idx < len(campos_cfg) - 1:
-            sep_ = cinfo.get("separador", "-")
-            tokens_esperados.append(("sep", sep_))
-
-    result_tags: list[str] = []
-    idx_exp = 0
-    idx_tok = 0
-
-    while idx_tok < len(tokens) and idx_exp < len(tokens_esperados):
-        t = tokens[idx_tok]
-        tipo_esp, conteudo_esp = tokens_esperados[idx_exp]
-
-        if tipo_esp == "sep":
-            if t == conteudo_esp:
-                result_tags.append("ok")
-            else:
-                result_tags.append("mismatch")
-            idx_tok += 1
-            idx_exp += 1
-        else:
-            cinfo = conteudo_esp
-            tipo_campo = cinfo.get("tipo", "Fixo")
-            fixos = cinfo.get("valores_fixos", [])
-            if tipo_campo == "Fixo" and fixos:
-                lista_val_permitido = []
-                for f in fixos:
-                    if isinstance(f, dict):
-                        lista_val_permitido.append(f.get("value", ""))
-                    else:
-                        lista_val_permitido.append(str(f))
-                if lista_val_permitido and t not in lista_val_permitido:
-                    result_tags.append("mismatch")
-                else:
-                    result_tags.append("ok")
-            else:
-                result_tags.append("ok")
-            idx_tok += 1
-            idx_exp += 1
-
-    while idx_tok < len(tokens):
-        result_tags.append("mismatch")
-        idx_tok += 1
-    while idx_exp < len(tokens_esperados):
-        result_tags.append("missing")
-        idx_exp += 1
-
-    return result_tags
-
-
 # -----------------------------------------------------
 # FLUXO DE JANELAS
 # -----------------------------------------------------
@@ -369,17 +107,39 @@ def janela_selecao_projeto(master):
         p_conv.append((num, nm, c_full))
     sel = {"numero": None, "caminho": None}
 
+    indice_busca = IndiceBusca(p_conv)
+    busca = {"agendada": None, "ultima": None}
+
+    def filtrar_agora():
+        busca["agendada"] = None
+        consulta = entrada.get()
+        if consulta == busca["ultima"]:
+            return
+        busca["ultima"] = consulta
+        # as linhas já existem (iid = posição em p_conv): só as que mudam são desanexadas/movidas
+        novos = [str(i) for i in indice_busca.buscar(consulta)]
+        manter = set(novos)
+        fora = [iid for iid in tree.get_children() if iid not in manter]
+        if fora:
+            tree.detach(*fora)
+        if list(tree.get_children()) != novos:
+            for pos, iid in enumerate(novos):
+                tree.move(iid, "", pos)
+        if len(novos) == 1:
+            tree.selection_set(novos[0])
+        elif novos:
+            tree.see(novos[0])
+
     def filtrar(*args):
-        t = entrada.get().lower()
-        tree.delete(*tree.get_children())
-        for n, nm, co in p_conv:
-            if t in nm.lower():
-                tree.insert("", tk.END, values=(n, nm, co))
-        all_iid = tree.get_children()
-        if len(all_iid) == 1:
-            tree.selection_set(all_iid[0])
+        # espera uma pausa na digitação antes de buscar
+        if busca["agendada"] is not None:
+            root.after_cancel(busca["agendada"])
+        busca["agendada"] = root.after(ATRASO_BUSCA_MS, filtrar_agora)
 
     def confirmar():
+        if busca["agendada"] is not None:
+            root.after_cancel(busca["agendada"])
+            filtrar_agora()
         si = tree.selection()
         if not si:
             messagebox.showinfo("Info", "Selecione um projeto.")
@@ -408,8 +168,8 @@ def janela_selecao_projeto(master):
     tree.column("Caminho Original", width=0, stretch=False, minwidth=0)
     tree.pack(fill=tk.BOTH, expand=True)
 
-    for n, nm, co in p_conv:
-        tree.insert("", tk.END, values=(n, nm, co))
+    for i, (n, nm, co) in enumerate(p_conv):
+        tree.insert("", tk.END, iid=str(i), values=(n, nm, co))
 
     bf = tk.Frame(frame)
     bf.pack(pady=5)
@@ -420,7 +180,7 @@ def janela_selecao_projeto(master):
 
 
 def Disciplinas_Detalhes_Projeto(numero, caminho, master=None):
-    d_path = os.path.join(caminho, "3 Desenvolvimento")
+    d_path = os.path.join(caminho, PASTA_DISCIPLINAS)
     if not os.path.exists(d_path):
         messagebox.showerror("Erro", "A pasta de disciplinas não foi encontrada.")
         return
@@ -444,14 +204,47 @@ def Disciplinas_Detalhes_Projeto(numero, caminho, master=None):
         tree.heading(c, text=c)
         tree.column(c, width=200 if c == "Nome" else 150, anchor="w")
 
-    disc = []
-    for it in os.listdir(d_path):
-        fp = os.path.join(d_path, it)
-        if os.path.isdir(fp):
-            mt = datetime.fromtimestamp(os.path.getmtime(fp)).strftime("%d/%m/%Y %H:%M")
-            disc.append((it, mt, "Pasta", "--"))
-    for d in disc:
-        tree.insert("", tk.END, values=d)
+    indice = indice_para_projeto(caminho)
+
+    def _listar_disciplinas(tarefa):
+        if indice.vazio:
+            # 1ª visita: as disciplinas aparecem conforme lidas; o índice é montado em seguida
+            for e in subpastas(d_path):
+                fila_disc.append((e.name, e.stat().st_mtime_ns))
+                tarefa.progresso(0, 0)
+        return indice.atualizar()
+
+    fila_disc: list[tuple] = []
+
+    def _linha_disciplina(nome, mtime_ns):
+        mt = datetime.fromtimestamp(max(mtime_ns, 0) / 1e9).strftime("%d/%m/%Y %H:%M")
+        return (nome, mt, "Pasta", "--")
+
+    def _mostrar_disciplinas(*_):
+        if not tree.winfo_exists():
+            return
+        if tree.exists("carregando") and fila_disc:
+            tree.delete("carregando")
+        while fila_disc:
+            tree.insert("", tk.END, values=_linha_disciplina(*fila_disc.pop(0)))
+
+    def _fim_listagem(resumo):
+        if not tree.winfo_exists():
+            return
+        if resumo["alterado"] or tree.exists("carregando"):
+            fila_disc.clear()
+            tree.delete(*tree.get_children())
+            for nome, mtime_ns in indice.disciplinas():
+                tree.insert("", tk.END, values=_linha_disciplina(nome, mtime_ns))
+
+    if indice.vazio:
+        tree.insert("", tk.END, iid="carregando", values=("Carregando…", "", "", ""))
+    else:
+        # visitas seguintes: a tela sai direto do índice; a conferência roda em segundo plano
+        for nome, mtime_ns in indice.disciplinas():
+            tree.insert("", tk.END, values=_linha_disciplina(nome, mtime_ns))
+    executor_tk(discip_win).executar(_listar_disciplinas, ao_progresso=_mostrar_disciplinas,
+                                     ao_concluir=_fim_listagem, titulo_erro="Falha ao listar as disciplinas")
 
     def confirmar_selecao_arquivos():
         s = tree.selection()
@@ -465,18 +258,9 @@ def Disciplinas_Detalhes_Projeto(numero, caminho, master=None):
             messagebox.showerror("Erro", f"A pasta da disciplina '{p_disc}' não foi encontrada.")
             return
 
-        expected_folder = "1.ENTREGAS"
-        match_entrega = None
-
-        def normalize(n):
-            return n.lower().replace(" ", "").replace("-", "").replace("_", "").replace(".", "")
-
-        for folder in os.listdir(p_disc):
-            if normalize(folder) == normalize(expected_folder):
-                match_entrega = folder
-                break
+        match_entrega = indice.pasta_entregas(disc_nome, PASTA_ENTREGAS) or localizar_pasta_entregas(p_disc)
         if not match_entrega:
-            messagebox.showerror("Erro", f"A pasta de entrega '{expected_folder}' não foi encontrada.")
+            messagebox.showerror("Erro", f"A pasta de entrega '{PASTA_ENTREGAS}' não foi encontrada.")
             return
 
         p_ent = os.path.join(p_disc, match_entrega)
@@ -492,12 +276,7 @@ def Disciplinas_Detalhes_Projeto(numero, caminho, master=None):
             messagebox.showwarning("Atenção", "Nenhum arquivo foi selecionado.")
             return
 
-        proc = []
-        for arq in sel_arq:
-            n_arq = os.path.basename(arq)
-            d_ext = extrair_dados_arquivo(n_arq)
-            d_ext["caminho"] = arq
-            proc.append(d_ext)
+        proc = REGISTROS.obter_lote(sel_arq)
         if not proc:
             messagebox.showerror("Erro", "Nenhum dado foi processado.")
             return
@@ -538,63 +317,21 @@ def salvar_json(fp, data):
         messagebox.showerror("Erro", f"Falha ao salvar dados em JSON: {e}")
 
 def extrair_dados_arquivo(nome_arquivo):
-    nb, ext = os.path.splitext(nome_arquivo)
-    pt = nb.split('-')
-    try:
-        cr = pt[7] if len(pt)>7 else ""
-        if '.' in cr:
-            cs = cr.split('.')
-            conj = cs[0]
-            num_doc = cs[1]
-        else:
-            conj = cr
-            num_doc = ""
-        d = {
-            "Status": pt[0] if len(pt)>0 else "",
-            "Cliente": pt[1] if len(pt)>1 else "",
-            "N° do Projeto": pt[2] if len(pt)>2 else "",
-            "Organização": pt[3] if len(pt)>3 else "",
-            "Sigla da Disciplina": pt[4] if len(pt)>4 else "",
-            "Fase": pt[5] if len(pt)>5 else "",
-            "Tipo de Documento": pt[6] if len(pt)>6 else "",
-            "Conjunto": conj,
-            "N° do Documento": num_doc,
-            "Bloco": pt[8] if len(pt)>8 else "",
-            "Pavimento": pt[9] if len(pt)>9 else "",
-            "Subsistema": pt[10] if len(pt)>10 else "",
-            "Tipo do Desenho": pt[11] if len(pt)>11 else "",
-            "Revisão": pt[12] if len(pt)>12 else "",
-            "Nome do Arquivo": nome_arquivo,
-            "Extensão": ext.strip('-'),
-            "Modificação": datetime.now().strftime("%d/%m/%Y"),
-            "Modificado por": "Usuário"
-        }
-    except IndexError:
-        d = {
-            "Status": "",
-            "Cliente": "",
-            "N° do Projeto": "",
-            "Organização": "",
-            "Sigla da Disciplina": "",
-            "Fase": "",
-            "Tipo de Documento": "",
-            "Conjunto": "",
-            "N° do Documento": "",
-            "Bloco": "",
-            "Pavimento": "",
-            "Subsistema": "",
-            "Tipo do Desenho": "",
-            "Revisão": "",
-            "Nome do Arquivo": nome_arquivo,
-            "Extensão": ext.strip('-'),
-            "Modificação": datetime.now().strftime("%d/%m/%Y"),
-            "Modificado por": "Usuário"
-        }
-    return d
+    """Dict antigo (18 chaves) de um nome de arquivo; as telas usam REGISTROS.obter_lote."""
+    return extrair_lote([nome_arquivo])[0].como_dict()
+
+
+def _valores_tabela(reg) -> tuple:
+    return (
+        reg.status, reg.nome, reg.extensao, reg.num_documento, reg.fase, reg.tipo_documento,
+        reg.revisao, reg.modificacao, reg.modificado_por,
+        "",  # campo "Entrega" temporário
+        reg.caminho,
+    )
 
 def exibir_interface_tabela(
     numero: str,
-    arquivos_previos: list[dict] | None = None,
+    arquivos_previos: list[RegistroArquivo] | None = None,
     caminho_projeto: str | None = None,
     pasta_entrega: str | None = None,
     master=None
@@ -626,25 +363,35 @@ def exibir_interface_tabela(
     cp.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
 
     def fazer_analise_nomenclatura():
-        la = []
-        for it in tabela.get_children():
-            v = tabela.item(it)["values"]
-            n_arq = v[1]
-            cmin = v[10]
-            dx = extrair_dados_arquivo(n_arq)
-            dx["caminho"] = cmin
-            la.append(dx)
+        _concluir_insercoes()
+        la = REGISTROS.obter_lote(tabela.get_children())
         if not la:
             messagebox.showinfo("Aviso", "Nenhum arquivo adicionado para análise.")
-        else:
+            return
+
+        # as regras vêm do drive compartilhado: carregadas fora do loop do Tk
+        prog = JanelaProgresso(exibir_win, "Nomenclatura", "Carregando regras de nomenclatura…",
+                               indeterminada=True)
+
+        def _abrir(esquema):
+            prog.fechar()
+            if prog.tarefa.cancelada:
+                return
             exibir_win.withdraw()
             tela_analise_nomenclatura(
                 numero,              # passamos o número do projeto
                 la,
                 pasta_entrega=pasta_entrega,
-                master=exibir_win
+                master=exibir_win,
+                esquema=esquema,
             )
 
+        prog.ligar(executor_tk(exibir_win).executar(
+            lambda _t: carregar_regras_nomenclatura(numero),
+            ao_concluir=_abrir,
+            ao_erro=lambda e: (prog.fechar(), messagebox.showerror("Erro", f"Falha ao carregar regras:\n{e}")),
+        ))
+
     lbl_i = tk.Label(cp, text="Adicionar Arquivos para Entrega",
                      font=("Helvetica",15,"bold"), anchor="w")
     lbl_i.place(x=10, y=10)
@@ -672,35 +419,35 @@ def exibir_interface_tabela(
     )
     tabela.pack(fill=tk.BOTH, expand=True)
 
+    # o iid de cada linha é o caminho do arquivo, chave do REGISTROS
+    # milhares de arquivos: linhas inseridas em lotes entre eventos do Tk
+    na_tabela: set[str] = set()
+    insercoes: list = []
+
+    def _inserir_registros(registros):
+        novos = [reg for reg in registros if reg.caminho not in na_tabela]
+        na_tabela.update(reg.caminho for reg in novos)
+        insercoes.append(inserir_em_lotes(
+            tabela, ((reg.caminho, _valores_tabela(reg), ()) for reg in novos)))
+
+    def _concluir_insercoes():
+        for ins in insercoes:
+            ins.concluir()
+        insercoes.clear()
+
     if arquivos_previos:
-        for d_ext in arquivos_previos:
-            tabela.insert("", tk.END, values=(
-                d_ext.get("Status",""), d_ext.get("Nome do Arquivo",""), d_ext.get("Extensão",""),
-                d_ext.get("N° do Arquivo",""), d_ext.get("Fase",""), d_ext.get("Tipo de Documento",""),
-                d_ext.get("Revisão",""), d_ext.get("Modificação",""), d_ext.get("Modificado por",""),
-                "",  # campo "Entrega" temporário
-                d_ext.get("caminho","")
-            ))
+        _inserir_registros(arquivos_previos)
 
     def adicionar_arquivos():
         ar = filedialog.askopenfilenames(title="Selecione arquivos")
-        for a in ar:
-            n = os.path.basename(a)
-            dx = extrair_dados_arquivo(n)
-            dx["caminho"] = a
-            tabela.insert("", tk.END, values=(
-                dx.get("Status",""), dx.get("Nome do Arquivo",""), dx.get("Extensão",""),
-                dx.get("N° do Documento",""), dx.get("Fase",""), dx.get("Tipo de Documento",""),
-                dx.get("Revisão",""), dx.get("Modificação",""), dx.get("Modificado por",""),
-                "",  # campo "Entrega"
-                dx.get("caminho","")
-            ))
+        _inserir_registros(REGISTROS.obter_lote(ar))
 
     def remover_arquivo():
         s = tabela.selection()
         if s:
             for i in s:
                 tabela.delete(i)
+                na_tabela.discard(i)
         else:
             messagebox.showinfo("Informação", "Nenhum item selecionado.")
 
@@ -720,9 +467,11 @@ def exibir_interface_tabela(
     ttk.Button(bf3, text="Sair", command=exibir_win.destroy).pack(side=tk.RIGHT, padx=5)
 
 
-def tela_analise_nomenclatura(projeto_num: str, lista_arquivos: list[dict], pasta_entrega: str, master=None):
+def tela_analise_nomenclatura(projeto_num: str, lista_arquivos: list[dict], pasta_entrega: str, master=None,
+                              esquema: dict | None = None):
     logging.debug(">>> INDO PARA tela_analise_nomenclatura: projeto=%s, pasta_entrega=%s, total_arquivos=%d", projeto_num, pasta_entrega, len(lista_arquivos))
-    esquema = carregar_regras_nomenclatura(projeto_num)
+    if esquema is None:
+        esquema = carregar_regras_nomenclatura(projeto_num)
 
     logging.debug("… regras de nomenclatura carregadas: %s", esquema.get("campos", []))
 
@@ -797,36 +546,21 @@ def tela_analise_nomenclatura(projeto_num: str, lista_arquivos: list[dict], past
     tree.tag_configure("mismatch", background="#FF9999")
     tree.tag_configure("missing",  background="#FFFF99")
 
-    for idx, a in enumerate(lista_arquivos):
-        tokens = lista_tokens_por_arquivo[idx]
-        tags_result = verificar_tokens(tokens, esquema)
+    validador = compilar_nomenclatura(esquema)
 
-        row_vals = []
-        row_tags = []
-        for i in range(max_tokens):
-            if i < len(tokens):
-                row_vals.append(tokens[i])
+    def _linhas_validadas():
+        # validação feita linha a linha, conforme a inserção em lotes avança
+        for tokens in lista_tokens_por_arquivo:
+            cod = validador.codigos(tokens)[:max_tokens]
+            if MISMATCH in cod:
+                tag_linha = "mismatch"
+            elif MISSING in cod or len(cod) < max_tokens:
+                tag_linha = "missing"
             else:
-                row_vals.append("")
-
-            if i < len(tags_result):
-                if tags_result[i] == "mismatch":
-                    row_tags.append("mismatch")
-                elif tags_result[i] == "missing":
-                    row_tags.append("missing")
-                else:
-                    row_tags.append("ok")
-            else:
-                row_tags.append("missing")
+                tag_linha = "ok"
+            yield None, tuple(tokens) + ("",) * (max_tokens - len(tokens)), (tag_linha,)
 
-        if any(tg == "mismatch" for tg in row_tags):
-            tag_linha = "mismatch"
-        elif any(tg == "missing" for tg in row_tags):
-            tag_linha = "missing"
-        else:
-            tag_linha = "ok"
-
-        tree.insert("", tk.END, values=row_vals, tags=(tag_linha,))
+    insercao = inserir_em_lotes(tree, _linhas_validadas())
 
     def mostrar_nomenclatura_padrao(nomenclatura_json: dict, lista_arquivos: list[dict], treeview: ttk.Treeview, lista_tokens_por_arquivo: list[list[str]], master=None):
         sel = treeview.selection()
@@ -901,6 +635,7 @@ def tela_analise_nomenclatura(projeto_num: str, lista_arquivos: list[dict], past
 
     def _tentar_avancar(token_window, esquema_json, lista_arquivos_av, pasta_entrega):
         # validação de tokens
+        insercao.concluir()
         for iid in tree.get_children():
             tags_ = tree.item(iid, "tags")
             if "mismatch" in tags_ or "missing" in tags_:
@@ -920,12 +655,13 @@ def tela_analise_nomenclatura(projeto_num: str, lista_arquivos: list[dict], past
             def _on_tipo_escolhido(tipo):
                 # reabilita a janela de tokens (caso ela precise ser mostrada depois)
                 token_window.attributes('-disabled', False)
-                token_window.withdraw()           # agora sim pode esconder
+                # a janela de tokens é escondida quando a verificação de revisão abrir
                 tela_verificacao_revisao(
                     lista_arquivos_av,
                     pasta_entrega,
                     tipo,
-                    master=token_window
+                    master=token_window,
+                    projeto_num=projeto_num
                 )
 
             # abre modal
@@ -964,11 +700,44 @@ def modal_tipo_entrega(master, on_confirm):
     ).pack(pady=(0,12))
 
 
-def tela_verificacao_revisao(lista_arquivos: list[dict], pasta_entrega: str, tipo: str, master=None):
+def tela_verificacao_revisao(lista_arquivos: list[dict], pasta_entrega: str, tipo: str, master=None,
+                             projeto_num: str | None = None):
     logging.debug(">>> INDO PARA tela_verificacao_revisao: tipo=%s, pasta_entrega=%s, num_arquivos=%d", tipo, pasta_entrega, len(lista_arquivos))
 
-    arrv, aobs = identificar_revisoes(lista_arquivos)
+    def _analisar(_tarefa):
+        pre = precalculo_do_lote(a.get("caminho", "") for a in lista_arquivos)
+        validador = validador_projeto(projeto_num)
+        # chaves do vigia só valem se calculadas com as regras atuais do projeto
+        assinatura = assinatura_esquema(carregar_regras_nomenclatura(projeto_num)) if projeto_num else None
+        arrv, aobs = identificar_revisoes(lista_arquivos, pre.chaves_revisao(assinatura) if pre else None, validador)
+        # consulta ao índice de revisões do projeto (catálogo + histórico da 1.ENTREGAS), sem abrir as entregas anteriores
+        regressoes = {r["arquivo"]: r["ultima"] for r in
+                      regressoes_do_lote(projeto_num, [a["Nome do Arquivo"] for a in arrv], validador,
+                                         Path(pasta_entrega))
+                      } if projeto_num else {}
+        return arrv, aobs, regressoes
+
+    # regras e histórico vêm do drive compartilhado: analisados fora do loop do Tk
+    prog = JanelaProgresso(master, "Verificação de Revisão", "Carregando regras e histórico de revisões…",
+                           indeterminada=True)
+
+    def _abrir(resultado):
+        prog.fechar()
+        if prog.tarefa.cancelada:
+            return
+        if master is not None:
+            master.withdraw()
+        _montar_tela_revisao(*resultado, pasta_entrega, tipo, master, projeto_num)
+
+    prog.ligar(executor_tk(prog.win).executar(
+        _analisar,
+        ao_concluir=_abrir,
+        ao_erro=lambda e: (prog.fechar(), messagebox.showerror("Erro", f"Falha ao verificar revisões:\n{e}")),
+    ))
 
+
+def _montar_tela_revisao(arrv: list[dict], aobs: list[dict], regressoes: dict[str, str], pasta_entrega: str,
+                         tipo: str, master, projeto_num: str | None):
     logging.debug("…arquivos revisados: %s | obsoletos: %s", [a["Nome do Arquivo"] for a in arrv], [a["Nome do Arquivo"] for a in aobs])
     
     rev_win = tk.Toplevel(master)
@@ -984,8 +753,14 @@ def tela_verificacao_revisao(lista_arquivos: list[dict], pasta_entrega: str, tip
     tr_r.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
     tr_r.heading("Nome do Arquivo", text="Nome do Arquivo")
     tr_r.heading("Revisão", text="Revisão")
+    tr_r.tag_configure("regressao", background="#FF9999")
     for a in arrv:
-        tr_r.insert("", tk.END, values=(a["Nome do Arquivo"], a["Revisão"]))
+        nome = a["Nome do Arquivo"]
+        tr_r.insert("", tk.END, values=(nome, a["Revisão"]), tags=("regressao",) if nome in regressoes else ())
+    if regressoes:
+        tk.Label(fr_r, fg="red", anchor="w",
+                 text=f"{len(regressoes)} arquivo(s) em vermelho com revisão anterior à última já entregue "
+                      f"(ex.: {next(iter(regressoes.values()))}).").pack(fill=tk.X, padx=10)
 
     fr_o = tk.LabelFrame(rev_win, text="Arquivos Obsoletos")
     fr_o.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -1002,10 +777,14 @@ def tela_verificacao_revisao(lista_arquivos: list[dict], pasta_entrega: str, tip
             master.deiconify()
 
     def confirmar():
-        try:
-            caminhos = [Path(a["caminho"]) for a in (arrv + aobs)]
-            pasta_raiz_entregas = Path(pasta_entrega)
-            nova = processar_entrega_arquivos_tipo(caminhos, pasta_raiz_entregas, tipo)
+        caminhos = [Path(a["caminho"]) for a in (arrv + aobs)]
+        pasta_raiz_entregas = Path(pasta_entrega)
+        dedup = var_dedup.get()
+        prog = JanelaProgresso(rev_win, "Processando entrega", "Copiando arquivos…")
+        btn_confirmar.configure(state="disabled")
+
+        def _concluido(nova):
+            prog.fechar()
             messagebox.showinfo(
                 "Sucesso",
                 f"Nova entrega criada:\n{nova}\n"
@@ -1015,13 +794,36 @@ def tela_verificacao_revisao(lista_arquivos: list[dict], pasta_entrega: str, tip
             if master is not None:
                 master.destroy()
             sys.exit(0)
-        except Exception as e:
+
+        def _falhou(e):
+            prog.fechar()
+            btn_confirmar.configure(state="normal")
             messagebox.showerror("Erro", f"Falha ao processar entrega:\n{e}")
 
+        def _cancelado():
+            prog.fechar()
+            btn_confirmar.configure(state="normal")
+            messagebox.showinfo("Entrega cancelada", "A cópia foi interrompida; nenhuma entrega foi criada.")
+
+        # cópia, hash e GRD fora do loop do Tk; o progresso da cópia é também o ponto de cancelamento
+        prog.ligar(executor_tk(rev_win).executar(
+            lambda tarefa: processar_entrega_arquivos_tipo(
+                caminhos, pasta_raiz_entregas, tipo, on_progresso=tarefa.progresso,
+                dedup=dedup, projeto_num=projeto_num),
+            ao_concluir=_concluido,
+            ao_erro=_falhou,
+            ao_cancelar=_cancelado,
+            ao_progresso=lambda feito, total: prog.atualizar(feito, total, "Gerando controle e GRD…"),
+        ))
+
+    var_dedup = tk.BooleanVar(value=False)
     bf = tk.Frame(rev_win)
     bf.pack(side="bottom", anchor="e", pady=5, padx=10)
+    ttk.Checkbutton(bf, text="Vincular arquivos inalterados (sem nova cópia)",
+                    variable=var_dedup).pack(side=tk.LEFT, padx=5)
     ttk.Button(bf, text="Voltar", command=voltar).pack(side=tk.LEFT, padx=5)
-    ttk.Button(bf, text="Confirmar", command=confirmar).pack(side=tk.RIGHT, padx=5)
+    btn_confirmar = ttk.Button(bf, text="Confirmar", command=confirmar)
+    btn_confirmar.pack(side=tk.RIGHT, padx=5)
     ttk.Button(rev_win, text="Fechar", command=rev_win.destroy).pack(pady=10)
 
     rev_win.mainloop()
@@ -1036,170 +838,6 @@ def _lista_erros_treeview(erros):
         tree.insert("", "end", values=(e,))
     ttk.Button(w, text="Fechar", command=w.destroy).pack(pady=5)
 
-def identificar_revisoes(lista_arquivos):
-    grupos = {}
-    for a in lista_arquivos:
-        nb, _ = os.path.splitext(a["Nome do Arquivo"])
-        t = nb.split("-")
-        if len(t)<2:
-            continue
-        idf = "-".join(t[:-1])
-        rev = t[-1] if t[-1].startswith("R") and t[-1][1:].isdigit() else "R00"
-        grupos.setdefault(idf, []).append((rev, a))
-    arrv = []
-    aobs = []
-    for idf, arqs in grupos.items():
-        arqs.sort(key=lambda x: int(x[0][1:]) if x[0][1:].isdigit() else 0)
-        rm = arqs[-1][1]
-        arrv.append(rm)
-        aobs.extend([q[1] for q in arqs[:-1]])
-    return arrv, aobs
-
-def _calc_md5(path: Path, buf=8192) -> str | None:
-    if not path.exists():
-        return None
-    h = hashlib.md5()
-    with path.open("rb") as f:
-        while chunk := f.read(buf):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def _carregar_status_anterior(pasta_entrega_atual: Path) -> dict[str, dict]:
-    """
-    Varre a entrega anterior (a subpasta imediatamente marcada -OBSOLETO).
-    Retorna dict nome→{"hash":…, "rev": "R03"} para comparação de versões.
-    """
-    ant = None
-    for sib in pasta_entrega_atual.parent.iterdir():
-        if sib.is_dir() and sib.name.endswith("-OBSOLETO"):
-            ant = sib
-    if not ant:
-        return {}
-    res = {}
-    for f in ant.iterdir():
-        if f.is_file():
-            nome = f.name
-            hash_ = _calc_md5(f)
-            rev   = nome.rsplit("-R", 1)[-1] if "-R" in nome else ""
-            res[nome] = {"hash": hash_, "rev": rev}
-    return res
-
-
-def _status_arquivo(arquivo: Path, info_ant: dict) -> str:
-    nome = arquivo.name
-    hash_atual = _calc_md5(arquivo)
-    rev_atual  = nome.rsplit("-R", 1)[-1] if "-R" in nome else ""
-
-    ant = info_ant.get(nome)
-    if ant is None or ant["hash"] is None:          # não existia mais
-        return "novo"
-
-    if hash_atual == ant["hash"]:
-        return "igual"
-    if rev_atual > ant["rev"]:
-        return "revisado"
-    return "mod_sem_rev"
-
-
-def criar_arquivo_controle(pasta_raiz_entregas: str) -> None:
-    """
-    Gera/atualiza GRD.xlsx no layout matricial.
-    Requer existir <pasta>/historico_entregas.json.
-    """
-    hist_json = Path(pasta_raiz_entregas) / "historico_entregas.json"
-    if not hist_json.exists():
-        logging.warning("historico_entregas.json inexistente em %s", pasta_raiz_entregas)
-        return
-    historico = json.loads(hist_json.read_text(encoding="utf-8"))
-    if not historico:
-        logging.info("Histórico vazio, GRD não gerado.")
-        return
-
-    # 1. carrega template
-    wb = load_workbook(TEMPLATE_XLSX)
-    ws = wb.active
-
-    col_inicio_ent = 3  # A=Grupo, B=Extens., C = primeira entrega
-    while ws.cell(row=5, column=col_inicio_ent).value:
-        # apaga o cabeçalho
-        ws.cell(row=5, column=col_inicio_ent).value = None
-        # apaga intervalo de dados (linhas 6-2000, ajuste conforme precisar)
-        for row in ws.iter_rows(min_row=6, max_row=2000,
-                                min_col=col_inicio_ent, max_col=col_inicio_ent):
-            for cell in row:
-                cell.value = None
-                cell.fill  = None
-        col_inicio_ent += 1
-
-    # map cores
-    fill_verde   = PatternFill("solid", fgColor="C6EFCE")
-    fill_azul    = PatternFill("solid", fgColor="9BC2E6")
-    fill_laranja = PatternFill("solid", fgColor="FFC000")
-
-    # 2. descobrir próxima coluna livre
-    col_inicio_ent = 3  # A=Grupo, B=Extens., C = 1ª entrega
-    col_atual = col_inicio_ent
-    while ws.cell(row=5, column=col_atual).value:   # linha 5 tem cabeçalhos de entrega no template
-        col_atual += 1
-
-    # 3. para cada entrega no histórico (na ordem)
-    for ent in historico:
-        tipo   = ent.get("tipo_entrega", "EX")
-        etapa  = ent.get("etapa", 1)
-        idx    = str(col_atual - col_inicio_ent + 1).zfill(2)   # NN
-        cabec  = f"Z.{tipo}.ENT {idx} - ENTREGUE"
-        ws.cell(row=5, column=col_atual, value=cabec)
-
-        # copia largura & validação da coluna anterior (se houver)
-        if col_atual > col_inicio_ent:
-            src_col = get_column_letter(col_atual - 1)
-            dst_col = get_column_letter(col_atual)
-            ws.column_dimensions[dst_col].width = ws.column_dimensions[src_col].width
-            for dv in ws.data_validations.dataValidation:
-                if dv.ranges and src_col in str(dv.ranges):
-                    new_dv = DataValidation(
-                        type=dv.type, formula1=dv.formula1, allow_blank=dv.allow_blank
-                    )
-                    new_dv.add(f"{dst_col}6:{dst_col}2000")   # mesmo range aproximado
-                    ws.add_data_validation(new_dv)
-
-        # coleta info da entrega anterior para definir status/cor
-        pasta_entrega = Path(ent["pasta_entrega"])
-        info_ant = _carregar_status_anterior(pasta_entrega)
-
-        # 3b. preencher linhas (a partir da linha 8 em diante, uma linha por arquivo)
-        linha = 8
-        for nome in ent["arquivos_entregues"]:
-            arq = pasta_entrega / nome
-            extens = arq.suffix.upper()  # ".PDF"
-            status = _status_arquivo(arq, info_ant)
-            cor = {"novo": fill_verde,
-                   "revisado": fill_azul,
-                   "mod_sem_rev": fill_laranja}.get(status)
-
-            # Grupo em branco (col-A)
-            ws.cell(row=linha, column=1, value="")
-
-            # Extens.
-            ws.cell(row=linha, column=2, value=extens)
-
-            # Celula da entrega
-            c = ws.cell(row=linha, column=col_atual, value=nome)
-            if cor:
-                c.fill = cor
-            linha += 1
-
-        col_atual += 1  # próxima entrega → próxima coluna
-
-    # 4. atualiza “Gerado em”
-    ws["B3"].value = datetime.now().strftime("%d/%m/%Y %H:%M")
-
-    # 5. salva
-    out_path = Path(pasta_raiz_entregas) / "GRD.xlsx"
-    wb.save(out_path)
-    logging.info("GRD.xlsx atualizado: %s", out_path)
-
 if __name__ == "__main__":
     root = tk.Tk()
     root.withdraw()
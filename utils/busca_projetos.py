@@ -0,0 +1,107 @@
+from __future__ import annotations
+import re
+import bisect
+import unicodedata
+from typing import Iterable
+
+# pontuação de cada termo da consulta (a soma ordena o resultado)
+PONTOS_NUMERO = 100      # termo é o número do projeto
+PONTOS_PALAVRA = 60      # termo é uma palavra inteira do nome
+PONTOS_PREFIXO = 40      # início de uma palavra
+PONTOS_TRECHO = 20       # trecho no meio do texto (busca antiga por substring)
+PONTOS_APROXIMADO = 10   # trigramas em comum (erro de digitação), multiplicado pela semelhança
+SEMELHANCA_MINIMA = 0.5
+
+_SEPARADORES = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos ('Edifício' ➜ 'edificio')."""
+    decomposto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+def _trigramas(texto: str) -> set[str]:
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceBusca:
+    """
+    Índice montado uma vez para a busca de projetos enquanto se digita.
+
+    Cada item é (número, nome, ...). Guarda as palavras normalizadas em ordem
+    (prefixo por bisect) e um índice de trigramas (trechos e erros de digitação).
+    buscar() exige que todos os termos casem e devolve as posições dos itens,
+    do mais relevante para o menos; empates mantêm a ordem original.
+    """
+
+    def __init__(self, itens: Iterable[tuple]):
+        self.itens = list(itens)
+        self._textos: list[str] = []
+        self._por_numero: dict[str, list[int]] = {}
+        self._palavras: list[tuple[str, int]] = []
+        self._trigramas: dict[str, set[int]] = {}
+        for i, item in enumerate(self.itens):
+            numero, nome = normalizar(item[0]), normalizar(item[1])
+            texto = f"{numero} {nome}"
+            self._textos.append(texto)
+            self._por_numero.setdefault(numero.lstrip("0") or numero, []).append(i)
+            for palavra in set(filter(None, _SEPARADORES.split(texto))):
+                self._palavras.append((palavra, i))
+                for tri in _trigramas(palavra):
+                    self._trigramas.setdefault(tri, set()).add(i)
+        self._palavras.sort()
+
+    def __len__(self):
+        return len(self.itens)
+
+    def _por_prefixo(self, termo: str) -> dict[int, int]:
+        pontos: dict[int, int] = {}
+        pos = bisect.bisect_left(self._palavras, (termo, -1))
+        while pos < len(self._palavras) and self._palavras[pos][0].startswith(termo):
+            palavra, i = self._palavras[pos]
+            p = PONTOS_PALAVRA if palavra == termo else PONTOS_PREFIXO
+            if p > pontos.get(i, 0):
+                pontos[i] = p
+            pos += 1
+        return pontos
+
+    def _pontuar_termo(self, termo: str) -> dict[int, float]:
+        pontos: dict[int, float] = dict(self._por_prefixo(termo))
+        tris = _trigramas(termo)
+        if tris:
+            # candidatos: itens com algum trigrama do termo; trecho confirmado no texto
+            contagem: dict[int, int] = {}
+            for tri in tris:
+                for i in self._trigramas.get(tri, ()):
+                    contagem[i] = contagem.get(i, 0) + 1
+            for i, n in contagem.items():
+                if i in pontos:
+                    continue
+                if n == len(tris) and termo in self._textos[i]:
+                    pontos[i] = PONTOS_TRECHO
+                elif n / len(tris) >= SEMELHANCA_MINIMA:
+                    pontos[i] = PONTOS_APROXIMADO * n / len(tris)
+        else:
+            # termo curto (1–2 letras): trecho por varredura, como a busca antiga
+            for i, texto in enumerate(self._textos):
+                if i not in pontos and termo in texto:
+                    pontos[i] = PONTOS_TRECHO
+        for i in self._por_numero.get(termo.lstrip("0") or termo, ()):
+            pontos[i] = pontos.get(i, 0) + PONTOS_NUMERO
+        return pontos
+
+    def buscar(self, consulta: str) -> list[int]:
+        termos = [t for t in _SEPARADORES.split(normalizar(consulta)) if t]
+        if not termos:
+            return list(range(len(self.itens)))
+        total: dict[int, float] | None = None
+        for termo in termos:
+            pontos = self._pontuar_termo(termo)
+            if total is None:
+                total = pontos
+            else:
+                total = {i: total[i] + p for i, p in pontos.items() if i in total}
+            if not total:
+                return []
+        return sorted(total, key=lambda i: (-total[i], i))
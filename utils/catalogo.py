@@ -0,0 +1,282 @@
+from __future__ import annotations
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from utils.validation import identificar_nome_com_revisao
+from utils.historico import iterar_historico
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projetos (
+    id              INTEGER PRIMARY KEY,
+    numero          TEXT NOT NULL UNIQUE,
+    proximo_indice  INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS entregas (
+    id              INTEGER PRIMARY KEY,
+    projeto_id      INTEGER NOT NULL REFERENCES projetos(id),
+    pasta_entregas  TEXT NOT NULL,
+    pasta_entrega   TEXT NOT NULL UNIQUE,
+    tipo            TEXT,
+    etapa           INTEGER,
+    seq             INTEGER,
+    data            TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_entregas_projeto ON entregas(projeto_id, data);
+CREATE INDEX IF NOT EXISTS ix_entregas_pasta ON entregas(pasta_entregas, seq);
+CREATE TABLE IF NOT EXISTS hashes (
+    digest          TEXT PRIMARY KEY,
+    algoritmo       TEXT NOT NULL DEFAULT 'md5',
+    tamanho         INTEGER
+);
+CREATE TABLE IF NOT EXISTS arquivos (
+    id              INTEGER PRIMARY KEY,
+    entrega_id      INTEGER NOT NULL REFERENCES entregas(id) ON DELETE CASCADE,
+    nome            TEXT NOT NULL,
+    documento       TEXT NOT NULL,
+    revisao         TEXT,
+    extensao        TEXT,
+    digest          TEXT REFERENCES hashes(digest),
+    status          TEXT,
+    UNIQUE (entrega_id, nome)
+);
+CREATE INDEX IF NOT EXISTS ix_arquivos_documento ON arquivos(documento);
+CREATE INDEX IF NOT EXISTS ix_arquivos_digest ON arquivos(digest);
+CREATE TABLE IF NOT EXISTS revisoes (
+    projeto_id      INTEGER NOT NULL REFERENCES projetos(id),
+    documento       TEXT NOT NULL,
+    revisao         TEXT NOT NULL,
+    entrega_id      INTEGER NOT NULL REFERENCES entregas(id) ON DELETE CASCADE,
+    PRIMARY KEY (projeto_id, documento, revisao, entrega_id)
+);
+CREATE INDEX IF NOT EXISTS ix_revisoes_doc ON revisoes(projeto_id, documento, revisao);
+CREATE TABLE IF NOT EXISTS historico_arquivos (
+    caminho         TEXT PRIMARY KEY,
+    numero          INTEGER NOT NULL,
+    data            REAL NOT NULL,
+    status          TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_historico_arquivos_data ON historico_arquivos(data);
+"""
+
+_RE_CONTADOR = re.compile(r"^contador_entregas_(.+)\.json$")
+
+
+class Catalogo:
+    """
+    Catálogo SQLite das entregas: projetos, entregas, arquivos, hashes e revisões.
+
+    Usa WAL para que leituras (telas, relatórios) não bloqueiem o processo que está
+    entregando. Observação: WAL exige que todos os processos estejam na mesma máquina;
+    em unidades de rede o SQLite volta ao modo de journal padrão (registrado no log).
+    """
+
+    def __init__(self, caminho_db: Path):
+        self.caminho_db = Path(caminho_db)
+        self.caminho_db.parent.mkdir(parents=True, exist_ok=True)
+        self._con = sqlite3.connect(self.caminho_db, timeout=30, check_same_thread=False)
+        self._con.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        modo = self._con.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if modo.lower() != "wal":
+            logging.warning("Catálogo %s sem WAL (modo %s)", self.caminho_db, modo)
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.execute("PRAGMA foreign_keys=ON")
+        self._con.executescript(_SCHEMA)
+
+    def fechar(self):
+        with self._lock:
+            self._con.close()
+
+    # ---------------- projetos / contador ----------------
+    def _projeto_id(self, numero: str) -> int:
+        numero = str(numero)
+        self._con.execute("INSERT OR IGNORE INTO projetos(numero) VALUES (?)", (numero,))
+        return self._con.execute("SELECT id FROM projetos WHERE numero=?", (numero,)).fetchone()[0]
+
+    def existe_projeto(self, numero: str) -> bool:
+        with self._lock:
+            return self._con.execute(
+                "SELECT 1 FROM projetos WHERE numero=?", (str(numero),)
+            ).fetchone() is not None
+
+    def proximo_indice(self, numero: str) -> int:
+        with self._lock, self._con:
+            pid = self._projeto_id(numero)
+            return self._con.execute("SELECT proximo_indice FROM projetos WHERE id=?", (pid,)).fetchone()[0]
+
+    def definir_proximo_indice(self, numero: str, valor: int) -> None:
+        with self._lock, self._con:
+            pid = self._projeto_id(numero)
+            self._con.execute("UPDATE projetos SET proximo_indice=? WHERE id=?", (valor, pid))
+
+    def incrementar_indice(self, numero: str) -> int:
+        with self._lock, self._con:
+            pid = self._projeto_id(numero)
+            self._con.execute("UPDATE projetos SET proximo_indice=proximo_indice+1 WHERE id=?", (pid,))
+            return self._con.execute("SELECT proximo_indice FROM projetos WHERE id=?", (pid,)).fetchone()[0]
+
+    # ---------------- entregas ----------------
+    def registrar_entrega(self, numero: str, pasta_entregas: Path, registro: dict,
+                          hashes: Optional[dict[str, str]] = None,
+                          status: Optional[dict[str, str]] = None,
+                          revisoes: Optional[dict[str, tuple[str, Optional[str]]]] = None) -> int:
+        """
+        Grava uma entrega (registro no formato do historico_entregas) e seus arquivos.
+        revisoes: nome → (documento, revisão) já separados pelo esquema do projeto;
+        sem ele vale o padrão -Rnn de identificar_nome_com_revisao.
+        """
+        hashes = hashes or {}
+        status = status or {}
+        revisoes = revisoes or {}
+        with self._lock, self._con:
+            pid = self._projeto_id(numero)
+            cur = self._con.execute(
+                "INSERT INTO entregas(projeto_id, pasta_entregas, pasta_entrega, tipo, etapa, seq, data) "
+                "VALUES (?,?,?,?,?,?,?) "
+                "ON CONFLICT(pasta_entrega) DO UPDATE SET seq=excluded.seq, data=excluded.data "
+                "RETURNING id",
+                (pid, str(pasta_entregas), registro["pasta_entrega"], registro.get("tipo_entrega"),
+                 registro.get("etapa"), registro.get("seq"), registro.get("data")),
+            )
+            eid = cur.fetchone()[0]
+            pasta = Path(registro["pasta_entrega"])
+            for nome in registro.get("arquivos_entregues", []):
+                doc, rev, ext = identificar_nome_com_revisao(nome)
+                if nome in revisoes:
+                    doc, rev = revisoes[nome]
+                digest = hashes.get(nome)
+                if digest:
+                    try:
+                        tam = os.path.getsize(pasta / nome)
+                    except OSError:
+                        tam = None
+                    self._con.execute(
+                        "INSERT OR IGNORE INTO hashes(digest, tamanho) VALUES (?,?)", (digest, tam)
+                    )
+                self._con.execute(
+                    "INSERT OR REPLACE INTO arquivos(entrega_id, nome, documento, revisao, extensao, digest, status) "
+                    "VALUES (?,?,?,?,?,?,?)",
+                    (eid, nome, doc, rev, ext, digest, status.get(nome)),
+                )
+                if rev:
+                    self._con.execute(
+                        "INSERT OR IGNORE INTO revisoes(projeto_id, documento, revisao, entrega_id) "
+                        "VALUES (?,?,?,?)", (pid, doc, rev, eid)
+                    )
+            return eid
+
+    def entregas_do_projeto(self, numero: str) -> list[dict]:
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT e.* FROM entregas e JOIN projetos p ON p.id=e.projeto_id "
+                "WHERE p.numero=? ORDER BY e.data, e.id", (str(numero),)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def entregas_com_documento(self, documento: str) -> list[dict]:
+        """Todas as entregas que contêm o documento (nome sem revisão e extensão)."""
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT e.pasta_entrega, e.tipo, e.data, a.nome, a.revisao, a.digest "
+                "FROM arquivos a JOIN entregas e ON e.id=a.entrega_id "
+                "WHERE a.documento=? ORDER BY e.data, e.id", (documento,)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def revisoes_do_projeto(self, numero: str) -> list[tuple[str, str, str]]:
+        """(documento, revisão, pasta da entrega) de todas as entregas do projeto, na ordem de entrega."""
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT r.documento, r.revisao, e.pasta_entrega FROM revisoes r "
+                "JOIN projetos p ON p.id=r.projeto_id JOIN entregas e ON e.id=r.entrega_id "
+                "WHERE p.numero=? ORDER BY e.id", (str(numero),)
+            ).fetchall()
+        return [tuple(r) for r in rows]
+
+    # ---------------- histórico de arquivos (antigo historico_arquivos.json) ----------------
+    def atualizar_historico_arquivos(self, lista_arquivos: Iterable[str]) -> dict:
+        with self._lock, self._con:
+            for arq in lista_arquivos:
+                dm = os.path.getmtime(arq)
+                row = self._con.execute("SELECT data FROM historico_arquivos WHERE caminho=?", (arq,)).fetchone()
+                if row is None or row[0] != dm:
+                    n = self._con.execute("SELECT COUNT(*) FROM historico_arquivos").fetchone()[0]
+                    self._con.execute(
+                        "INSERT OR REPLACE INTO historico_arquivos(caminho, numero, data, status) "
+                        "VALUES (?,?,?,'Atual')", (arq, n + 1, dm)
+                    )
+            self._con.execute(
+                "UPDATE historico_arquivos SET status = CASE WHEN caminho = "
+                "(SELECT caminho FROM historico_arquivos ORDER BY data DESC LIMIT 1) "
+                "THEN 'Atual' ELSE 'Obsoleto' END"
+            )
+            rows = self._con.execute("SELECT * FROM historico_arquivos ORDER BY numero").fetchall()
+        return {r["caminho"]: {"numero": r["numero"], "data": r["data"], "status": r["status"]} for r in rows}
+
+    # ---------------- importação dos JSONs antigos ----------------
+    def importar_contador_json(self, numero: str, fp: Path) -> None:
+        try:
+            dados = json.loads(Path(fp).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning("Contador %s não importado: %s", fp, e)
+            return
+        self.definir_proximo_indice(numero, dados.get("proximo", 1))
+        for reg in dados.get("entregas", []):
+            if isinstance(reg, dict) and "pasta_entrega" in reg:
+                self.registrar_entrega(numero, Path(reg["pasta_entrega"]).parent.parent, reg)
+
+    def importar_historico_arquivos_json(self, fp: Path) -> None:
+        try:
+            dados = json.loads(Path(fp).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning("Histórico de arquivos %s não importado: %s", fp, e)
+            return
+        with self._lock, self._con:
+            for caminho, info in dados.items():
+                self._con.execute(
+                    "INSERT OR IGNORE INTO historico_arquivos(caminho, numero, data, status) VALUES (?,?,?,?)",
+                    (caminho, info.get("numero", 0), info.get("data", 0), info.get("status", "Obsoleto")),
+                )
+
+    def importar_historico_entregas(self, numero: str, pasta_entregas: Path) -> int:
+        """Importa o historico_entregas(.json/.jsonl) de uma pasta 1.ENTREGAS."""
+        n = 0
+        for n, reg in enumerate(iterar_historico(pasta_entregas), start=1):
+            self.registrar_entrega(numero, pasta_entregas, reg)
+        return n
+
+
+def importar_json_legado(catalogo: Catalogo, contadores_dir: Path,
+                         historico_arquivos_json: Optional[Path] = None,
+                         pastas_entregas: Iterable[tuple[str, Path]] = ()) -> None:
+    """Carga inicial: contador_entregas_<n>.json, historico_arquivos.json e históricos por pasta."""
+    contadores_dir = Path(contadores_dir)
+    if contadores_dir.is_dir():
+        for fp in contadores_dir.iterdir():
+            m = _RE_CONTADOR.match(fp.name)
+            if m:
+                catalogo.importar_contador_json(m.group(1), fp)
+    if historico_arquivos_json and Path(historico_arquivos_json).exists():
+        catalogo.importar_historico_arquivos_json(historico_arquivos_json)
+    for numero, pasta in pastas_entregas:
+        catalogo.importar_historico_entregas(numero, Path(pasta))
+
+
+_catalogos: dict[str, Catalogo] = {}
+_catalogos_lock = threading.Lock()
+
+
+def abrir_catalogo(caminho_db: Path) -> Catalogo:
+    chave = os.path.abspath(caminho_db)
+    with _catalogos_lock:
+        cat = _catalogos.get(chave)
+        if cat is None:
+            cat = Catalogo(Path(caminho_db))
+            _catalogos[chave] = cat
+        return cat
@@ -0,0 +1,171 @@
+from __future__ import annotations
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+
+from utils.hash_cache import cache_para_arquivo
+from utils.instrumentacao import contar
+
+MODO_RAPIDO = "rapido"          # tamanho + amostra decidem; arquivo inteiro nunca é lido
+MODO_PARANOICO = "paranoico"    # tamanho/amostra só provam diferença; igualdade exige o hash completo
+MODOS = (MODO_RAPIDO, MODO_PARANOICO)
+MODO_PADRAO = MODO_PARANOICO
+ALGORITMO_PADRAO = "md5"        # o mesmo da cópia: o hash completo costuma já estar no cache
+
+BLOCO_AMOSTRA = 64 * 1024       # início, meio e fim do arquivo
+BUFFER_HASH = 1024 * 1024
+COMPARACAO_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+
+
+class ComparadorArquivos:
+    """
+    Comparação de conteúdo em camadas, da mais barata para a mais cara:
+
+    1. tamanho (stat) — ou hashes completos dos dois já no cache;
+    2. impressão de blocos amostrados (início/meio/fim, 3 × BLOCO_AMOSTRA);
+    3. hash completo (só no modo paranoico, quando 1 e 2 não acharam diferença).
+
+    Impressões e hashes ficam no CacheHashes de cada pasta (chave = algoritmo),
+    então um arquivo inalterado não é lido de novo na próxima comparação.
+    algoritmo é qualquer nome aceito por hashlib.new ("md5", "blake2b", "sha256"…).
+    Os contadores (bytes_lidos, decididos) servem para medir o ganho.
+    """
+
+    def __init__(self, modo: str = MODO_PADRAO, algoritmo: str = ALGORITMO_PADRAO,
+                 bloco: int = BLOCO_AMOSTRA):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de comparação desconhecido: {modo!r} (use {', '.join(MODOS)})")
+        hashlib.new(algoritmo)  # falha cedo se o algoritmo não existir
+        self.modo = modo
+        self.algoritmo = algoritmo
+        self.bloco = bloco
+        self._chave_amostra = f"amostra-{bloco}-{algoritmo}"
+        self._lock = threading.Lock()
+        self.bytes_lidos = 0
+        self.decididos = {"tamanho": 0, "cache": 0, "amostra": 0, "hash": 0}
+
+    def _contar(self, n: int) -> None:
+        with self._lock:
+            self.bytes_lidos += n
+        contar("bytes_lidos", n)
+
+    def impressao(self, path: Path, st: Optional[os.stat_result] = None) -> str:
+        """Hash do tamanho + blocos do início, meio e fim (arquivo pequeno: o conteúdo todo)."""
+        path = Path(path)
+        st = st or os.stat(path)
+        cache = cache_para_arquivo(path)
+        pronto = cache.obter(path, st, self._chave_amostra)
+        if pronto is not None:
+            return pronto
+        h = hashlib.new(self.algoritmo)
+        h.update(st.st_size.to_bytes(8, "little"))
+        with path.open("rb") as f:
+            if st.st_size <= 3 * self.bloco:
+                dados = f.read()
+                h.update(dados)
+                self._contar(len(dados))
+            else:
+                for pos in (0, (st.st_size - self.bloco) // 2, st.st_size - self.bloco):
+                    f.seek(pos)
+                    dados = f.read(self.bloco)
+                    h.update(dados)
+                    self._contar(len(dados))
+        digest = h.hexdigest()
+        cache.registrar(path, digest, st, self._chave_amostra)
+        return digest
+
+    def hash_completo(self, path: Path, st: Optional[os.stat_result] = None) -> str:
+        path = Path(path)
+        st = st or os.stat(path)
+        cache = cache_para_arquivo(path)
+        pronto = cache.obter(path, st, self.algoritmo)
+        if pronto is not None:
+            return pronto
+        h = hashlib.new(self.algoritmo)
+        with path.open("rb") as f:
+            while chunk := f.read(BUFFER_HASH):
+                h.update(chunk)
+                self._contar(len(chunk))
+        contar("arquivos_hash")
+        digest = h.hexdigest()
+        cache.registrar(path, digest, st, self.algoritmo)
+        return digest
+
+    def hash_conhecido(self, path: Path, st: Optional[os.stat_result] = None) -> Optional[str]:
+        """Hash completo já guardado no cache (sem ler o arquivo), ou None."""
+        try:
+            return cache_para_arquivo(Path(path)).obter(Path(path), st, self.algoritmo)
+        except OSError:
+            return None
+
+    def paranoico(self) -> ComparadorArquivos:
+        """Este comparador, ou um equivalente no modo paranoico (igualdade só pelo hash completo)."""
+        if self.modo == MODO_PARANOICO:
+            return self
+        return ComparadorArquivos(MODO_PARANOICO, self.algoritmo, self.bloco)
+
+    def _decidiu(self, camada: str) -> None:
+        with self._lock:
+            self.decididos[camada] += 1
+
+    def iguais(self, a: Path, b: Path) -> bool:
+        st_a, st_b = os.stat(a), os.stat(b)
+        if st_a.st_size != st_b.st_size:
+            self._decidiu("tamanho")
+            return False
+        # hashes completos já conhecidos (ex.: registrados na cópia) decidem sem ler nada
+        conhecido_a = self.hash_conhecido(a, st_a)
+        conhecido_b = self.hash_conhecido(b, st_b) if conhecido_a else None
+        if conhecido_a and conhecido_b:
+            self._decidiu("cache")
+            return conhecido_a == conhecido_b
+        # pequenos: a "amostra" já é o arquivo inteiro
+        pequeno = st_a.st_size <= 3 * self.bloco
+        if self.impressao(a, st_a) != self.impressao(b, st_b):
+            self._decidiu("amostra")
+            return False
+        if self.modo == MODO_RAPIDO or pequeno:
+            self._decidiu("amostra")
+            return True
+        self._decidiu("hash")
+        return self.hash_completo(a, st_a) == self.hash_completo(b, st_b)
+
+    def comparar_pares(self, pares: Iterable[tuple[Path, Path]],
+                       max_workers: int = COMPARACAO_WORKERS) -> dict[tuple[Path, Path], bool]:
+        """iguais() de vários pares em paralelo (latência de drive de rede); par ausente = False."""
+        pares = [(Path(a), Path(b)) for a, b in pares]
+        if not pares:
+            return {}
+
+        def _um(par):
+            try:
+                return par, self.iguais(*par)
+            except FileNotFoundError:
+                return par, False
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pares))),
+                                thread_name_prefix="compara") as pool:
+            return dict(pool.map(_um, pares))
+
+    def resumo(self) -> dict:
+        return {"modo": self.modo, "algoritmo": self.algoritmo, "bytes_lidos": self.bytes_lidos,
+                **{f"decididos_{k}": v for k, v in self.decididos.items()}}
+
+
+_modo_padrao = MODO_PADRAO
+_algoritmo_padrao = ALGORITMO_PADRAO
+
+
+def configurar_comparacao(modo: Optional[str] = None, algoritmo: Optional[str] = None) -> None:
+    """Política do processo (CLI/lote): vale para os comparadores criados depois."""
+    global _modo_padrao, _algoritmo_padrao
+    ComparadorArquivos(modo or _modo_padrao, algoritmo or _algoritmo_padrao)  # valida
+    _modo_padrao = modo or _modo_padrao
+    _algoritmo_padrao = algoritmo or _algoritmo_padrao
+
+
+def novo_comparador() -> ComparadorArquivos:
+    return ComparadorArquivos(_modo_padrao, _algoritmo_padrao)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import os
+import json
+import time
+import logging
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# o contador de entregas de cada projeto fica no drive compartilhado (contador_entregas_<n>.json):
+# é o que todas as máquinas enxergam, então é ele que decide o próximo número
+TEMPO_LIMITE_TRAVA = 10.0   # espera máxima pela trava de outra máquina
+TRAVA_ABANDONADA_S = 60.0   # trava mais velha que isso ficou de um processo que caiu
+INTERVALO_TRAVA_S = 0.05
+
+
+class ErroContador(RuntimeError):
+    """Contador compartilhado travado por outra máquina além do tempo limite."""
+
+
+@contextmanager
+def _travado(caminho: Path, tempo_limite: float = TEMPO_LIMITE_TRAVA):
+    """Trava exclusiva por arquivo <contador>.lock (O_EXCL funciona também em drive de rede)."""
+    trava = caminho.with_name(caminho.name + ".lock")
+    fim = time.monotonic() + tempo_limite
+    while True:
+        try:
+            fd = os.open(trava, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(trava).st_mtime > TRAVA_ABANDONADA_S:
+                    logging.warning("Trava abandonada removida: %s", trava)
+                    os.unlink(trava)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() >= fim:
+                raise ErroContador(f"{caminho} travado por outro processo ({trava})")
+            time.sleep(INTERVALO_TRAVA_S)
+    try:
+        os.write(fd, f"{os.getpid()}@{os.environ.get('COMPUTERNAME', '')}".encode("utf-8"))
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.unlink(trava)
+        except FileNotFoundError:
+            pass
+
+
+def ler_contador(caminho: str | os.PathLike) -> dict:
+    """Conteúdo do contador ({"proximo": n, …}); {"proximo": 1} se ainda não existir."""
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except FileNotFoundError:
+        dados = {}
+    dados.setdefault("proximo", 1)
+    return dados
+
+
+def _gravar(caminho: Path, dados: dict) -> None:
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=caminho.parent, prefix=caminho.name + ".",
+                                     suffix=".tmp", delete=False) as f:
+        json.dump(dados, f, indent=4, ensure_ascii=False)
+    try:
+        os.replace(f.name, caminho)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+
+def incrementar_contador(caminho: str | os.PathLike) -> int:
+    """Avança o contador sob a trava e retorna o novo "proximo"."""
+    caminho = Path(caminho)
+    with _travado(caminho):
+        dados = ler_contador(caminho)
+        dados["proximo"] += 1
+        _gravar(caminho, dados)
+    return dados["proximo"]
+
+
+def definir_contador(caminho: str | os.PathLike, valor: int) -> None:
+    caminho = Path(caminho)
+    with _travado(caminho):
+        dados = ler_contador(caminho)
+        dados["proximo"] = valor
+        _gravar(caminho, dados)
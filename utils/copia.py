@@ -0,0 +1,229 @@
+from __future__ import annotations
+import os
+import sys
+import time
+import shutil
+import contextlib
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from utils.hash_cache import cache_para_arquivo
+from utils.instrumentacao import contar
+
+COPIA_WORKERS = 4
+COPIA_BUFFER = 4 * 1024 * 1024
+SUFIXO_PARCIAL = ".parcial"
+
+# limite global de cópias simultâneas (ex.: semáforo compartilhado pelos processos de um lote)
+_limite_io = None
+
+
+class ErroVerificacaoCopia(OSError):
+    pass
+
+
+def copiar_com_hash(
+    src: Path,
+    dst: Path,
+    algoritmo: str = "md5",
+    buf: int = COPIA_BUFFER,
+    on_bytes: Optional[Callable[[int], None]] = None,
+) -> str:
+    """
+    Copia src ➜ dst calculando o hash durante a própria leitura, sem reler nenhum
+    dos dois arquivos. Preserva metadados como shutil.copy2 e confere o destino
+    pelo tamanho gravado. O hash fica registrado no cache de origem e de destino.
+    A cópia é feita em <dst>.parcial e só vira dst quando está completa.
+    """
+    src, dst = Path(src), Path(dst)
+    parcial = dst.with_name(dst.name + SUFIXO_PARCIAL)
+    st_src = os.stat(src)
+    h = hashlib.new(algoritmo)
+    escritos = 0
+    bloco = bytearray(buf)
+    mv = memoryview(bloco)
+    try:
+        with src.open("rb", buffering=0) as fi, parcial.open("wb", buffering=0) as fo:
+            while n := fi.readinto(bloco):
+                h.update(mv[:n])
+                fo.write(mv[:n])
+                escritos += n
+                if on_bytes:
+                    on_bytes(n)
+        shutil.copystat(src, parcial)
+        st_dst = os.stat(parcial)
+        if not (escritos == st_src.st_size == st_dst.st_size):
+            raise ErroVerificacaoCopia(
+                f"Cópia incompleta de {src}: {escritos} de {st_src.st_size} bytes "
+                f"(destino com {st_dst.st_size})"
+            )
+        os.replace(parcial, dst)
+    except BaseException:
+        parcial.unlink(missing_ok=True)
+        raise
+
+    digest = h.hexdigest()
+    contar("arquivos_copiados")
+    contar("arquivos_hash")
+    contar("bytes_lidos", escritos)
+    contar("bytes_gravados", escritos)
+    cache_para_arquivo(src).registrar(src, digest, st_src, algoritmo)
+    cache_para_arquivo(dst).registrar(dst, digest, os.stat(dst), algoritmo)
+    return digest
+
+
+def copiar_sem_hash(src: Path, dst: Path, on_bytes: Optional[Callable[[int], None]] = None):
+    """copy2 puro: usa a cópia do kernel (sendfile/fcopyfile/CopyFile) quando disponível."""
+    shutil.copy2(src, dst)
+    tamanho = os.path.getsize(dst)
+    contar("arquivos_copiados")
+    contar("bytes_lidos", tamanho)
+    contar("bytes_gravados", tamanho)
+    if on_bytes:
+        on_bytes(tamanho)
+
+
+_FICLONE = 0x40049409
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    try:
+        with src.open("rb") as fi, dst.open("wb") as fo:
+            fcntl.ioctl(fo.fileno(), _FICLONE, fi.fileno())
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def vincular_arquivo(anterior: Path, dst: Path, digest: Optional[str] = None) -> str:
+    """
+    Reaproveita um arquivo idêntico de uma entrega anterior: hardlink, senão
+    reflink (Btrfs/XFS), senão cópia comum (ex.: volumes diferentes).
+    Retorna o modo usado: "hardlink", "reflink" ou "copia".
+    """
+    anterior, dst = Path(anterior), Path(dst)
+    try:
+        os.link(anterior, dst)
+        modo = "hardlink"
+    except OSError:
+        if _reflink(anterior, dst):
+            modo = "reflink"
+        else:
+            digest = copiar_com_hash(anterior, dst)
+            modo = "copia"
+    if modo != "copia":
+        contar("arquivos_vinculados")
+    if digest:
+        cache_para_arquivo(dst).registrar(dst, digest)
+    return modo
+
+
+def definir_limite_io(semaforo) -> None:
+    """copiar_em_lote passa a segurar este semáforo durante a cópia de cada arquivo (None desliga)."""
+    global _limite_io
+    _limite_io = semaforo
+
+
+def _ja_copiado(src: Path, dst: Path) -> bool:
+    try:
+        s, d = os.stat(src), os.stat(dst)
+    except FileNotFoundError:
+        return False
+    return s.st_size == d.st_size and s.st_mtime_ns == d.st_mtime_ns
+
+
+def copiar_em_lote(
+    pares: Iterable[tuple[Path, Path]],
+    max_workers: int = COPIA_WORKERS,
+    buf: int = COPIA_BUFFER,
+    calcular_hash: bool = True,
+    on_arquivo: Optional[Callable[[Path, int, int], None]] = None,
+    on_progresso: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Copia vários arquivos em um pool limitado de threads.
+
+    on_arquivo(src, bytes_copiados, tamanho) e on_progresso(bytes_copiados, bytes_total)
+    são chamados das threads de cópia; quem atualiza tela deve repassar ao loop do Tk.
+    Destinos que já existem com o mesmo tamanho e mtime da origem são mantidos,
+    o que permite retomar uma cópia interrompida.
+
+    Retorna um resumo com os hashes por destino e a vazão obtida.
+    """
+    pares = [(Path(s), Path(d)) for s, d in pares]
+    tamanhos = {s: os.path.getsize(s) for s, _ in pares}
+    total = sum(tamanhos.values())
+    lock = threading.Lock()
+    copiados = {"total": 0}
+    falhou = threading.Event()
+
+    def _copiar(src: Path, dst: Path) -> tuple[Path, Optional[str], bool]:
+        feito = [0]
+
+        def _on_bytes(n: int):
+            feito[0] += n
+            with lock:
+                copiados["total"] += n
+                agregado = copiados["total"]
+            if on_arquivo:
+                on_arquivo(src, feito[0], tamanhos[src])
+            if on_progresso:
+                on_progresso(agregado, total)
+
+        if falhou.is_set():
+            return dst, None, False  # o lote já falhou: não começa outra cópia
+        try:
+            # o limite de I/O do lote vale por arquivo: cada thread de cópia ocupa uma vaga
+            with _limite_io or contextlib.nullcontext():
+                if _ja_copiado(src, dst):
+                    digest = cache_para_arquivo(dst).hash_arquivo(dst) if calcular_hash else None
+                    _on_bytes(tamanhos[src])
+                    return dst, digest, True
+                if calcular_hash:
+                    return dst, copiar_com_hash(src, dst, buf=buf, on_bytes=_on_bytes), False
+                copiar_sem_hash(src, dst, on_bytes=_on_bytes)
+                return dst, None, False
+        except BaseException:
+            falhou.set()
+            raise
+
+    hashes: dict[Path, Optional[str]] = {}
+    pulados = 0
+    t0 = time.perf_counter()
+    if pares:
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pares))), thread_name_prefix="copia")
+        try:
+            for fut in as_completed([pool.submit(_copiar, s, d) for s, d in pares]):
+                dst, digest, pulado = fut.result()
+                hashes[dst] = digest
+                pulados += pulado
+        except BaseException:
+            # falha ou cancelamento: as cópias ainda na fila não chegam a começar
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+        pool.shutdown(wait=True)
+    seg = max(time.perf_counter() - t0, 1e-9)
+
+    resumo = {
+        "arquivos": len(pares),
+        "pulados": pulados,
+        "bytes": total,
+        "segundos": round(seg, 3),
+        "mb_s": round(total / (1024 * 1024) / seg, 2),
+        "arquivos_s": round(len(pares) / seg, 2),
+        "hashes": hashes,
+    }
+    logging.info(
+        "Cópia concluída: %d arquivos (%d já existentes), %.1f MB em %.2f s – %.1f MB/s, %.1f arquivos/s",
+        resumo["arquivos"], pulados, total / (1024 * 1024), seg, resumo["mb_s"], resumo["arquivos_s"],
+    )
+    return resumo
@@ -0,0 +1,657 @@
+from __future__ import annotations
+import re
+import os
+import json
+import shutil
+import time
+import logging
+from glob import escape as glob_escape
+from openpyxl.utils import get_column_letter
+from openpyxl import load_workbook
+from openpyxl.worksheet.datavalidation import DataValidation
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict
+from utils.hash_cache import hash_arquivo, salvar_caches, cache_para_arquivo
+from utils.hashing import hashes_por_caminho
+from utils.comparacao import ComparadorArquivos, novo_comparador
+from utils.copia import copiar_em_lote, vincular_arquivo
+from utils.historico import (registrar_entrega, iterar_historico, ultimo_registro, compactar_historico,
+                             verificar_historico)
+from utils.catalogo import Catalogo, abrir_catalogo
+from utils.contador import ler_contador, incrementar_contador, definir_contador
+from utils.indice_revisoes import indice_revisoes, atualizar_indice_revisoes
+from utils.nomenclatura import (compilar_nomenclatura, tokenizar, ValidadorNomenclatura,
+                                STATUS_TOKEN, MISMATCH, MISSING)
+from utils.regras_nomenclatura import regras_para
+from utils.registros import extrair_lote
+from utils.varredura import arquivos, subpastas, nome_normalizado
+from utils.instrumentacao import medir, medido, anotar
+from utils.precalculo import precalculo_do_lote, assinatura_esquema
+from utils.manifesto import (ARQUIVOS_CONTROLE, montar_manifesto, gravar_manifesto, ler_manifesto,
+                             obter_manifesto, comparacao_por_nome)
+from utils.grd import (GRD_COL_INICIO, GRD_LINHA_CABEC, GRD_LINHA_DADOS,
+                       fill_status, escrever_grd_streaming)
+
+# Fluxo de entrega sem interface: usado pelas telas (ui.telas) e pela linha de comando
+# (projects/entrega_cli.py). Este módulo não importa tkinter.
+
+# --------------------- CONFIGURAÇÕES ---------------------
+JSON_CONTADORES_DIR = r"G:\Drives compartilhados\OAE - SCRIPTS\SCRIPTS\tmp_joaoG\JSON_tmp_joao"
+# catálogo local (WAL não funciona em drive de rede), só para consulta; o número da próxima
+# entrega continua vindo do contador_entregas_<n>.json do drive (utils.contador)
+CATALOGO_DB = os.path.join(os.path.expanduser("~"), ".oae_eng", "catalogo_entregas.sqlite3")
+PROJETOS_JSON = r"G:\Drives compartilhados\OAE-JSONS\diretorios_projetos.json"
+NOMENCLATURA_REGRAS_JSON = r"G:\Drives compartilhados\OAE - SCRIPTS\SCRIPTS\tmp_joaoG\Melhorias\Código_reformulado_teste\OAE_ENG\nomenclaturas.json"
+HISTORICO_JSON = "historico_arquivos.json"
+TEMPLATE_XLSX = Path(__file__).resolve().parent.parent / "ui" / "GRD_template.xlsx"
+
+PASTA_DISCIPLINAS = "3 Desenvolvimento"
+PASTA_ENTREGAS = "1.ENTREGAS"
+AP_PREFIX = "1.AP - Entrega-"
+PE_PREFIX = "2.PE - Entrega-"
+ENTREGA_RE = re.compile(r"^(1\.AP|2\.PE) - Entrega-(\d+)$")
+ENTREGA_ANTERIOR_RE = re.compile(r"^(1\.AP|2\.PE) - Entrega-(\d+)(?:-OBSOLETO\d*)?$")
+# sem regras do projeto: revisão R + 2 dígitos depois do último '-'
+_VALIDADOR_PADRAO = compilar_nomenclatura(None)
+
+
+# -----------------------------------------------------
+# ENTREGA
+# -----------------------------------------------------
+def _listar_entregas_tipo(pasta: Path, prefixo: str) -> list[Path]:
+    return sorted(
+        [Path(e.path) for e in subpastas(pasta)
+         if e.name.startswith(prefixo) and not e.name.endswith("-OBSOLETO")],
+        key=lambda p: int(ENTREGA_RE.match(p.name).group(2))
+    )
+
+def _proximo_num_entrega(pasta_entregas: Path, prefixo: str) -> int:
+    ativas = _listar_entregas_tipo(pasta_entregas, prefixo)
+    if not ativas:
+        return 1
+    ultimo = ENTREGA_RE.match(ativas[-1].name)
+    return int(ultimo.group(2)) + 1
+
+def _marcar_obsoleta(p: Path) -> Path:
+    destino = p.with_name(p.name + "-OBSOLETO")
+    seq = 1
+    while destino.exists():
+        seq += 1
+        destino = p.with_name(p.name + f"-OBSOLETO{seq}")
+    p.rename(destino)
+    cache_para_arquivo(p).mover_pasta(p, destino)
+    logging.info("Renomeada %s ➜ %s", p.name, destino.name)
+    return destino
+
+def _hash_file(path: Path) -> str:
+    return hash_arquivo(path)
+
+def obter_entrega_anterior(pasta_entregas: Path) -> Optional[Path]:
+    entregas = sorted(
+        [Path(e.path) for e in subpastas(pasta_entregas)
+         if e.name.startswith("Entrega_")
+         and e.name.split("_")[1][:2].isdigit()
+         and not e.name.endswith("_OBS")],
+        key=lambda p: int(p.name.split("_")[1][:2])
+    )
+    return entregas[-1] if entregas else None
+
+def listar_arquivos_entrega(pasta: Path) -> list[Path]:
+    return [Path(e.path) for e in arquivos(pasta)]
+
+@medido("comparar_arquivos")
+def comparar_arquivos(pasta_nova: Path, pasta_ant: Optional[Path],
+                      comparador: Optional[ComparadorArquivos] = None) -> dict:
+    atual     = {p.name: p for p in listar_arquivos_entrega(pasta_nova)}
+    anterior  = {p.name: p for p in listar_arquivos_entrega(pasta_ant)} if pasta_ant else {}
+    resultado: Dict[str, dict] = {}
+
+    # pares em comum comparados de uma vez, em paralelo: tamanho ➜ amostra ➜ hash
+    comuns = [n for n in atual if n in anterior and n not in ARQUIVOS_CONTROLE]
+    iguais = (comparador or novo_comparador()).comparar_pares((atual[n], anterior[n]) for n in comuns)
+
+    for nome, p in atual.items():
+        if nome in ARQUIVOS_CONTROLE:
+            continue
+        if nome in anterior:
+            resultado[nome] = {
+                "status": "nao_modificado" if iguais[(p, anterior[nome])] else "modificado",
+                "versao_anterior": str(anterior[nome])
+            }
+        else:
+            resultado[nome] = {"status": "novo"}
+
+    for nome, p_old in anterior.items():
+        if nome not in resultado and nome not in ARQUIVOS_CONTROLE:
+            resultado[nome] = {"status": "removido", "versao_anterior": str(p_old)}
+    return resultado
+
+def gerar_arquivo_controle(nova_pasta: Path, comparacao: dict):
+    with (nova_pasta / "_controle_entrega.json").open("w",  encoding="utf-8") as f:
+        json.dump(comparacao, f, indent=4, ensure_ascii=False)
+
+def salvar_historico_global_entregas(pasta_entregas: Path, registro: dict) -> int:
+    return registrar_entrega(pasta_entregas, registro)
+
+def _vincular_inalterados(arquivos: list[Path], entrega_ativa: Path, nova: Path,
+                          comparador: Optional[ComparadorArquivos] = None) -> dict[str, tuple[str, str]]:
+    """
+    Modo deduplicado: arquivos idênticos aos da entrega ativa não são copiados,
+    e sim vinculados (hardlink/reflink) a partir dela. Retorna nome→(modo, hash).
+    A igualdade vem do comparador em camadas, sempre no modo paranoico: vincular um
+    arquivo só pela amostra entregaria o conteúdo antigo. O hash guardado é o da
+    entrega ativa (registrado na cópia dela), sem reler o arquivo.
+    """
+    anteriores = {src: entrega_ativa / src.name for src in arquivos
+                  if (entrega_ativa / src.name).is_file()}
+    comparador = (comparador or novo_comparador()).paranoico()
+    iguais = comparador.comparar_pares(anteriores.items())
+    logging.debug("Comparação com %s: %s", entrega_ativa.name, comparador.resumo())
+    vinculados = {}
+    for src, ant in anteriores.items():
+        if iguais[(src, ant)]:
+            digest = hash_arquivo(ant)
+            modo = vincular_arquivo(ant, nova / src.name, digest)
+            vinculados[src.name] = (modo, digest)
+    return vinculados
+
+@medido("entrega")
+def processar_entrega_arquivos_tipo(arquivos: list[Path], pasta_entregas: Path, tipo: str,
+                                    on_progresso=None, dedup: bool = False,
+                                    projeto_num: str | None = None,
+                                    comparador: Optional[ComparadorArquivos] = None) -> Path:
+    # antes de copiar: com um histórico legado ilegível a entrega não poderia ser registrada
+    verificar_historico(pasta_entregas)
+    tipo_subpasta = 'AP' if tipo == "AP" else 'PE'
+    pasta_tipo = pasta_entregas / tipo_subpasta
+    pasta_tipo.mkdir(exist_ok=True, parents=True)
+
+    prefixo = AP_PREFIX if tipo == "AP" else PE_PREFIX
+    etapa = 1 if tipo == "AP" else 2
+
+    with medir("listagem"):
+        ativas = _listar_entregas_tipo(pasta_tipo, prefixo)
+        entrega_ativa = ativas[-1] if ativas else None
+
+        n     = _proximo_num_entrega(pasta_tipo, prefixo)
+        nova  = pasta_tipo / f"{prefixo}{n}"
+        nova.mkdir(parents=True, exist_ok=False)
+    logging.debug("Criada nova entrega: %s", nova)
+    anotar(pasta_entrega=str(nova), tipo=tipo, arquivos=len(arquivos), dedup=dedup)
+
+    try:
+        vinculados = {}
+        if dedup and entrega_ativa:
+            with medir("dedup"):
+                vinculados = _vincular_inalterados(arquivos, entrega_ativa, nova, comparador)
+
+        # cópia e hash na mesma leitura; a comparação abaixo só consulta o cache.
+        # on_progresso pode interromper a cópia levantando exceção (cancelamento).
+        with medir("copia"):
+            resumo_copia = copiar_em_lote(
+                [(src, nova / src.name) for src in arquivos if src.name not in vinculados],
+                on_progresso=on_progresso
+            )
+    except BaseException:
+        # nada fora da pasta nova foi alterado até aqui: desfaz a entrega
+        shutil.rmtree(nova, ignore_errors=True)
+        logging.info("Entrega %s interrompida durante a cópia; pasta removida", nova)
+        raise
+    hashes = {dst.name: digest for dst, digest in resumo_copia["hashes"].items()}
+    hashes.update({nome: digest for nome, (_, digest) in vinculados.items()})
+
+    with medir("hash"):
+        for nome, digest in hashes.items():
+            if digest is None:
+                hashes[nome] = hash_arquivo(nova / nome)
+
+    with medir("obsoleta"):
+        anterior = _marcar_obsoleta(entrega_ativa) if entrega_ativa else None
+
+    # manifesto gravado uma única vez, aqui: status da GRD e comparações seguintes só leem
+    # manifestos (o da entrega anterior; entregas antigas sem manifesto são lidas uma vez)
+    with medir("manifesto"):
+        validador = validador_projeto(projeto_num)
+        man_ant = obter_manifesto(anterior, validador) if anterior else None
+        manifesto = montar_manifesto(nova, hashes, man_ant, validador, tipo_entrega=tipo, etapa=etapa)
+        gravar_manifesto(nova, manifesto)
+
+    comp = comparacao_por_nome(manifesto, man_ant, anterior)
+    for nome, item in manifesto["arquivos"].items():
+        comp[nome]["hash"] = item["hash"]
+        comp[nome]["status_grd"] = item["status"]
+    for nome, (modo, _) in vinculados.items():
+        if modo != "copia":
+            comp[nome]["vinculo"] = modo
+
+    comp.update({"tipo_entrega": tipo, "etapa": etapa})
+    with medir("controle_json"), (nova / "_controle_entrega.json").open("w", encoding="utf-8") as f:
+        json.dump(comp, f, indent=4, ensure_ascii=False)
+
+    registro_historico = {
+        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "tipo_entrega": tipo,
+        "etapa": etapa,
+        "pasta_entrega": str(nova),
+        "arquivos_entregues": [src.name for src in arquivos],
+    }
+    with medir("historico"):
+        registro_historico["seq"] = salvar_historico_global_entregas(pasta_entregas, registro_historico)
+
+    if projeto_num:
+        try:
+            with medir("catalogo"):
+                revisoes = revisoes_por_nome(registro_historico["arquivos_entregues"], validador)
+                _catalogo().registrar_entrega(
+                    projeto_num, pasta_entregas, registro_historico,
+                    hashes=hashes,
+                    status={nome: comp[nome]["status_grd"] for nome in registro_historico["arquivos_entregues"]},
+                    revisoes=revisoes,
+                )
+                atualizar_indice_revisoes(projeto_num, _catalogo(), revisoes.values(), str(nova))
+        except Exception:
+            logging.exception("Falha ao registrar entrega no catálogo %s", CATALOGO_DB)
+
+    try:
+        criar_arquivo_controle(pasta_entregas)
+        logging.debug("GRD.xlsx atualizado em %s", pasta_entregas)
+    except Exception:
+        logging.exception("Falha ao gerar GRD.xlsx")
+    finally:
+        with medir("salvar_caches"):
+            salvar_caches()
+
+    return nova
+
+def carregar_regras_nomenclatura(projeto_num: str) -> dict:
+    """
+    Retorna a entrada do projeto no JSON de regras (dict com "campos" e possivelmente
+    "REVISÃO_ESPECIAL"). Se não existir, retorna {}.
+    A leitura passa pelo cache por projeto de utils.regras_nomenclatura.
+    """
+    projeto_key = str(projeto_num)
+    projeto_entry = regras_para(NOMENCLATURA_REGRAS_JSON).obter(projeto_key)
+    if not projeto_entry or "campos" not in projeto_entry:
+        logging.warning("Nenhuma regra encontrada para o projeto %s", projeto_key)
+        return {}
+    return projeto_entry
+
+def caminho_contador(projeto_num: str) -> str:
+    os.makedirs(JSON_CONTADORES_DIR, exist_ok=True)
+    return os.path.join(JSON_CONTADORES_DIR, f"contador_entregas_{projeto_num}.json")
+
+def _catalogo() -> Catalogo:
+    return abrir_catalogo(CATALOGO_DB)
+
+def _catalogo_projeto(projeto_num: str) -> Catalogo:
+    """Catálogo com o contador JSON antigo do projeto já importado (uma única vez)."""
+    cat = _catalogo()
+    if not cat.existe_projeto(projeto_num):
+        fp = caminho_contador(projeto_num)
+        if os.path.exists(fp):
+            cat.importar_contador_json(projeto_num, fp)
+    return cat
+
+def obter_proximo_indice(projeto_num: str) -> int:
+    """
+    Próximo número de entrega, pelo contador compartilhado do drive (o que as outras
+    máquinas também usam); o catálogo local só guarda uma cópia para consulta.
+    Sem acesso ao drive, usa essa cópia (registrado no log).
+    """
+    cat = _catalogo_projeto(projeto_num)
+    try:
+        proximo = ler_contador(caminho_contador(projeto_num))["proximo"]
+    except (OSError, ValueError) as e:
+        logging.warning("Contador compartilhado do projeto %s inacessível (%s); usando o catálogo local",
+                        projeto_num, e)
+        return cat.proximo_indice(projeto_num)
+    cat.definir_proximo_indice(projeto_num, proximo)
+    return proximo
+
+def incrementar_indice(projeto_num: str) -> int:
+    """Avança o contador compartilhado sob trava; sem o drive, falha (não inventa um número)."""
+    proximo = incrementar_contador(caminho_contador(projeto_num))
+    _catalogo_projeto(projeto_num).definir_proximo_indice(projeto_num, proximo)
+    return proximo
+
+def definir_proximo_indice(projeto_num: str, valor: int) -> None:
+    definir_contador(caminho_contador(projeto_num), valor)
+    _catalogo_projeto(projeto_num).definir_proximo_indice(projeto_num, valor)
+
+def carregar_historico_entregas(projeto_num: str) -> dict:
+    return {
+        "proximo": obter_proximo_indice(projeto_num),
+        "entregas": _catalogo_projeto(projeto_num).entregas_do_projeto(projeto_num),
+    }
+
+_historicos_importados: set[str] = set()
+
+def atualizar_historico(lista_arquivos, c=HISTORICO_JSON):
+    cat = _catalogo()
+    if c not in _historicos_importados and os.path.exists(c):
+        cat.importar_historico_arquivos_json(c)
+        _historicos_importados.add(c)
+    return cat.atualizar_historico_arquivos(lista_arquivos)
+
+# -----------------------------------------------------
+# FUNÇÕES DE TOKENIZAÇÃO E VALIDAÇÃO
+# -----------------------------------------------------
+def split_including_separators(nome_sem_ext: str, nomenclatura: dict) -> list[str]:
+    return tokenizar(nome_sem_ext)
+
+def verificar_tokens(tokens: list[str], nomenclatura: dict) -> list[str]:
+    return compilar_nomenclatura(nomenclatura).validar_tokens(tokens)
+
+# -----------------------------------------------------
+# REVISÕES E GRD
+# -----------------------------------------------------
+def chave_revisao(nome: str, validador: Optional[ValidadorNomenclatura] = None) -> Optional[tuple[str, str]]:
+    """
+    (identificador, revisão) do nome do arquivo pelo REVISÃO_ESPECIAL do validador
+    (padrão: R + 2 dígitos, separador '-'). O último token é a posição da revisão;
+    se não for uma revisão válida conta como a revisão inicial (R00).
+    None se não houver separador.
+    """
+    v = validador or _VALIDADOR_PADRAO
+    nb, _ = os.path.splitext(nome)
+    t = nb.split(v.revisao_separador)
+    if len(t)<2:
+        return None
+    rev = t[-1] if v.revisao_valida(t[-1]) else v.revisao_inicial
+    return v.revisao_separador.join(t[:-1]), rev
+
+def identificar_revisoes(lista_arquivos, chaves: Optional[dict] = None,
+                         validador: Optional[ValidadorNomenclatura] = None):
+    """chaves: nome → chave_revisao já calculada (pré-cálculo do vigia); o resto é calculado aqui."""
+    v = validador or _VALIDADOR_PADRAO
+    chaves = chaves or {}
+    grupos = {}
+    for a in lista_arquivos:
+        nome = a["Nome do Arquivo"]
+        ch = chaves[nome] if nome in chaves else chave_revisao(nome, v)
+        if ch is None:
+            continue
+        idf, rev = ch
+        grupos.setdefault(idf, []).append((rev, a))
+    arrv = []
+    aobs = []
+    for idf, arqs in grupos.items():
+        arqs.sort(key=lambda x: v.ordem_revisao(x[0]))
+        rm = arqs[-1][1]
+        arrv.append(rm)
+        aobs.extend([q[1] for q in arqs[:-1]])
+    return arrv, aobs
+
+def validador_projeto(projeto_num: Optional[str]) -> ValidadorNomenclatura:
+    return compilar_nomenclatura(carregar_regras_nomenclatura(projeto_num)) if projeto_num else _VALIDADOR_PADRAO
+
+def revisoes_por_nome(nomes, validador: ValidadorNomenclatura) -> dict[str, tuple[str, str]]:
+    """nome → (documento, revisão) dos arquivos cuja revisão segue o esquema do projeto."""
+    res = {}
+    for nome in nomes:
+        doc, rev = validador.separar_revisao(os.path.splitext(nome)[0])
+        if rev is not None:
+            res[nome] = (doc, rev)
+    return res
+
+def regressoes_do_lote(projeto_num: str, nomes, validador: ValidadorNomenclatura,
+                       pasta_entregas: Optional[Path] = None) -> list[dict]:
+    """
+    Arquivos com revisão anterior à última já entregue do mesmo documento
+    (catálogo local mais o histórico compartilhado de `pasta_entregas`, se informada).
+    """
+    idx = indice_revisoes(projeto_num, validador, _catalogo(), pasta_entregas)
+    return [{"arquivo": nome, "revisao": rev, "ultima": idx.ultima(doc)}
+            for nome, (doc, rev) in revisoes_por_nome(nomes, validador).items()
+            if idx.eh_regressao(doc, rev)]
+
+def _calc_md5(path: Path) -> str | None:
+    if not path.exists():
+        return None
+    return hash_arquivo(path)
+
+
+def _entrega_anterior(pasta_entrega: Path) -> Optional[Path]:
+    """
+    Entrega imediatamente anterior do mesmo tipo (maior número abaixo do desta),
+    esteja ela ativa ou já marcada -OBSOLETO.
+    """
+    m = ENTREGA_ANTERIOR_RE.match(pasta_entrega.name)
+    if not m:
+        return None
+    num = int(m.group(2))
+    melhor, melhor_num = None, 0
+    for sib in subpastas(pasta_entrega.parent):
+        ms = ENTREGA_ANTERIOR_RE.match(sib.name)
+        if ms and ms.group(1) == m.group(1) and melhor_num < int(ms.group(2)) < num:
+            melhor, melhor_num = Path(sib.path), int(ms.group(2))
+    return melhor
+
+
+def _resolver_pasta_entrega(pasta: Path) -> Path:
+    """O histórico guarda o nome da pasta na hora da entrega; depois ela pode ter virado -OBSOLETO."""
+    if pasta.exists() or not pasta.parent.exists():
+        return pasta
+    for cand in sorted(pasta.parent.glob(glob_escape(pasta.name) + "-OBSOLETO*")):
+        return cand
+    return pasta
+
+
+def _status_grd_entrega(ent: dict) -> dict[str, str]:
+    """
+    Status (novo/igual/revisado/mod_sem_rev) de cada arquivo de uma entrega.
+    Usa o manifesto (ou o _controle_entrega.json) gravado na hora da entrega; só
+    entregas antigas, sem esse dado, são recalculadas a partir dos arquivos.
+    """
+    pasta_entrega = _resolver_pasta_entrega(Path(ent["pasta_entrega"]))
+    manifesto = ler_manifesto(pasta_entrega)
+    if manifesto and all(nome in manifesto["arquivos"] for nome in ent["arquivos_entregues"]):
+        return {nome: manifesto["arquivos"][nome]["status"] for nome in ent["arquivos_entregues"]}
+    controle = pasta_entrega / "_controle_entrega.json"
+    if controle.exists():
+        try:
+            dados = json.loads(controle.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            dados = {}
+        status = {nome: dados[nome]["status_grd"] for nome in ent["arquivos_entregues"]
+                  if isinstance(dados.get(nome), dict) and "status_grd" in dados[nome]}
+        if len(status) == len(ent["arquivos_entregues"]):
+            return status
+
+    # entregas antigas, sem manifesto nem status gravado: lidas uma vez, contra a anterior explícita
+    anterior = _entrega_anterior(pasta_entrega)
+    man_ant = obter_manifesto(anterior, _VALIDADOR_PADRAO) if anterior else None
+    caminhos = [pasta_entrega / nome for nome in ent["arquivos_entregues"]]
+    hashes = {p.name: d for p, d in hashes_por_caminho(caminhos).items() if d is not None}
+    itens = montar_manifesto(pasta_entrega, hashes, man_ant, _VALIDADOR_PADRAO)["arquivos"]
+    return {nome: itens[nome]["status"] if nome in itens else "novo" for nome in ent["arquivos_entregues"]}
+
+
+def _cabecalho_entrega(ent: dict, numero: int) -> str:
+    tipo = ent.get("tipo_entrega", "EX")
+    return f"Z.{tipo}.ENT {str(numero).zfill(2)} - ENTREGUE"
+
+
+def _preencher_coluna_entrega(ws, col_atual: int, ent: dict) -> None:
+    cabec = _cabecalho_entrega(ent, col_atual - GRD_COL_INICIO + 1)
+    ws.cell(row=GRD_LINHA_CABEC, column=col_atual, value=cabec)
+
+    # copia largura & validação da coluna anterior (se houver)
+    if col_atual > GRD_COL_INICIO:
+        src_col = get_column_letter(col_atual - 1)
+        dst_col = get_column_letter(col_atual)
+        ws.column_dimensions[dst_col].width = ws.column_dimensions[src_col].width
+        for dv in list(ws.data_validations.dataValidation):
+            if dv.ranges and src_col in str(dv.ranges):
+                new_dv = DataValidation(
+                    type=dv.type, formula1=dv.formula1, allow_blank=dv.allow_blank
+                )
+                new_dv.add(f"{dst_col}6:{dst_col}2000")   # mesmo range aproximado
+                ws.add_data_validation(new_dv)
+
+    status_arquivos = _status_grd_entrega(ent)
+
+    # uma linha por arquivo, a partir da linha 8
+    linha = GRD_LINHA_DADOS
+    for nome in ent["arquivos_entregues"]:
+        extens = Path(nome).suffix.upper()  # ".PDF"
+        cor = fill_status(status_arquivos[nome])
+
+        # Grupo em branco (col-A)
+        ws.cell(row=linha, column=1, value="")
+
+        # Extens.
+        ws.cell(row=linha, column=2, value=extens)
+
+        # Celula da entrega
+        c = ws.cell(row=linha, column=col_atual, value=nome)
+        if cor:
+            c.fill = cor
+        linha += 1
+
+
+def _colunas_entrega_preenchidas(ws) -> int:
+    col = GRD_COL_INICIO
+    while ws.cell(row=GRD_LINHA_CABEC, column=col).value:
+        col += 1
+    return col - GRD_COL_INICIO
+
+
+@medido("grd")
+def criar_arquivo_controle(pasta_raiz_entregas: str, completo: bool = False) -> None:
+    """
+    Gera/atualiza GRD.xlsx no layout matricial.
+    Requer existir <pasta>/historico_entregas.jsonl (ou o .json antigo, que é migrado).
+
+    Por padrão é incremental: se o GRD.xlsx já contém todas as entregas
+    anteriores, só a coluna da última entrega é acrescentada. Com completo=True
+    (ou se o GRD estiver ausente/fora de sincronia) a planilha é refeita a
+    partir do template e de todo o histórico.
+    """
+    ultimo = ultimo_registro(pasta_raiz_entregas)
+    if ultimo is None:
+        logging.info("Histórico vazio ou inexistente em %s, GRD não gerado.", pasta_raiz_entregas)
+        return
+    total = ultimo["seq"]
+
+    out_path = Path(pasta_raiz_entregas) / "GRD.xlsx"
+    if not completo and out_path.exists():
+        wb = load_workbook(out_path)
+        ws = wb.active
+        if _colunas_entrega_preenchidas(ws) == total - 1:
+            _preencher_coluna_entrega(ws, GRD_COL_INICIO + total - 1, ultimo)
+            ws["B3"].value = datetime.now().strftime("%d/%m/%Y %H:%M")
+            wb.save(out_path)
+            logging.info("GRD.xlsx atualizado (incremental): %s", out_path)
+            return
+        logging.info("GRD.xlsx fora de sincronia com o histórico; refazendo completo.")
+
+    # refação completa em modo streaming: só os nomes e status ficam em memória
+    lidas = [0]
+
+    def _colunas():
+        for i, ent in enumerate(iterar_historico(pasta_raiz_entregas), start=1):
+            lidas[0] = i
+            status = _status_grd_entrega(ent)
+            yield _cabecalho_entrega(ent, i), [(nome, status[nome]) for nome in ent["arquivos_entregues"]]
+
+    escrever_grd_streaming(TEMPLATE_XLSX, _colunas(), out_path)
+    if lidas[0] != total:
+        # linhas danificadas no journal: renumera para o modo incremental voltar a casar
+        compactar_historico(pasta_raiz_entregas)
+    logging.info("GRD.xlsx atualizado: %s", out_path)
+
+
+# -----------------------------------------------------
+# FLUXO COMPLETO SEM INTERFACE
+# -----------------------------------------------------
+def localizar_pasta_entregas(pasta_disciplina: str | Path) -> Optional[str]:
+    """Nome real da pasta 1.ENTREGAS da disciplina (grafias como '1 - Entregas' são aceitas)."""
+    alvo = nome_normalizado(PASTA_ENTREGAS)
+    for e in subpastas(pasta_disciplina):
+        if nome_normalizado(e.name) == alvo:
+            return e.name
+    return None
+
+
+def carregar_diretorios_projetos(caminho: str | Path = PROJETOS_JSON) -> dict:
+    """número do projeto → pasta do projeto (mesmo JSON usado na seleção de projeto)."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validar_nomenclatura_lote(registros: list, esquema: dict) -> list[dict]:
+    """Arquivos com token incorreto ou faltando, com os status por token."""
+    pre = precalculo_do_lote(r.caminho for r in registros)
+    prontos = pre.codigos((r.nome for r in registros), assinatura_esquema(esquema)) if pre else {}
+    faltam = [r.nome for r in registros if r.nome not in prontos]
+    if faltam:
+        prontos.update(zip(faltam, compilar_nomenclatura(esquema).validar_lote(faltam)))
+    invalidos = []
+    for reg in registros:
+        cod = prontos[reg.nome]
+        if MISMATCH in cod or MISSING in cod:
+            invalidos.append({"arquivo": reg.nome, "tokens": [STATUS_TOKEN[c] for c in cod]})
+    return invalidos
+
+
+def executar_entrega(projeto_num: str, pasta_entregas: Path, caminhos: list[str], tipo: str,
+                     dedup: bool = False, forcar: bool = False, simular: bool = False) -> dict:
+    """
+    Mesmo fluxo das telas (nomenclatura ➜ revisões ➜ entrega ➜ GRD), sem janelas.
+
+    Se houver nomes fora do padrão a entrega não é feita (a tela também bloqueia),
+    a menos que forcar=True. simular=True para depois da separação de revisões.
+    Retorna um resumo serializável em JSON; resumo["ok"] indica sucesso. Com a
+    instrumentação ligada, resumo["instrumentacao"] traz o registro por etapa.
+    """
+    with medir("executar_entrega", projeto=str(projeto_num), tipo=tipo, arquivos=len(caminhos)) as medicao:
+        resumo = _executar_entrega(projeto_num, pasta_entregas, caminhos, tipo, dedup, forcar, simular)
+    if medicao.resumo():
+        resumo["instrumentacao"] = medicao.resumo()
+    return resumo
+
+
+def _executar_entrega(projeto_num: str, pasta_entregas: Path, caminhos: list[str], tipo: str,
+                      dedup: bool, forcar: bool, simular: bool) -> dict:
+    pasta_entregas = Path(pasta_entregas)
+    resumo: dict = {"projeto": str(projeto_num), "tipo": tipo, "pasta_entregas": str(pasta_entregas),
+                    "arquivos": len(caminhos), "ok": False, "segundos": {}}
+    t0 = time.perf_counter()
+    with medir("nomenclatura"):
+        registros = extrair_lote(caminhos)
+        esquema = carregar_regras_nomenclatura(projeto_num)
+        resumo["invalidos"] = validar_nomenclatura_lote(registros, esquema)
+    t1 = time.perf_counter()
+    resumo["segundos"]["nomenclatura"] = round(t1 - t0, 4)
+    if resumo["invalidos"] and not forcar:
+        resumo["erro"] = "nomenclatura"
+        return resumo
+
+    with medir("revisoes"):
+        validador = compilar_nomenclatura(esquema)
+        pre = precalculo_do_lote(caminhos)
+        chaves = pre.chaves_revisao(assinatura_esquema(esquema)) if pre else None
+        arrv, aobs = identificar_revisoes(registros, chaves, validador)
+        resumo["revisados"] = [a.nome for a in arrv]
+        resumo["obsoletos"] = [a.nome for a in aobs]
+        resumo["regressoes"] = regressoes_do_lote(projeto_num, resumo["revisados"], validador, pasta_entregas)
+    for r in resumo["regressoes"]:
+        logging.warning("%s: revisão %s anterior à última entregue (%s)", r["arquivo"], r["revisao"], r["ultima"])
+    t2 = time.perf_counter()
+    resumo["segundos"]["revisoes"] = round(t2 - t1, 4)
+    if simular:
+        resumo["ok"] = True
+        return resumo
+
+    nova = processar_entrega_arquivos_tipo([Path(a.caminho) for a in arrv + aobs], pasta_entregas,
+                                           tipo, dedup=dedup, projeto_num=projeto_num)
+    t3 = time.perf_counter()
+    resumo["segundos"]["entrega"] = round(t3 - t2, 4)
+    resumo["segundos"]["total"] = round(t3 - t0, 4)
+    resumo["entrega"] = str(nova)
+    grd = pasta_entregas / "GRD.xlsx"
+    resumo["grd"] = str(grd) if grd.exists() else None
+    resumo["ok"] = True
+    return resumo
@@ -1,27 +1,27 @@
 from utils.validation import identificar_nome_com_revisao
+from utils.varredura import varrer
 import os
 import datetime
 
+EXTENSOES_IGNORADAS = ('.jpg', '.jpeg', '.dwl', '.dwl2', '.png', '.ini')
+NOMES_IGNORADOS = ("dados_execucao_anterior.json",)
+PREFIXOS_IGNORADOS = ("GRD-ENTREGA.",)
+
+def iterar_arquivos_no_diretorio(diretorio):
+    """
+    Gera (revisão, nome, tamanho, caminho, data de modificação) conforme a varredura avança.
+    Nomes e extensões ignorados são descartados antes de qualquer stat ou regex.
+    """
+    for entry in varrer(diretorio, extensoes_ignoradas=EXTENSOES_IGNORADAS,
+                        nomes_ignorados=NOMES_IGNORADOS, prefixos_ignorados=PREFIXOS_IGNORADOS):
+        a = entry.name
+        _, rv, _ = identificar_nome_com_revisao(a)
+        st = entry.stat()
+        dmod = datetime.datetime.fromtimestamp(st.st_mtime).strftime("%d/%m/%Y %H:%M")
+        yield (rv, a, st.st_size, entry.path, dmod)
+
 def listar_arquivos_no_diretorio(diretorio):
-    ignorar = {"dados_execucao_anterior.json"}
-    for f in os.listdir(diretorio):
-        if f.startswith("GRD-ENTREGA."):
-            ignorar.add(f)
-    saida = []
-    for raiz, dirs, files in os.walk(diretorio):
-        for a in files:
-            if a in ignorar:
-                continue
-            nb, rv, ex = identificar_nome_com_revisao(a)
-            if ex in ['.jpg', '.jpeg', '.dwl', '.dwl2', '.png', '.ini']:
-                continue
-            cam = os.path.join(raiz, a)
-            tam = os.path.getsize(cam)
-            dmod_ts = os.path.getmtime(cam)
-            dmod = datetime.datetime.fromtimestamp(dmod_ts).strftime("%d/%m/%Y %H:%M")
-            saida.append((rv, a, tam, cam, dmod)) 
-            
-    return saida
+    return list(iterar_arquivos_no_diretorio(diretorio))
 
 def carregar_ultimo_diretorio():
     try:
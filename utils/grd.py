@@ -0,0 +1,148 @@
+from __future__ import annotations
+import copy
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+GRD_COL_INICIO = 3  # A=Grupo, B=Extens., C = 1ª entrega
+GRD_LINHA_CABEC = 5
+GRD_LINHA_DADOS = 8
+GRD_LINHA_FIM_VALIDACAO = 2000
+GRD_CELULA_GERADO_EM = (3, 2)  # B3
+
+CORES_STATUS_GRD = {
+    "novo": "C6EFCE",
+    "revisado": "9BC2E6",
+    "mod_sem_rev": "FFC000",
+}
+
+
+def fill_status(status: str) -> PatternFill | None:
+    cor = CORES_STATUS_GRD.get(status)
+    return PatternFill("solid", fgColor=cor) if cor else None
+
+
+def _copiar_estilo(origem, destino):
+    if origem.has_style:
+        destino.font = copy.copy(origem.font)
+        destino.fill = copy.copy(origem.fill)
+        destino.border = copy.copy(origem.border)
+        destino.alignment = copy.copy(origem.alignment)
+        destino.number_format = origem.number_format
+        destino.protection = copy.copy(origem.protection)
+
+
+def escrever_grd_streaming(
+    template: Path,
+    entregas: Iterable[tuple[str, list[tuple[str, str]]]],
+    out_path: Path,
+) -> None:
+    """
+    Gera o GRD.xlsx com o openpyxl em modo write-only, linha a linha.
+
+    entregas: (cabeçalho da coluna, [(nome_arquivo, status), ...]) na ordem do histórico.
+
+    O template (tamanho fixo) é lido normalmente só para copiar cabeçalho, estilos,
+    larguras, mesclagens e validações. As células de dados nunca viram objetos Cell
+    em memória: cada linha é montada e gravada direto no arquivo, então o consumo
+    não cresce com o tamanho da planilha, só com a lista de nomes do histórico.
+    """
+    tpl_wb = load_workbook(template)
+    tpl = tpl_wb.active
+
+    # colunas de entrega já existentes no template são descartadas (como na versão completa)
+    col_tpl_fim = GRD_COL_INICIO
+    while tpl.cell(row=GRD_LINHA_CABEC, column=col_tpl_fim).value:
+        col_tpl_fim += 1
+    cols_entrega_tpl = range(GRD_COL_INICIO, col_tpl_fim)
+
+    colunas = [(cabec, list(arquivos)) for cabec, arquivos in entregas]
+    n_linhas_dados = max((len(a) for _, a in colunas), default=0)
+    col_max = max(tpl.max_column, GRD_COL_INICIO + len(colunas) - 1)
+    linha_max = max(tpl.max_row, GRD_LINHA_DADOS + n_linhas_dados - 1)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(tpl.title)
+
+    # dimensões, mesclagens, painéis congelados
+    for letra, dim in tpl.column_dimensions.items():
+        ws.column_dimensions[letra].width = dim.width
+        ws.column_dimensions[letra].hidden = dim.hidden
+    largura_ent = tpl.column_dimensions[get_column_letter(GRD_COL_INICIO)].width
+    for i in range(1, len(colunas)):
+        ws.column_dimensions[get_column_letter(GRD_COL_INICIO + i)].width = largura_ent
+    for idx, dim in tpl.row_dimensions.items():
+        if dim.height is not None:
+            ws.row_dimensions[idx].height = dim.height
+    for rng in tpl.merged_cells.ranges:
+        ws.merged_cells.add(str(rng))
+    ws.freeze_panes = tpl.freeze_panes
+
+    # validações: as que tocam a 1ª coluna de entrega passam a cobrir todas as colunas
+    letra_ini = get_column_letter(GRD_COL_INICIO)
+    for dv in tpl.data_validations.dataValidation:
+        ws.data_validations.append(copy.copy(dv))
+        if colunas and letra_ini in str(dv.sqref):
+            novo = DataValidation(type=dv.type, formula1=dv.formula1, allow_blank=dv.allow_blank)
+            for i in range(1, len(colunas)):
+                letra = get_column_letter(GRD_COL_INICIO + i)
+                novo.add(f"{letra}6:{letra}{GRD_LINHA_FIM_VALIDACAO}")
+            if novo.sqref:
+                ws.data_validations.append(novo)
+
+    gerado_em = datetime.now().strftime("%d/%m/%Y %H:%M")
+    fills = {st: fill_status(st) for st in CORES_STATUS_GRD}
+
+    for r in range(1, linha_max + 1):
+        # extensão da coluna B: a última entrega que tem arquivo nesta linha prevalece
+        idx_dado = r - GRD_LINHA_DADOS
+        ext = None
+        if idx_dado >= 0:
+            for _, arquivos in reversed(colunas):
+                if idx_dado < len(arquivos):
+                    ext = Path(arquivos[idx_dado][0]).suffix.upper()
+                    break
+
+        linha = []
+        for c in range(1, col_max + 1):
+            tpl_cell = tpl.cell(row=r, column=c) if r <= tpl.max_row and c <= tpl.max_column else None
+            eh_col_entrega = c >= GRD_COL_INICIO and (c - GRD_COL_INICIO) < len(colunas)
+            limpa = ((c in cols_entrega_tpl and r >= GRD_LINHA_CABEC)
+                     or (eh_col_entrega and r == GRD_LINHA_CABEC))
+
+            valor = tpl_cell.value if tpl_cell is not None and not limpa else None
+            fill = None
+            if (r, c) == GRD_CELULA_GERADO_EM:
+                valor = gerado_em
+            elif r == GRD_LINHA_CABEC and eh_col_entrega:
+                valor = colunas[c - GRD_COL_INICIO][0]
+            elif ext is not None and c == 1:
+                valor = ""
+            elif ext is not None and c == 2:
+                valor = ext
+            elif idx_dado >= 0 and eh_col_entrega:
+                arquivos = colunas[c - GRD_COL_INICIO][1]
+                if idx_dado < len(arquivos):
+                    valor, status = arquivos[idx_dado]
+                    fill = fills.get(status)
+
+            if tpl_cell is None and fill is None:
+                linha.append(valor)
+                continue
+            cell = WriteOnlyCell(ws, value=valor)
+            if tpl_cell is not None:
+                _copiar_estilo(tpl_cell, cell)
+                if limpa:
+                    cell.fill = PatternFill()
+            if fill is not None:
+                cell.fill = fill
+            linha.append(cell)
+        ws.append(linha)
+
+    wb.save(out_path)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+import os
+import json
+import atexit
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from utils.instrumentacao import contar
+
+CACHE_HASHES_NOME = ".cache_hashes.json"
+CACHE_VERSAO = 1
+MAX_ENTRADAS_PADRAO = 50_000
+BUFFER_HASH = 1024 * 1024
+PASTAS_TIPO_ENTREGA = ("AP", "PE")
+PASTA_ENTREGAS = "1.ENTREGAS"
+# arquivos fora da estrutura de entregas (Desktop, temporários…) usam um cache local
+PASTA_CACHE_LOCAL = Path.home() / ".oae_eng" / "cache_hashes"
+
+
+def _chave(path: Path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class CacheHashes:
+    """
+    Cache persistente de hashes de conteúdo.
+    Uma entrada só é válida enquanto caminho, tamanho, mtime e inode forem os mesmos;
+    qualquer alteração no arquivo invalida o hash guardado.
+    """
+
+    def __init__(self, arquivo: Path, max_entradas: int = MAX_ENTRADAS_PADRAO):
+        self.arquivo = Path(arquivo)
+        self.max_entradas = max_entradas
+        self._entradas: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+        self._alterado = False
+        self.acertos = 0
+        self.falhas = 0
+        self._carregar()
+
+    def _carregar(self):
+        if not self.arquivo.exists():
+            return
+        try:
+            dados = json.loads(self.arquivo.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning("Cache de hashes ignorado (%s): %s", self.arquivo, e)
+            return
+        if dados.get("versao") != CACHE_VERSAO:
+            return
+        for chave, entrada in dados.get("entradas", {}).items():
+            self._entradas[chave] = entrada
+
+    def obter(self, path: Path, st: Optional[os.stat_result] = None, algoritmo: str = "md5") -> Optional[str]:
+        """Retorna o hash guardado se o arquivo não mudou desde o último cálculo."""
+        st = st or os.stat(path)
+        chave = _chave(path)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if (entrada is None
+                    or entrada[0] != st.st_size
+                    or entrada[1] != st.st_mtime_ns
+                    or entrada[2] != st.st_ino):
+                self.falhas += 1
+                contar("cache_falhas")
+                return None
+            digest = entrada[3].get(algoritmo)
+            if digest is None:
+                self.falhas += 1
+                contar("cache_falhas")
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            contar("cache_acertos")
+            return digest
+
+    def registrar(self, path: Path, digest: str, st: Optional[os.stat_result] = None, algoritmo: str = "md5"):
+        st = st or os.stat(path)
+        chave = _chave(path)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if (entrada is None
+                    or entrada[0] != st.st_size
+                    or entrada[1] != st.st_mtime_ns
+                    or entrada[2] != st.st_ino):
+                entrada = [st.st_size, st.st_mtime_ns, st.st_ino, {}]
+            entrada[3][algoritmo] = digest
+            self._entradas[chave] = entrada
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+            self._alterado = True
+
+    def hash_arquivo(self, path: Path, algoritmo: str = "md5", buf: int = BUFFER_HASH) -> str:
+        path = Path(path)
+        st = os.stat(path)
+        digest = self.obter(path, st, algoritmo)
+        if digest is not None:
+            return digest
+        h = hashlib.new(algoritmo)
+        with path.open("rb") as f:
+            while chunk := f.read(buf):
+                h.update(chunk)
+        digest = h.hexdigest()
+        contar("arquivos_hash")
+        contar("bytes_lidos", st.st_size)
+        self.registrar(path, digest, st, algoritmo)
+        return digest
+
+    def mover_pasta(self, origem: Path, destino: Path):
+        """Reaproveita as entradas de uma pasta renomeada (inode e mtime não mudam)."""
+        pre_o = _chave(origem) + os.sep
+        pre_d = _chave(destino) + os.sep
+        with self._lock:
+            for chave in [c for c in self._entradas if c.startswith(pre_o)]:
+                self._entradas[pre_d + chave[len(pre_o):]] = self._entradas.pop(chave)
+                self._alterado = True
+
+    def salvar(self):
+        with self._lock:
+            if not self._alterado:
+                return
+            dados = {"versao": CACHE_VERSAO, "entradas": dict(self._entradas)}
+            self._alterado = False
+        tmp = self.arquivo.with_name(self.arquivo.name + ".tmp")
+        try:
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False)
+            os.replace(tmp, self.arquivo)
+        except OSError as e:
+            logging.warning("Falha ao salvar cache de hashes %s: %s", self.arquivo, e)
+
+
+_caches: dict[str, CacheHashes] = {}
+_caches_lock = threading.Lock()
+
+
+def localizar_raiz_entregas(path: Path) -> Path:
+    """
+    Raiz de entregas de um arquivo: a pasta que contém AP/ e PE/
+    (ex.: 1.ENTREGAS/AP/1.AP - Entrega-3/arq.pdf ➜ 1.ENTREGAS; 1.ENTREGAS/arq.pdf ➜ 1.ENTREGAS).
+    Para arquivos fora dessa estrutura usa PASTA_CACHE_LOCAL, sem criar caches pelas pastas do usuário.
+    """
+    path = Path(path)
+    for anc in path.parents:
+        if anc.name in PASTAS_TIPO_ENTREGA:
+            return anc.parent
+    if path.parent.name == PASTA_ENTREGAS:
+        return path.parent
+    return PASTA_CACHE_LOCAL
+
+
+def cache_para_raiz(raiz: Path) -> CacheHashes:
+    chave = _chave(raiz)
+    with _caches_lock:
+        cache = _caches.get(chave)
+        if cache is None:
+            cache = CacheHashes(Path(raiz) / CACHE_HASHES_NOME)
+            _caches[chave] = cache
+        return cache
+
+
+def cache_para_arquivo(path: Path) -> CacheHashes:
+    return cache_para_raiz(localizar_raiz_entregas(path))
+
+
+def hash_arquivo(path: Path, algoritmo: str = "md5") -> str:
+    return cache_para_arquivo(path).hash_arquivo(path, algoritmo)
+
+
+def salvar_caches():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.salvar()
+
+
+atexit.register(salvar_caches)
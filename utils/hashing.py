@@ -0,0 +1,62 @@
+from __future__ import annotations
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from utils.hash_cache import cache_para_arquivo
+from utils.instrumentacao import contar
+
+# Em drive de rede o custo é dominado pela latência de cada leitura, não pela banda:
+# várias leituras simultâneas e buffers grandes escondem essa latência.
+HASH_WORKERS = min(16, (os.cpu_count() or 4) * 2)
+HASH_BUFFER = 1024 * 1024
+
+
+def _hash_direto(path: Path, algoritmo: str, buf: int) -> str:
+    h = hashlib.new(algoritmo)
+    lidos = 0
+    with path.open("rb") as f:
+        while chunk := f.read(buf):
+            h.update(chunk)
+            lidos += len(chunk)
+    contar("arquivos_hash")
+    contar("bytes_lidos", lidos)
+    return h.hexdigest()
+
+
+def _hash_um(path: Path, algoritmo: str, buf: int, usar_cache: bool) -> Optional[str]:
+    if not path.is_file():
+        return None
+    if usar_cache:
+        return cache_para_arquivo(path).hash_arquivo(path, algoritmo, buf)
+    return _hash_direto(path, algoritmo, buf)
+
+
+def calcular_hashes(
+    caminhos: Iterable[Path],
+    max_workers: int = HASH_WORKERS,
+    buf: int = HASH_BUFFER,
+    algoritmo: str = "md5",
+    usar_cache: bool = True,
+) -> Iterator[tuple[Path, Optional[str]]]:
+    """
+    Calcula os hashes em um pool limitado de threads e devolve (caminho, hash)
+    na ordem em que ficam prontos. Arquivos inexistentes retornam hash None.
+    """
+    caminhos = [Path(c) for c in caminhos]
+    if not caminhos:
+        return
+    workers = max(1, min(max_workers, len(caminhos)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hash") as pool:
+        futuros = {
+            pool.submit(_hash_um, c, algoritmo, buf, usar_cache): c
+            for c in caminhos
+        }
+        for fut in as_completed(futuros):
+            yield futuros[fut], fut.result()
+
+
+def hashes_por_caminho(caminhos: Iterable[Path], **kwargs) -> dict[Path, Optional[str]]:
+    return dict(calcular_hashes(caminhos, **kwargs))
@@ -0,0 +1,176 @@
+from __future__ import annotations
+import os
+import json
+import logging
+from pathlib import Path
+from typing import Iterator, Optional
+
+HISTORICO_JOURNAL = "historico_entregas.jsonl"
+HISTORICO_LEGADO = "historico_entregas.json"
+SUFIXO_MIGRADO = ".migrado"
+COMPACTAR_A_CADA = 100
+_JANELA_CAUDA = 64 * 1024
+
+
+class ErroHistoricoLegado(RuntimeError):
+    """historico_entregas.json antigo ainda não migrado (ilegível): anexar entregas perderia o histórico."""
+
+
+def _fsync_escrita(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def migrar_historico_legado(pasta_entregas: Path) -> bool:
+    """
+    Converte o historico_entregas.json (lista única) para o journal JSON Lines.
+    O arquivo antigo é mantido como historico_entregas.json.migrado.
+
+    Se o journal já existir (entregas anexadas enquanto o legado estava ilegível),
+    as entregas do legado entram antes das do journal e seq é renumerado.
+    Retorna False se o legado continua pendente (ilegível).
+    """
+    pasta_entregas = Path(pasta_entregas)
+    legado = pasta_entregas / HISTORICO_LEGADO
+    journal = pasta_entregas / HISTORICO_JOURNAL
+    if not legado.exists():
+        return True
+    try:
+        registros = json.loads(legado.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        # não descarta nada: o legado fica intacto para correção manual
+        logging.error("Histórico legado inválido em %s – %s; migração adiada", legado, e)
+        return False
+    posteriores = list(_ler_journal(journal)) if journal.exists() else []
+    tmp = journal.with_name(journal.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for seq, reg in enumerate(registros + posteriores, start=1):
+            f.write(json.dumps({**reg, "seq": seq}, ensure_ascii=False) + "\n")
+        _fsync_escrita(f)
+    os.replace(tmp, journal)
+    legado.rename(legado.with_name(legado.name + SUFIXO_MIGRADO))
+    logging.info("Histórico migrado para %s (%d entregas do legado, %d já no journal)",
+                 journal, len(registros), len(posteriores))
+    return True
+
+
+def verificar_historico(pasta_entregas: Path) -> None:
+    """Migra o legado pendente; ErroHistoricoLegado se ele continuar ilegível."""
+    if not migrar_historico_legado(pasta_entregas):
+        raise ErroHistoricoLegado(
+            f"{Path(pasta_entregas) / HISTORICO_LEGADO} não pôde ser lido; corrija ou remova o arquivo "
+            f"antes de novas entregas (o histórico antigo seria perdido na GRD)."
+        )
+
+
+def _reparar_cauda(journal: Path) -> None:
+    """Descarta uma última linha incompleta (queda durante a escrita) antes de anexar."""
+    with open(journal, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        tam = f.tell()
+        if tam == 0:
+            return
+        f.seek(tam - 1)
+        if f.read(1) == b"\n":
+            return
+        inicio = max(0, tam - _JANELA_CAUDA)
+        while True:
+            f.seek(inicio)
+            bloco = f.read(tam - inicio)
+            pos = bloco.rfind(b"\n")
+            if pos >= 0 or inicio == 0:
+                break
+            inicio = max(0, inicio - _JANELA_CAUDA)
+        corte = inicio + pos + 1 if pos >= 0 else 0
+        logging.warning("Linha incompleta descartada no fim de %s (%d bytes)", journal, tam - corte)
+        f.truncate(corte)
+        _fsync_escrita(f)
+
+
+def ultimo_registro(pasta_entregas: Path) -> Optional[dict]:
+    """Lê só o fim do journal para obter a última entrega (e seu seq)."""
+    pasta_entregas = Path(pasta_entregas)
+    migrar_historico_legado(pasta_entregas)
+    journal = pasta_entregas / HISTORICO_JOURNAL
+    if not journal.exists():
+        return None
+    with open(journal, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        tam = f.tell()
+        janela = _JANELA_CAUDA
+        while True:
+            inicio = max(0, tam - janela)
+            f.seek(inicio)
+            linhas = f.read(tam - inicio).splitlines()
+            # a primeira linha da janela pode estar cortada, exceto no início do arquivo
+            candidatas = linhas if inicio == 0 else linhas[1:]
+            for linha in reversed(candidatas):
+                try:
+                    return json.loads(linha)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+            if inicio == 0:
+                return None
+            janela *= 2
+
+
+def iterar_historico(pasta_entregas: Path) -> Iterator[dict]:
+    """Percorre as entregas em ordem, uma linha por vez, sem carregar o histórico inteiro."""
+    pasta_entregas = Path(pasta_entregas)
+    migrar_historico_legado(pasta_entregas)
+    journal = pasta_entregas / HISTORICO_JOURNAL
+    if not journal.exists():
+        return
+    yield from _ler_journal(journal)
+
+
+def _ler_journal(journal: Path) -> Iterator[dict]:
+    with open(journal, "r", encoding="utf-8", errors="replace") as f:
+        for n, linha in enumerate(f, start=1):
+            if not linha.strip():
+                continue
+            try:
+                yield json.loads(linha)
+            except json.JSONDecodeError:
+                logging.warning("Linha %d inválida ignorada em %s", n, journal)
+
+
+def compactar_historico(pasta_entregas: Path) -> int:
+    """
+    Reescreve o journal só com as linhas válidas, renumerando seq.
+    A troca é atômica (os.replace); retorna o número de entregas mantidas.
+    """
+    journal = Path(pasta_entregas) / HISTORICO_JOURNAL
+    if not journal.exists():
+        return 0
+    tmp = journal.with_name(journal.name + ".tmp")
+    total = 0
+    with open(tmp, "w", encoding="utf-8") as f:
+        for total, reg in enumerate(iterar_historico(pasta_entregas), start=1):
+            reg["seq"] = total
+            f.write(json.dumps(reg, ensure_ascii=False) + "\n")
+        _fsync_escrita(f)
+    os.replace(tmp, journal)
+    logging.info("Histórico compactado: %s (%d entregas)", journal, total)
+    return total
+
+
+def registrar_entrega(pasta_entregas: Path, registro: dict) -> int:
+    """
+    Anexa uma entrega ao journal (O(1), com fsync) e retorna seu seq.
+    A cada COMPACTAR_A_CADA entregas o journal é compactado. Com um legado
+    ilegível ainda pendente, levanta ErroHistoricoLegado sem anexar nada.
+    """
+    pasta_entregas = Path(pasta_entregas)
+    verificar_historico(pasta_entregas)
+    journal = pasta_entregas / HISTORICO_JOURNAL
+    if journal.exists():
+        _reparar_cauda(journal)
+    ultimo = ultimo_registro(pasta_entregas)
+    seq = (ultimo or {}).get("seq", 0) + 1
+    with open(journal, "a", encoding="utf-8") as f:
+        f.write(json.dumps({**registro, "seq": seq}, ensure_ascii=False) + "\n")
+        _fsync_escrita(f)
+    if seq % COMPACTAR_A_CADA == 0:
+        compactar_historico(pasta_entregas)
+    return seq
@@ -0,0 +1,149 @@
+from __future__ import annotations
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from utils.varredura import nome_normalizado
+
+PASTA_INDICES = Path.home() / ".oae_eng" / "indices"
+INDICE_VERSAO = 2
+# só raiz (disciplinas) e disciplinas (1.ENTREGAS…): as pastas de entrega AP/PE ficam de fora
+PROFUNDIDADE_MAXIMA = 1
+# pasta alterada há menos que isso pode mudar de novo sem mudar o mtime (resolução do FS)
+MARGEM_MTIME_NS = 2_000_000_000
+
+
+class IndiceProjeto:
+    """
+    Índice persistente de '3 Desenvolvimento' de um projeto: as disciplinas e as
+    subpastas de cada uma (onde fica a 1.ENTREGAS), até PROFUNDIDADE_MAXIMA.
+
+    atualizar() só relista (scandir) as pastas cujo mtime mudou desde a última
+    varredura; nas demais reaproveita o que está no índice (um stat por pasta).
+    Arquivos não entram no índice: os hashes já ficam no CacheHashes de cada
+    1.ENTREGAS, e as pastas de entrega (AP/PE) não são percorridas.
+    """
+
+    def __init__(self, caminho_projeto: str | Path, pasta_disciplinas: str = "3 Desenvolvimento",
+                 pasta_indices: Optional[Path] = None):
+        self.raiz = Path(caminho_projeto) / pasta_disciplinas
+        chave = hashlib.sha1(os.path.normcase(os.path.abspath(self.raiz)).encode("utf-8")).hexdigest()[:16]
+        self.arquivo = Path(pasta_indices or PASTA_INDICES) / f"indice_{chave}.json"
+        self._lock = threading.RLock()
+        # rel ('' = raiz, 'ARQ'…) → {"mtime_ns", "subpastas": [..]}
+        self._pastas: dict[str, dict] = {}
+        self.varrido_em: Optional[float] = None
+        self._carregar()
+
+    # ---------- persistência ----------
+    def _carregar(self) -> None:
+        try:
+            dados = json.loads(self.arquivo.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if dados.get("versao") != INDICE_VERSAO or dados.get("raiz") != str(self.raiz):
+            return
+        self._pastas = dados.get("pastas", {})
+        self.varrido_em = dados.get("varrido_em")
+
+    def salvar(self) -> None:
+        with self._lock:
+            dados = {"versao": INDICE_VERSAO, "raiz": str(self.raiz),
+                     "varrido_em": self.varrido_em, "pastas": self._pastas}
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.arquivo.with_name(self.arquivo.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.arquivo)
+
+    @property
+    def vazio(self) -> bool:
+        return not self._pastas
+
+    # ---------- varredura ----------
+    @staticmethod
+    def _ler_pasta(caminho: str, mtime_ns: int) -> dict:
+        subpastas = []
+        with os.scandir(caminho) as it:
+            for e in it:
+                try:
+                    if e.is_dir() and not e.is_symlink():
+                        subpastas.append(e.name)
+                except OSError:
+                    continue
+        info = {"mtime_ns": mtime_ns, "subpastas": sorted(subpastas)}
+        # pasta recém-alterada: o mtime real fica (é o exibido), mas a próxima varredura relê
+        if time.time_ns() - mtime_ns < MARGEM_MTIME_NS:
+            info["recente"] = True
+        return info
+
+    def atualizar(self, completo: bool = False) -> dict:
+        """Varredura incremental. Retorna {"lidas": n, "reaproveitadas": n, "alterado": bool}."""
+        with self._lock:
+            novas: dict[str, dict] = {}
+            lidas = reaproveitadas = 0
+            pendentes = [("", 0)]
+            while pendentes:
+                rel, nivel = pendentes.pop()
+                caminho = os.path.join(self.raiz, rel) if rel else str(self.raiz)
+                try:
+                    mtime_ns = os.stat(caminho).st_mtime_ns
+                except OSError:
+                    continue
+                ant = self._pastas.get(rel)
+                if not completo and ant is not None and ant["mtime_ns"] == mtime_ns and not ant.get("recente"):
+                    info = ant
+                    reaproveitadas += 1
+                else:
+                    try:
+                        info = self._ler_pasta(caminho, mtime_ns)
+                    except OSError as e:
+                        logging.warning("Pasta ilegível no índice %s – %s", caminho, e)
+                        continue
+                    lidas += 1
+                novas[rel] = info
+                if nivel < PROFUNDIDADE_MAXIMA:
+                    pendentes.extend((f"{rel}/{s}" if rel else s, nivel + 1) for s in reversed(info["subpastas"]))
+            alterado = lidas > 0 or novas.keys() != self._pastas.keys()
+            self._pastas = novas
+            self.varrido_em = time.time()
+            if alterado:
+                self.salvar()
+            logging.debug("Índice %s: %d pastas lidas, %d reaproveitadas", self.raiz, lidas, reaproveitadas)
+            return {"lidas": lidas, "reaproveitadas": reaproveitadas, "alterado": alterado}
+
+    # ---------- consultas ----------
+    def disciplinas(self) -> list[tuple[str, int]]:
+        """(nome, mtime_ns) das pastas de disciplina."""
+        with self._lock:
+            raiz = self._pastas.get("", {})
+            return [(nome, self._pastas.get(nome, {}).get("mtime_ns", 0)) for nome in raiz.get("subpastas", [])]
+
+    def subpastas(self, rel: str) -> list[str]:
+        return list(self._pastas.get(rel, {}).get("subpastas", []))
+
+    def pasta_entregas(self, disciplina: str, nome_padrao: str = "1.ENTREGAS") -> Optional[str]:
+        """Nome real da pasta de entregas da disciplina, sem ir ao disco."""
+        alvo = nome_normalizado(nome_padrao)
+        for nome in self.subpastas(disciplina):
+            if nome_normalizado(nome) == alvo:
+                return nome
+        return None
+
+
+_indices: dict[str, IndiceProjeto] = {}
+_indices_lock = threading.Lock()
+
+
+def indice_para_projeto(caminho_projeto: str | Path) -> IndiceProjeto:
+    chave = os.path.normcase(os.path.abspath(caminho_projeto))
+    with _indices_lock:
+        idx = _indices.get(chave)
+        if idx is None:
+            idx = _indices[chave] = IndiceProjeto(caminho_projeto)
+        return idx
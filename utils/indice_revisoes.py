@@ -0,0 +1,135 @@
+from __future__ import annotations
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from utils.catalogo import Catalogo
+from utils.historico import HISTORICO_JOURNAL, ErroHistoricoLegado, iterar_historico
+from utils.nomenclatura import ValidadorNomenclatura
+
+NOVO, REVISADO, MESMA_REVISAO, REGRESSAO = "novo", "revisado", "mesma_revisao", "regressao"
+
+
+class IndiceRevisoes:
+    """
+    Revisões já entregues de cada documento de um projeto, em memória.
+
+    Carregado do catálogo (tabela revisoes, gravada a cada entrega) uma vez por
+    processo e atualizado por registrar() na própria entrega. O catálogo é desta
+    máquina; reconciliar() completa o índice com o histórico compartilhado ao lado
+    da 1.ENTREGAS (entregas feitas em outras máquinas ou antes do catálogo), relendo-o
+    só quando o journal muda. A ordem das revisões
+    segue o REVISÃO_ESPECIAL do projeto (prefixo, nº de dígitos, numérica/alfabética),
+    então ultima() e situacao() são consultas O(1) a um dict, sem abrir as pastas -OBSOLETO.
+    """
+
+    def __init__(self, projeto: str, validador: ValidadorNomenclatura, catalogo: Catalogo):
+        self.projeto = str(projeto)
+        self.validador = validador
+        self._lock = threading.Lock()
+        # documento → [(ordem, revisão, pasta da entrega)] na ordem de entrega
+        self._historico: dict[str, list[tuple[int, str, str]]] = {}
+        self._ultima: dict[str, tuple[int, str]] = {}
+        self._vistos: set[tuple[str, str, str]] = set()
+        # pasta de entregas → (tamanho, mtime_ns) do journal na última reconciliação
+        self._journais: dict[str, Optional[tuple[int, int]]] = {}
+        for documento, revisao, pasta in catalogo.revisoes_do_projeto(self.projeto):
+            self._adicionar(documento, revisao, pasta)
+
+    def _adicionar(self, documento: str, revisao: str, pasta: str) -> None:
+        ordem = self.validador.ordem_revisao(revisao)
+        if ordem < 0 or (documento, revisao, pasta) in self._vistos:
+            return  # revisão fora do esquema atual do projeto, ou já conhecida
+        self._vistos.add((documento, revisao, pasta))
+        self._historico.setdefault(documento, []).append((ordem, revisao, pasta))
+        if ordem >= self._ultima.get(documento, (-1, ""))[0]:
+            self._ultima[documento] = (ordem, revisao)
+
+    def registrar(self, documento: str, revisao: str, pasta_entrega: str) -> None:
+        with self._lock:
+            self._adicionar(documento, revisao, str(pasta_entrega))
+
+    def reconciliar(self, pasta_entregas: Path) -> None:
+        """Inclui as entregas do histórico de `pasta_entregas` que o catálogo não tem."""
+        pasta_entregas = Path(pasta_entregas)
+        try:
+            st = os.stat(pasta_entregas / HISTORICO_JOURNAL)
+            marca = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            marca = None
+        chave = str(pasta_entregas)
+        if chave in self._journais and self._journais[chave] == marca:
+            return
+        try:
+            registros = list(iterar_historico(pasta_entregas))
+        except (OSError, ErroHistoricoLegado) as e:
+            logging.warning("Histórico de %s não lido para o índice de revisões: %s", pasta_entregas, e)
+            return
+        with self._lock:
+            for reg in registros:
+                pasta = str(reg.get("pasta_entrega", ""))
+                for nome in reg.get("arquivos_entregues", ()):
+                    doc, rev = self.validador.separar_revisao(os.path.splitext(nome)[0])
+                    if rev is not None:
+                        self._adicionar(doc, rev, pasta)
+            self._journais[chave] = marca
+
+    def ultima(self, documento: str) -> Optional[str]:
+        """Última (maior) revisão já entregue do documento."""
+        ult = self._ultima.get(documento)
+        return ult[1] if ult else None
+
+    def historico(self, documento: str) -> list[tuple[str, str]]:
+        """(revisão, pasta da entrega) de cada entrega do documento, na ordem de entrega."""
+        return [(rev, pasta) for _, rev, pasta in self._historico.get(documento, ())]
+
+    def situacao(self, documento: str, revisao: str) -> str:
+        ult = self._ultima.get(documento)
+        if ult is None:
+            return NOVO
+        ordem = self.validador.ordem_revisao(revisao)
+        if ordem > ult[0]:
+            return REVISADO
+        return MESMA_REVISAO if ordem == ult[0] else REGRESSAO
+
+    def eh_regressao(self, documento: str, revisao: str) -> bool:
+        return self.situacao(documento, revisao) == REGRESSAO
+
+    def __len__(self):
+        return len(self._ultima)
+
+
+_indices: dict[tuple[str, str], IndiceRevisoes] = {}
+_indices_lock = threading.Lock()
+
+
+def _esquema_revisao(validador: ValidadorNomenclatura) -> tuple:
+    return (validador.revisao_prefixo, validador.revisao_ndigitos, validador.revisao_numerica,
+            validador.revisao_separador)
+
+
+def indice_revisoes(projeto: str, validador: ValidadorNomenclatura, catalogo: Catalogo,
+                    pasta_entregas: Optional[Path] = None) -> IndiceRevisoes:
+    """
+    Um índice por projeto e catálogo; refeito se o esquema de revisão do projeto mudar.
+    Com `pasta_entregas`, reconciliado com o histórico compartilhado dessa 1.ENTREGAS.
+    """
+    chave = (str(projeto), str(catalogo.caminho_db))
+    with _indices_lock:
+        idx = _indices.get(chave)
+        if idx is None or _esquema_revisao(idx.validador) != _esquema_revisao(validador):
+            idx = _indices[chave] = IndiceRevisoes(projeto, validador, catalogo)
+    if pasta_entregas is not None:
+        idx.reconciliar(pasta_entregas)
+    return idx
+
+
+def atualizar_indice_revisoes(projeto: str, catalogo: Catalogo, revisoes, pasta_entrega: str) -> None:
+    """Depois de gravar a entrega no catálogo: inclui as revisões no índice, se ele já estiver carregado."""
+    idx = _indices.get((str(projeto), str(catalogo.caminho_db)))
+    if idx is None:
+        return  # será carregado do catálogo, já com esta entrega
+    for documento, revisao in revisoes:
+        idx.registrar(documento, revisao, pasta_entrega)
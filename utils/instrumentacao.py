@@ -0,0 +1,199 @@
+from __future__ import annotations
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+
+# contadores incrementados nos pontos de I/O (cópia, hash, cache de hashes, comparação)
+CONTADORES = ("bytes_lidos", "bytes_gravados", "arquivos_hash", "cache_acertos", "cache_falhas",
+              "arquivos_copiados", "arquivos_vinculados")
+ARQUIVO_PADRAO = Path.home() / ".oae_eng" / "instrumentacao.jsonl"
+# OAE_INSTRUMENTACAO=1 (arquivo padrão) ou =<caminho do .jsonl> liga a medição sem mudar código
+VARIAVEL_AMBIENTE = "OAE_INSTRUMENTACAO"
+
+_ativo = False
+_destino: Optional[Path] = None
+_contadores = dict.fromkeys(CONTADORES, 0)
+_lock = threading.Lock()
+_pilha = threading.local()
+
+
+def ativar(destino: str | os.PathLike | None = "") -> None:
+    """
+    Liga a medição; cada entrega vira uma linha JSON em `destino`
+    (padrão: ARQUIVO_PADRAO; None: só o resumo no log).
+    """
+    global _ativo, _destino
+    if destino == "":
+        destino = ARQUIVO_PADRAO
+    _destino = Path(destino) if destino else None
+    _ativo = True
+
+
+def desativar() -> None:
+    global _ativo
+    _ativo = False
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def contar(chave: str, n: int = 1) -> None:
+    """Soma n ao contador do processo; as etapas abertas guardam a diferença entre início e fim."""
+    if not _ativo:
+        return
+    with _lock:
+        _contadores[chave] += n
+
+
+def _foto() -> dict[str, int]:
+    with _lock:
+        return dict(_contadores)
+
+
+class Medicao:
+    """
+    Etapa medida do fluxo: tempo de relógio e a variação dos contadores de I/O.
+
+    Medições se aninham por thread (a de fora é a entrega); os contadores são do
+    processo, então o trabalho das threads de cópia/hash entra na etapa que as
+    disparou. Ao fechar a medição raiz, o registro com todas as etapas internas é
+    gravado como uma linha JSON e o resumo vai para o log.
+    """
+
+    __slots__ = ("nome", "atributos", "registro", "_filhas", "_pai", "_t0", "_inicio")
+
+    def __init__(self, nome: str, **atributos):
+        self.nome = nome
+        self.atributos = atributos
+        self.registro: Optional[dict] = None
+        self._filhas: list[dict] = []
+
+    def anotar(self, **atributos) -> None:
+        self.atributos.update(atributos)
+
+    def __enter__(self):
+        pilha = _pilha.__dict__.setdefault("abertas", [])
+        self._pai = pilha[-1] if pilha else None
+        pilha.append(self)
+        self._inicio = _foto()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo_exc, exc, tb):
+        seg = time.perf_counter() - self._t0
+        fim = _foto()
+        _pilha.abertas.pop()
+        reg = {"nome": self.nome, "segundos": round(seg, 6),
+               **{k: fim[k] - self._inicio[k] for k in CONTADORES}, **self.atributos}
+        if tipo_exc is not None:
+            reg["erro"] = tipo_exc.__name__
+        if self._pai is not None:
+            reg["nivel"] = len(_pilha.abertas)
+            self._pai._filhas.append(reg)
+            self._pai._filhas.extend(self._filhas)
+        else:
+            reg["data"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            reg["etapas"] = self._filhas
+            _emitir(reg)
+        self.registro = reg
+        return False
+
+    def resumo(self) -> Optional[dict]:
+        """Registro depois de fechada (na raiz, com a lista de etapas internas)."""
+        return self.registro
+
+
+class _MedicaoNula:
+    """Medição desligada: o mesmo objeto serve para todas as etapas, sem custo."""
+
+    __slots__ = ()
+
+    def anotar(self, **atributos) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def resumo(self) -> None:
+        return None
+
+
+_NULA = _MedicaoNula()
+
+
+def medir(nome: str, **atributos):
+    """with medir("copia", arquivos=n): …  (desligada, devolve um contexto vazio)."""
+    return Medicao(nome, **atributos) if _ativo else _NULA
+
+
+def anotar(**atributos) -> None:
+    """Acrescenta atributos (pasta, nº de arquivos…) à medição aberta mais interna desta thread."""
+    if not _ativo:
+        return
+    abertas = getattr(_pilha, "abertas", None)
+    if abertas:
+        abertas[-1].anotar(**atributos)
+
+
+def medido(nome: Optional[str] = None):
+    """Decorador: a chamada inteira vira uma etapa (nome padrão: o da função)."""
+    def decorador(func):
+        rotulo = nome or func.__name__
+
+        @wraps(func)
+        def envolvida(*args, **kwargs):
+            if not _ativo:
+                return func(*args, **kwargs)
+            with Medicao(rotulo):
+                return func(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def _emitir(reg: dict) -> None:
+    logging.info("%s", formatar_resumo(reg))
+    if _destino is None:
+        return
+    try:
+        _destino.parent.mkdir(parents=True, exist_ok=True)
+        with _lock, open(_destino, "a", encoding="utf-8") as f:
+            f.write(json.dumps(reg, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logging.warning("Falha ao gravar instrumentação em %s: %s", _destino, e)
+
+
+def formatar_resumo(reg: dict) -> str:
+    """Tabela de texto de um registro raiz: uma linha por etapa, com % do tempo total."""
+    total = reg["segundos"] or 1e-9
+    linhas = [f"Instrumentação – {reg['nome']}: {reg['segundos']:.3f} s",
+              f"  {'etapa':<28}{'s':>9}{'%':>6}{'MB lidos':>10}{'MB grav.':>10}"
+              f"{'hash':>7}{'cache +/-':>12}{'cópias':>8}"]
+    for e in [reg, *reg.get("etapas", [])]:
+        nome = "  " * e.get("nivel", 0) + e["nome"]
+        cache = f"{e['cache_acertos']}/{e['cache_falhas']}"
+        linhas.append(
+            f"  {nome:<28}{e['segundos']:9.3f}{100 * e['segundos'] / total:6.1f}"
+            f"{e['bytes_lidos'] / 1048576:10.1f}{e['bytes_gravados'] / 1048576:10.1f}"
+            f"{e['arquivos_hash']:7d}{cache:>12}"
+            f"{e['arquivos_copiados']:8d}"
+        )
+    return "\n".join(linhas)
+
+
+def _configurar_do_ambiente() -> None:
+    valor = os.environ.get(VARIAVEL_AMBIENTE, "").strip()
+    if valor and valor != "0":
+        ativar(ARQUIVO_PADRAO if valor == "1" else valor)
+
+
+_configurar_do_ambiente()
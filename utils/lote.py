@@ -0,0 +1,153 @@
+from __future__ import annotations
+import os
+import glob
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Iterable, Optional
+
+from utils import entrega
+from utils import instrumentacao
+from utils.comparacao import configurar_comparacao
+from utils.copia import definir_limite_io
+from utils.varredura import subpastas
+
+LOTE_PROCESSOS = max(1, min(4, (os.cpu_count() or 1)))
+LOTE_LIMITE_IO = 2  # cópias simultâneas somando todos os processos
+
+
+def planejar_lote(
+    projetos: dict[str, str],
+    padroes: Iterable[str],
+    tipo: str,
+    disciplinas: Optional[Iterable[str]] = None,
+    **opcoes,
+) -> list[dict]:
+    """
+    Uma tarefa por disciplina (pasta em '3 Desenvolvimento' com 1.ENTREGAS) de cada projeto.
+    padroes: globs relativos à 1.ENTREGAS. Disciplinas sem arquivos não geram tarefa.
+    opcoes (dedup, forcar, simular) vão para entrega.executar_entrega.
+    """
+    padroes = list(padroes)
+    filtro = {d.lower() for d in disciplinas} if disciplinas else None
+    tarefas = []
+    for num, caminho in projetos.items():
+        pasta_disc = Path(caminho) / entrega.PASTA_DISCIPLINAS
+        if not pasta_disc.is_dir():
+            logging.warning("Projeto %s sem pasta %s: %s", num, entrega.PASTA_DISCIPLINAS, caminho)
+            continue
+        for disc in sorted(subpastas(pasta_disc), key=lambda e: e.name):
+            if filtro and disc.name.lower() not in filtro:
+                continue
+            nome_ent = entrega.localizar_pasta_entregas(disc.path)
+            if not nome_ent:
+                continue
+            pasta_ent = Path(disc.path) / nome_ent
+            caminhos = []
+            for padrao in padroes:
+                caminhos.extend(p for p in sorted(glob.glob(os.path.join(glob.escape(str(pasta_ent)), padrao)))
+                                if os.path.isfile(p))
+            if not caminhos:
+                continue
+            tarefas.append({
+                "projeto": str(num),
+                "disciplina": disc.name,
+                "pasta_entregas": str(pasta_ent),
+                "caminhos": list(dict.fromkeys(caminhos)),
+                "tipo": tipo,
+                **opcoes,
+            })
+    return tarefas
+
+
+def _inicializar_processo(semaforo_io, regras: Optional[str], comparacao: Optional[str] = None,
+                          algoritmo: Optional[str] = None, instrumentar: Optional[str] = None) -> None:
+    logging.basicConfig(level=logging.INFO,
+                        format="%(asctime)s [%(levelname)s] %(processName)s %(message)s")
+    definir_limite_io(semaforo_io)
+    if regras:
+        entrega.NOMENCLATURA_REGRAS_JSON = regras
+    configurar_comparacao(comparacao, algoritmo)
+    if instrumentar:
+        instrumentacao.ativar(instrumentar)
+
+
+def _executar_grupo(tarefas: list[dict]) -> list[dict]:
+    """Tarefas da mesma 1.ENTREGAS, em sequência (a numeração das entregas depende disso)."""
+    resultados = []
+    for t in tarefas:
+        t0 = time.perf_counter()
+        try:
+            res = entrega.executar_entrega(
+                t["projeto"], Path(t["pasta_entregas"]), t["caminhos"], t["tipo"],
+                dedup=t.get("dedup", False), forcar=t.get("forcar", False), simular=t.get("simular", False),
+            )
+        except Exception as e:
+            # isolamento: a falha de uma disciplina não interrompe as demais
+            logging.exception("Falha na entrega de %s", t["pasta_entregas"])
+            res = {"ok": False, "erro": type(e).__name__, "mensagem": str(e)}
+        res.update(projeto=t["projeto"], disciplina=t.get("disciplina"), pasta_entregas=t["pasta_entregas"],
+                   segundos_tarefa=round(time.perf_counter() - t0, 4))
+        resultados.append(res)
+    return resultados
+
+
+def executar_lote(
+    tarefas: list[dict],
+    max_processos: int = LOTE_PROCESSOS,
+    limite_io: int = LOTE_LIMITE_IO,
+    regras: Optional[str] = None,
+    comparacao: Optional[str] = None,
+    algoritmo: Optional[str] = None,
+    instrumentar: Optional[str] = None,
+) -> dict:
+    """
+    Executa as tarefas de planejar_lote num pool de processos.
+
+    Tarefas com a mesma pasta 1.ENTREGAS formam um grupo executado em sequência num
+    único processo; grupos diferentes correm em paralelo. Um semáforo compartilhado
+    limita quantas cópias acontecem ao mesmo tempo em todo o lote (limite_io).
+    comparacao/algoritmo: política de comparação de arquivos em cada processo (utils.comparacao).
+    instrumentar: arquivo .jsonl onde cada processo acrescenta o registro de cada entrega.
+    Retorna o relatório agregado (resultados por tarefa + totais).
+    """
+    grupos: dict[str, list[dict]] = {}
+    for t in tarefas:
+        grupos.setdefault(os.path.normcase(os.path.abspath(t["pasta_entregas"])), []).append(t)
+
+    t0 = time.perf_counter()
+    resultados: list[dict] = []
+    if grupos:
+        ctx = multiprocessing.get_context("spawn")
+        semaforo = ctx.BoundedSemaphore(max(1, limite_io))
+        with ProcessPoolExecutor(max_workers=max(1, min(max_processos, len(grupos))), mp_context=ctx,
+                                 initializer=_inicializar_processo, initargs=(semaforo, regras, comparacao, algoritmo, instrumentar)) as pool:
+            futuros = {pool.submit(_executar_grupo, g): g for g in grupos.values()}
+            for fut in as_completed(futuros):
+                try:
+                    resultados.extend(fut.result())
+                except Exception as e:  # processo morto (BrokenProcessPool etc.)
+                    for t in futuros[fut]:
+                        resultados.append({"ok": False, "erro": type(e).__name__, "mensagem": str(e),
+                                           "projeto": t["projeto"], "disciplina": t.get("disciplina"),
+                                           "pasta_entregas": t["pasta_entregas"]})
+    seg = max(time.perf_counter() - t0, 1e-9)
+
+    resultados.sort(key=lambda r: (r["projeto"], r.get("disciplina") or ""))
+    ok = sum(1 for r in resultados if r.get("ok"))
+    arquivos = sum(r.get("arquivos", 0) for r in resultados if r.get("ok"))
+    relatorio = {
+        "tarefas": len(resultados),
+        "ok": ok,
+        "falhas": len(resultados) - ok,
+        "arquivos": arquivos,
+        "segundos": round(seg, 3),
+        "tarefas_s": round(len(resultados) / seg, 2),
+        "arquivos_s": round(arquivos / seg, 2),
+        "resultados": resultados,
+    }
+    logging.info("Lote concluído: %d tarefas (%d ok, %d falhas), %d arquivos em %.2f s",
+                 relatorio["tarefas"], ok, relatorio["falhas"], arquivos, seg)
+    return relatorio
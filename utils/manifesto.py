@@ -0,0 +1,145 @@
+from __future__ import annotations
+import os
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from utils.hashing import hashes_por_caminho
+from utils.nomenclatura import ValidadorNomenclatura
+from utils.varredura import arquivos
+
+MANIFESTO_NOME = "_manifesto_entrega.json"
+MANIFESTO_VERSAO = 1
+# arquivos de controle gravados dentro da pasta da entrega (não são arquivos entregues)
+ARQUIVOS_CONTROLE = frozenset({"_controle_entrega.json", MANIFESTO_NOME})
+
+
+def chave_documento(nome: str, documento: str) -> str:
+    """Identidade do arquivo entre entregas: documento (nome sem revisão) + extensão."""
+    return documento + os.path.splitext(nome)[1].lower()
+
+
+def status_contra_anterior(chave: str, revisao: Optional[str], digest: Optional[str],
+                           anterior: Optional[dict], validador: ValidadorNomenclatura) -> str:
+    """
+    Status da GRD de um arquivo frente à entrega anterior, pela identidade do
+    documento (chave_documento): novo, igual, revisado ou mod_sem_rev.
+    """
+    if not anterior:
+        return "novo"
+    ant = anterior["documentos"].get(chave)
+    if ant is None:
+        return "novo"
+    if digest is not None and digest == ant["hash"]:
+        return "igual"
+    if revisao and validador.ordem_revisao(revisao) > validador.ordem_revisao(ant["revisao"] or ""):
+        return "revisado"
+    return "mod_sem_rev"
+
+
+def montar_manifesto(pasta_entrega: Path, hashes: dict[str, Optional[str]], anterior: Optional[dict],
+                     validador: ValidadorNomenclatura, algoritmo: str = "md5", **extras) -> dict:
+    """
+    Manifesto de uma entrega: por arquivo, tamanho, mtime, hash, documento/revisão
+    e a ordem da revisão (pelo esquema do projeto) e status contra o manifesto da entrega anterior.
+    hashes: nome → hash já calculado (na cópia); só o stat de cada arquivo é lido aqui.
+    """
+    pasta_entrega = Path(pasta_entrega)
+    itens = {}
+    for nome, digest in hashes.items():
+        st = os.stat(pasta_entrega / nome)
+        documento, revisao = validador.separar_revisao(os.path.splitext(nome)[0])
+        itens[nome] = {
+            "tamanho": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "hash": digest,
+            "documento": documento,
+            "revisao": revisao,
+            "ordem": validador.ordem_revisao(revisao) if revisao else -1,
+            "status": status_contra_anterior(chave_documento(nome, documento), revisao, digest,
+                                             anterior, validador),
+        }
+    manifesto = {
+        "versao": MANIFESTO_VERSAO,
+        "pasta": pasta_entrega.name,
+        "data": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "algoritmo": algoritmo,
+        "anterior": anterior["pasta"] if anterior else None,
+        "arquivos": itens,
+    }
+    manifesto.update(extras)
+    return _indexar(manifesto)
+
+
+def _indexar(manifesto: dict) -> dict:
+    # chave_documento → maior revisão do documento nesta entrega (consultado pela entrega
+    # seguinte; não é gravado). Compara pela ordem do esquema gravada em cada item; manifestos
+    # gravados antes dela (sem "ordem") caem na ordem do texto da revisão.
+    documentos: dict[str, dict] = {}
+    ordens: dict[str, tuple[int, str]] = {}
+    for nome, item in manifesto["arquivos"].items():
+        chave = chave_documento(nome, item["documento"])
+        ordem = (item.get("ordem", -1), item["revisao"] or "")
+        if chave not in ordens or ordem >= ordens[chave]:
+            ordens[chave] = ordem
+            documentos[chave] = {"nome": nome, "hash": item["hash"], "revisao": item["revisao"]}
+    manifesto["documentos"] = documentos
+    return manifesto
+
+
+def gravar_manifesto(pasta_entrega: Path, manifesto: dict) -> Path:
+    destino = Path(pasta_entrega) / MANIFESTO_NOME
+    tmp = destino.with_name(destino.name + ".tmp")
+    dados = {k: v for k, v in manifesto.items() if k != "documentos"}
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, destino)
+    return destino
+
+
+def ler_manifesto(pasta_entrega: Path) -> Optional[dict]:
+    try:
+        dados = json.loads((Path(pasta_entrega) / MANIFESTO_NOME).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning("Manifesto ignorado em %s: %s", pasta_entrega, e)
+        return None
+    if dados.get("versao") != MANIFESTO_VERSAO:
+        return None
+    # a pasta pode ter sido renomeada (-OBSOLETO) depois de gravado o manifesto
+    dados["pasta"] = Path(pasta_entrega).name
+    return _indexar(dados)
+
+
+def manifesto_de_arquivos(pasta_entrega: Path, validador: ValidadorNomenclatura,
+                          anterior: Optional[dict] = None) -> dict:
+    """Entregas antigas, sem manifesto: monta o equivalente lendo os arquivos (hash via cache)."""
+    caminhos = [Path(e.path) for e in arquivos(pasta_entrega) if e.name not in ARQUIVOS_CONTROLE]
+    hashes = {p.name: d for p, d in hashes_por_caminho(caminhos).items()}
+    return montar_manifesto(pasta_entrega, hashes, anterior, validador)
+
+
+def obter_manifesto(pasta_entrega: Path, validador: ValidadorNomenclatura) -> dict:
+    return ler_manifesto(pasta_entrega) or manifesto_de_arquivos(pasta_entrega, validador)
+
+
+def comparacao_por_nome(manifesto: dict, anterior: Optional[dict], pasta_anterior: Optional[Path]) -> dict:
+    """Mesmo formato de comparar_arquivos (novo/modificado/nao_modificado/removido), só com manifestos."""
+    itens_ant = anterior["arquivos"] if anterior else {}
+    resultado: dict[str, dict] = {}
+    for nome, item in manifesto["arquivos"].items():
+        ant = itens_ant.get(nome)
+        if ant is None:
+            resultado[nome] = {"status": "novo"}
+        else:
+            resultado[nome] = {
+                "status": "nao_modificado" if item["hash"] == ant["hash"] else "modificado",
+                "versao_anterior": str(Path(pasta_anterior) / nome),
+            }
+    for nome in itens_ant:
+        if nome not in resultado:
+            resultado[nome] = {"status": "removido", "versao_anterior": str(Path(pasta_anterior) / nome)}
+    return resultado
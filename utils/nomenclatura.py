@@ -0,0 +1,141 @@
+from __future__ import annotations
+import os
+import re
+from typing import Iterable, Optional
+
+NOME_REVISAO_ESPECIAL = "REVISÃO_ESPECIAL"
+SEPARADORES = ("-", ".")
+_RE_TOKENS = re.compile(r"[-.]|[^-.]+")
+
+# códigos compactos usados por validar_lote; STATUS_TOKEN[c] dá o nome
+OK, MISMATCH, MISSING = 0, 1, 2
+STATUS_TOKEN = ("ok", "mismatch", "missing")
+
+
+def tokenizar(nome_sem_ext: str) -> list[str]:
+    """Mesma quebra de split_including_separators: valores e separadores '-'/'.' intercalados."""
+    return _RE_TOKENS.findall(nome_sem_ext)
+
+
+class ValidadorNomenclatura:
+    """
+    Esquema de nomenclatura de um projeto compilado uma única vez.
+
+    - esperados: sequência imutável campo/separador, como em verificar_tokens;
+      para campos Fixo guarda um frozenset dos valores permitidos (None = livre).
+    - revisão: prefixo, nº de dígitos e tipo (Numérico/alfabético) de REVISÃO_ESPECIAL.
+    """
+
+    __slots__ = ("esperados", "_sep_esperado", "_permitidos", "n_esperados",
+                 "revisao_prefixo", "revisao_ndigitos", "revisao_numerica",
+                 "revisao_separador", "_re_revisao", "valido")
+
+    def __init__(self, esquema: Optional[dict]):
+        self.valido = bool(esquema) and "campos" in esquema
+        campos = esquema["campos"] if self.valido else []
+
+        esperados: list[tuple[bool, object]] = []
+        for idx, cinfo in enumerate(campos):
+            permitidos = None
+            if cinfo.get("tipo", "Fixo") == "Fixo" and cinfo.get("valores_fixos"):
+                permitidos = frozenset(
+                    f.get("value", "") if isinstance(f, dict) else str(f)
+                    for f in cinfo["valores_fixos"]
+                )
+            esperados.append((False, permitidos))
+            if idx < len(campos) - 1:
+                esperados.append((True, cinfo.get("separador", "-")))
+        self.esperados = tuple(esperados)
+        self.n_esperados = len(esperados)
+        self._sep_esperado = tuple(v if eh_sep else None for eh_sep, v in esperados)
+        self._permitidos = tuple(None if eh_sep else v for eh_sep, v in esperados)
+
+        rev = next((c for c in campos if c.get("nome") == NOME_REVISAO_ESPECIAL), None)
+        rev = rev or (esquema or {})
+        self.revisao_prefixo = rev.get("revisao_prefixo", "R")
+        self.revisao_ndigitos = int(rev.get("revisao_ndigitos", 2))
+        self.revisao_numerica = rev.get("revisao_opcao", "Numérico") == "Numérico"
+        self.revisao_separador = rev.get("revisao_separador", "-")
+        corpo = r"\d" if self.revisao_numerica else r"[A-Za-z]"
+        self._re_revisao = re.compile(
+            re.escape(self.revisao_prefixo) + corpo + "{" + str(self.revisao_ndigitos) + "}"
+        )
+
+    def revisao_valida(self, token: str) -> bool:
+        return self._re_revisao.fullmatch(token) is not None
+
+    @property
+    def revisao_inicial(self) -> str:
+        return self.revisao_prefixo + ("0" if self.revisao_numerica else "A") * self.revisao_ndigitos
+
+    def ordem_revisao(self, revisao: str) -> int:
+        """Posição da revisão na sequência do esquema (R00 < R01…, RA < RB…); -1 se inválida."""
+        if not self.revisao_valida(revisao):
+            return -1
+        corpo = revisao[len(self.revisao_prefixo):]
+        if self.revisao_numerica:
+            return int(corpo)
+        ordem = 0
+        for c in corpo.upper():
+            ordem = ordem * 26 + ord(c) - ord("A")
+        return ordem
+
+    def separar_revisao(self, nome_sem_ext: str) -> tuple[str, Optional[str]]:
+        """(documento, revisão) pelo separador do esquema; revisão None se o último token não for uma."""
+        documento, sep, revisao = nome_sem_ext.rpartition(self.revisao_separador)
+        if sep and self.revisao_valida(revisao):
+            return documento, revisao
+        return nome_sem_ext, None
+
+    def codigos(self, tokens: list[str]) -> bytes:
+        """Status de cada token (e de cada token esperado que faltou) como bytes de códigos."""
+        if not self.valido:
+            return bytes([MISMATCH]) * len(tokens)
+        n_tok = len(tokens)
+        n_exp = self.n_esperados
+        seps = self._sep_esperado
+        perm = self._permitidos
+        out = bytearray()
+        for i in range(min(n_tok, n_exp)):
+            t = tokens[i]
+            sep = seps[i]
+            if sep is not None:
+                out.append(OK if t == sep else MISMATCH)
+            else:
+                p = perm[i]
+                out.append(OK if p is None or t in p else MISMATCH)
+        if n_tok > n_exp:
+            out.extend(bytes([MISMATCH]) * (n_tok - n_exp))
+        elif n_exp > n_tok:
+            out.extend(bytes([MISSING]) * (n_exp - n_tok))
+        return bytes(out)
+
+    def validar_tokens(self, tokens: list[str]) -> list[str]:
+        return [STATUS_TOKEN[c] for c in self.codigos(tokens)]
+
+    def validar_lote(self, nomes: Iterable[str]) -> list[bytes]:
+        """
+        Valida vários nomes de arquivo (com ou sem extensão) de uma vez.
+        Retorna, para cada nome, os códigos OK/MISMATCH/MISSING por token.
+        """
+        codigos = self.codigos
+        achar = _RE_TOKENS.findall
+        splitext = os.path.splitext
+        return [codigos(achar(splitext(n)[0])) for n in nomes]
+
+
+_compilados: dict[int, tuple[dict, ValidadorNomenclatura]] = {}
+
+
+def compilar_nomenclatura(esquema: Optional[dict]) -> ValidadorNomenclatura:
+    """Compila (ou reaproveita) o validador do esquema; o esquema não deve ser alterado depois."""
+    if not esquema:
+        return ValidadorNomenclatura(esquema)
+    atual = _compilados.get(id(esquema))
+    if atual is not None and atual[0] is esquema:
+        return atual[1]
+    validador = ValidadorNomenclatura(esquema)
+    if len(_compilados) > 64:
+        _compilados.clear()
+    _compilados[id(esquema)] = (esquema, validador)
+    return validador
@@ -0,0 +1,146 @@
+from __future__ import annotations
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+PASTA_PRECALCULO = Path.home() / ".oae_eng" / "precalculo"
+PRECALCULO_VERSAO = 1
+
+
+def assinatura_esquema(esquema: dict) -> str:
+    """Identifica o conjunto de regras: resultados de outra versão das regras não valem."""
+    bruto = json.dumps(esquema, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(bruto).hexdigest()[:16]
+
+
+class PreCalculo:
+    """
+    Resultados pré-calculados (pelo vigia) dos nomes de uma pasta 1.ENTREGAS.
+
+    Validação de tokens e agrupamento de revisões dependem só do nome do arquivo e
+    das regras do projeto, então ficam guardados por nome junto com a assinatura das
+    regras: consultá-los na entrega não exige nenhum acesso à pasta. Os hashes de
+    conteúdo não ficam aqui: vão para o CacheHashes, que confere o stat do arquivo.
+
+    O arquivo fica em ~/.oae_eng/precalculo (local) e é relido quando outro processo
+    (o vigia) o regrava.
+    """
+
+    def __init__(self, pasta_entregas: str | Path, pasta_cache: Optional[Path] = None):
+        self.pasta = os.path.normcase(os.path.abspath(pasta_entregas))
+        chave = hashlib.sha1(self.pasta.encode("utf-8")).hexdigest()[:16]
+        self.arquivo = Path(pasta_cache or PASTA_PRECALCULO) / f"precalculo_{chave}.json"
+        self._lock = threading.Lock()
+        self.assinatura: Optional[str] = None
+        # nome → [códigos ("0012"), [identificador, revisão] ou None]
+        self._nomes: dict[str, list] = {}
+        self._lido_ns: Optional[int] = None
+        self._alterado = False
+        self.recarregar()
+
+    def recarregar(self) -> None:
+        try:
+            mtime_ns = os.stat(self.arquivo).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._lido_ns:
+            return
+        try:
+            dados = json.loads(self.arquivo.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning("Pré-cálculo ignorado (%s): %s", self.arquivo, e)
+            return
+        if dados.get("versao") != PRECALCULO_VERSAO or dados.get("pasta") != self.pasta:
+            return
+        with self._lock:
+            self.assinatura = dados.get("assinatura")
+            self._nomes = dados.get("nomes", {})
+            self._lido_ns = mtime_ns
+            self._alterado = False
+
+    def salvar(self) -> None:
+        with self._lock:
+            if not self._alterado:
+                return
+            dados = {"versao": PRECALCULO_VERSAO, "pasta": self.pasta,
+                     "assinatura": self.assinatura, "nomes": self._nomes}
+            self._alterado = False
+        self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.arquivo.with_name(self.arquivo.name + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dados, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.arquivo)
+            self._lido_ns = os.stat(self.arquivo).st_mtime_ns
+        except OSError as e:
+            logging.warning("Falha ao salvar o pré-cálculo %s: %s", self.arquivo, e)
+
+    def definir_regras(self, assinatura: str) -> None:
+        with self._lock:
+            if assinatura != self.assinatura:
+                self.assinatura = assinatura
+                self._nomes = {}
+                self._alterado = True
+
+    def faltantes(self, nomes: Iterable[str]) -> list[str]:
+        with self._lock:
+            return [n for n in nomes if n not in self._nomes]
+
+    def registrar(self, nome: str, codigos: bytes, chave_revisao: Optional[tuple[str, str]]) -> None:
+        with self._lock:
+            self._nomes[nome] = ["".join(map(str, codigos)),
+                                 list(chave_revisao) if chave_revisao is not None else None]
+            self._alterado = True
+
+    def podar(self, existentes: Iterable[str]) -> None:
+        """Esquece os nomes que saíram da pasta."""
+        existentes = set(existentes)
+        with self._lock:
+            for nome in [n for n in self._nomes if n not in existentes]:
+                del self._nomes[nome]
+                self._alterado = True
+
+    def codigos(self, nomes: Iterable[str], assinatura: str) -> dict[str, bytes]:
+        """nome → códigos por token dos nomes já calculados com estas regras."""
+        with self._lock:
+            if assinatura != self.assinatura:
+                return {}
+            return {n: bytes(map(int, self._nomes[n][0])) for n in nomes if n in self._nomes}
+
+    def chaves_revisao(self, assinatura: Optional[str]) -> dict[str, Optional[tuple[str, str]]]:
+        """
+        nome → (identificador, revisão) ou None, para identificar_revisoes. As chaves
+        dependem do REVISÃO_ESPECIAL: com outras regras (ou sem regras) nada vale.
+        """
+        with self._lock:
+            if assinatura is None or assinatura != self.assinatura:
+                return {}
+            return {n: tuple(v[1]) if v[1] is not None else None for n, v in self._nomes.items()}
+
+    def __len__(self):
+        return len(self._nomes)
+
+
+_precalculos: dict[str, PreCalculo] = {}
+_precalculos_lock = threading.Lock()
+
+
+def precalculo_para_pasta(pasta_entregas: str | Path) -> PreCalculo:
+    chave = os.path.normcase(os.path.abspath(pasta_entregas))
+    with _precalculos_lock:
+        pre = _precalculos.get(chave)
+        if pre is None:
+            pre = _precalculos[chave] = PreCalculo(pasta_entregas)
+            return pre
+    pre.recarregar()
+    return pre
+
+
+def precalculo_do_lote(caminhos: Iterable[str]) -> Optional[PreCalculo]:
+    """Pré-cálculo da pasta dos arquivos, se todos vierem da mesma pasta."""
+    pastas = {os.path.dirname(c) for c in caminhos if c}
+    return precalculo_para_pasta(pastas.pop()) if len(pastas) == 1 else None
@@ -0,0 +1,125 @@
+from __future__ import annotations
+import os
+import threading
+from datetime import datetime
+from typing import Iterable, Optional
+
+# chave usada nas telas/dicts antigos ➜ atributo do registro
+CAMPOS_REGISTRO = {
+    "Status": "status",
+    "Cliente": "cliente",
+    "N° do Projeto": "projeto",
+    "Organização": "organizacao",
+    "Sigla da Disciplina": "disciplina",
+    "Fase": "fase",
+    "Tipo de Documento": "tipo_documento",
+    "Conjunto": "conjunto",
+    "N° do Documento": "num_documento",
+    "Bloco": "bloco",
+    "Pavimento": "pavimento",
+    "Subsistema": "subsistema",
+    "Tipo do Desenho": "tipo_desenho",
+    "Revisão": "revisao",
+    "Nome do Arquivo": "nome",
+    "Extensão": "extensao",
+    "Modificação": "modificacao",
+    "Modificado por": "modificado_por",
+    "caminho": "caminho",
+}
+# posição no nome (split por '-') dos campos simples; Conjunto/N° do Documento vêm de pt[7]
+_POSICOES = (
+    (0, "status"), (1, "cliente"), (2, "projeto"), (3, "organizacao"), (4, "disciplina"),
+    (5, "fase"), (6, "tipo_documento"), (8, "bloco"), (9, "pavimento"), (10, "subsistema"),
+    (11, "tipo_desenho"), (12, "revisao"),
+)
+
+
+class RegistroArquivo:
+    """
+    Dados extraídos do nome de um arquivo de entrega, sem um dict por arquivo.
+
+    Aceita o acesso antigo por chave (reg["Nome do Arquivo"], reg.get("Revisão", ""))
+    para que as telas que recebiam o dict de extrair_dados_arquivo continuem iguais.
+    """
+
+    __slots__ = tuple(CAMPOS_REGISTRO.values())
+
+    def __init__(self, nome: str, caminho: str = "", modificacao: str = "",
+                 modificado_por: str = "Usuário"):
+        nb, ext = os.path.splitext(nome)
+        pt = nb.split("-")
+        n = len(pt)
+        for pos, attr in _POSICOES:
+            setattr(self, attr, pt[pos] if n > pos else "")
+        cr = pt[7] if n > 7 else ""
+        cs = cr.split(".")
+        self.conjunto = cs[0]
+        self.num_documento = cs[1] if len(cs) > 1 else ""
+        self.nome = nome
+        self.extensao = ext.strip("-")
+        self.modificacao = modificacao
+        self.modificado_por = modificado_por
+        self.caminho = caminho
+
+    # ---------- acesso compatível com o dict antigo ----------
+    def __getitem__(self, chave: str):
+        try:
+            return getattr(self, CAMPOS_REGISTRO[chave])
+        except KeyError:
+            raise KeyError(chave) from None
+
+    def __setitem__(self, chave: str, valor) -> None:
+        setattr(self, CAMPOS_REGISTRO[chave], valor)
+
+    def get(self, chave: str, padrao=None):
+        attr = CAMPOS_REGISTRO.get(chave)
+        return getattr(self, attr) if attr else padrao
+
+    def como_dict(self) -> dict:
+        return {chave: getattr(self, attr) for chave, attr in CAMPOS_REGISTRO.items()}
+
+    def __repr__(self):
+        return f"RegistroArquivo({self.nome!r}, caminho={self.caminho!r})"
+
+
+def extrair_lote(caminhos: Iterable[str]) -> list[RegistroArquivo]:
+    """Cria os registros de vários arquivos de uma vez (uma única data de modificação por lote)."""
+    hoje = datetime.now().strftime("%d/%m/%Y")
+    basename = os.path.basename
+    return [RegistroArquivo(basename(c), caminho=c, modificacao=hoje) for c in caminhos]
+
+
+class RepositorioRegistros:
+    """
+    Registros por caminho compartilhados entre as telas: um arquivo já selecionado
+    em uma tela não é processado de novo nas seguintes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_caminho: dict[str, RegistroArquivo] = {}
+
+    def obter_lote(self, caminhos: Iterable[str]) -> list[RegistroArquivo]:
+        caminhos = [str(c) for c in caminhos]
+        with self._lock:
+            faltantes = [c for c in dict.fromkeys(caminhos) if c not in self._por_caminho]
+            for reg in extrair_lote(faltantes):
+                self._por_caminho[reg.caminho] = reg
+            return [self._por_caminho[c] for c in caminhos]
+
+    def obter(self, caminho: str) -> RegistroArquivo:
+        return self.obter_lote([caminho])[0]
+
+    def buscar(self, caminho: str) -> Optional[RegistroArquivo]:
+        return self._por_caminho.get(str(caminho))
+
+    def descartar(self, caminhos: Iterable[str]) -> None:
+        with self._lock:
+            for c in caminhos:
+                self._por_caminho.pop(str(c), None)
+
+    def __len__(self):
+        return len(self._por_caminho)
+
+
+REGISTROS = RepositorioRegistros()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+import os
+import re
+import json
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+PASTA_REGRAS_LOCAL = Path.home() / ".oae_eng" / "nomenclaturas"
+INDICE_REGRAS = "_indice.json"
+TEMPO_LIMITE_DRIVE = 3.0  # s para o stat no drive compartilhado antes de usar a cópia local
+
+
+def _stat_com_limite(caminho: Path, limite: float) -> Optional[os.stat_result]:
+    """os.stat em thread própria: um drive de rede travado não segura a interface."""
+    res: dict = {}
+
+    def _alvo():
+        try:
+            res["st"] = os.stat(caminho)
+        except OSError as e:
+            res["erro"] = e
+
+    t = threading.Thread(target=_alvo, daemon=True, name="stat-regras")
+    t.start()
+    t.join(limite)
+    if t.is_alive():
+        logging.warning("Drive lento: stat de %s passou de %.1f s; usando cópia local", caminho, limite)
+        return None
+    if "erro" in res:
+        logging.warning("Arquivo %s indisponível (%s); usando cópia local", caminho, res["erro"])
+        return None
+    return res["st"]
+
+
+def _nome_shard(projeto: str) -> str:
+    return re.sub(r"[^\w.-]", "_", projeto) + ".json"
+
+
+def _gravar_json(destino: Path, dados) -> None:
+    """
+    Gravação atômica por um temporário exclusivo: os processos de um lote gravam os
+    mesmos shards ao mesmo tempo, e todos gravam o mesmo conteúdo. Se a troca
+    falhar porque outro processo acabou de publicar o destino, a cópia dele vale.
+    """
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=destino.parent, prefix=destino.name + ".",
+                                     suffix=".tmp", delete=False) as f:
+        json.dump(dados, f, ensure_ascii=False)
+    try:
+        os.replace(f.name, destino)
+    except OSError:
+        os.unlink(f.name)
+        if not destino.exists():
+            raise
+        logging.debug("%s publicado por outro processo durante a gravação", destino)
+
+
+class RegrasNomenclatura:
+    """
+    Leitura das regras de nomenclatura por projeto, sem reler o JSON inteiro a cada análise.
+
+    - Em memória: as entradas já lidas ficam guardadas enquanto tamanho e mtime do
+      arquivo de origem não mudarem.
+    - Em disco: na primeira leitura (ou quando a origem muda) o JSON é quebrado em um
+      arquivo por projeto em pasta_local, com um _indice.json guardando a assinatura
+      (tamanho, mtime) da origem. Depois disso carregar um projeto é ler um shard pequeno,
+      independente de quantos projetos existam.
+    - Offline/lento: se o stat da origem falhar ou demorar, o shard local é usado.
+    """
+
+    def __init__(self, origem: str | Path, pasta_local: Optional[Path] = None,
+                 tempo_limite: float = TEMPO_LIMITE_DRIVE):
+        self.origem = Path(origem)
+        self.pasta_local = Path(pasta_local or PASTA_REGRAS_LOCAL)
+        self.tempo_limite = tempo_limite
+        self._lock = threading.Lock()
+        self._assinatura: Optional[list] = None
+        self._memoria: dict[str, Optional[dict]] = {}
+        self._indice: Optional[dict] = None
+
+    # ---------- índice local ----------
+    def _ler_indice(self) -> dict:
+        if self._indice is None:
+            try:
+                self._indice = json.loads((self.pasta_local / INDICE_REGRAS).read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                self._indice = {"assinatura": None, "projetos": {}}
+        return self._indice
+
+    def _ler_shard(self, projeto: str) -> Optional[dict]:
+        nome = self._ler_indice()["projetos"].get(projeto)
+        if not nome:
+            return None
+        try:
+            return json.loads((self.pasta_local / nome).read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning("Shard de regras %s ilegível – %s", nome, e)
+            return None
+
+    def _fragmentar(self, assinatura: list) -> bool:
+        """Lê a origem uma vez e regrava os shards locais. False se a origem for inválida."""
+        try:
+            with open(self.origem, encoding="utf-8") as f:
+                todas = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error("JSON inválido em %s – %s", self.origem, e)
+            return False
+        self.pasta_local.mkdir(parents=True, exist_ok=True)
+        projetos = {}
+        for chave, entrada in todas.items():
+            nome = _nome_shard(str(chave))
+            _gravar_json(self.pasta_local / nome, entrada)
+            projetos[str(chave)] = nome
+        antigos = set(self._ler_indice()["projetos"].values()) - set(projetos.values())
+        for nome in antigos:
+            (self.pasta_local / nome).unlink(missing_ok=True)
+        self._indice = {"origem": str(self.origem), "assinatura": assinatura, "projetos": projetos}
+        _gravar_json(self.pasta_local / INDICE_REGRAS, self._indice)
+        self._memoria = {k: todas[k] for k in todas}
+        logging.info("Regras de nomenclatura fragmentadas: %d projetos em %s", len(projetos), self.pasta_local)
+        return True
+
+    # ---------- API ----------
+    def obter(self, projeto: str | int) -> Optional[dict]:
+        """Entrada do projeto no JSON de regras (ou None)."""
+        projeto = str(projeto)
+        with self._lock:
+            st = _stat_com_limite(self.origem, self.tempo_limite)
+            if st is not None:
+                assinatura = [st.st_size, st.st_mtime_ns]
+                if assinatura != self._assinatura:
+                    self._memoria.clear()
+                    self._assinatura = assinatura
+                    indice = self._ler_indice()
+                    atualizado = (indice.get("assinatura") == assinatura
+                                  and indice.get("origem") == str(self.origem))
+                    if not atualizado and not self._fragmentar(assinatura):
+                        # origem corrompida: continua com os shards da última versão válida
+                        self._assinatura = None
+            if projeto not in self._memoria:
+                self._memoria[projeto] = self._ler_shard(projeto)
+            return self._memoria[projeto]
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._assinatura = None
+            self._memoria.clear()
+            self._indice = None
+
+
+_repositorios: dict[tuple[str, str], RegrasNomenclatura] = {}
+
+
+def regras_para(origem: str | Path, pasta_local: Optional[Path] = None) -> RegrasNomenclatura:
+    """Uma instância por (origem, pasta_local) no processo, para o cache em memória valer entre telas."""
+    pasta_local = pasta_local or PASTA_REGRAS_LOCAL
+    chave = (str(origem), str(pasta_local))
+    repo = _repositorios.get(chave)
+    if repo is None:
+        repo = _repositorios[chave] = RegrasNomenclatura(origem, pasta_local)
+    return repo
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import os
+from typing import Callable, Iterable, Iterator, Optional
+
+# No Windows o DirEntry já vem com tamanho/mtime (FindNextFile): entry.stat() não vai à rede.
+# No Linux entry.is_dir()/is_file() usam o d_type e entry.stat() é cacheado após a 1ª chamada.
+
+
+def varrer(
+    diretorio: str | os.PathLike,
+    extensoes_ignoradas: Iterable[str] = (),
+    nomes_ignorados: Iterable[str] = (),
+    prefixos_ignorados: tuple[str, ...] = (),
+    podar: Optional[Callable[[os.DirEntry], bool]] = None,
+    recursivo: bool = True,
+    pastas: bool = False,
+) -> Iterator[os.DirEntry]:
+    """
+    Percorre o diretório com os.scandir e devolve os DirEntry conforme são lidos.
+
+    Os filtros são aplicados só com o nome (sem stat e sem parse):
+    - extensoes_ignoradas: comparação em minúsculas, com ponto (".png");
+    - nomes_ignorados / prefixos_ignorados: valem para arquivos;
+    - podar(entry): True para não descer naquela subpasta.
+    pastas=True devolve as pastas (e não os arquivos) — com recursivo=False,
+    é a listagem das subpastas imediatas. Erro ao abrir o próprio diretorio é propagado.
+    """
+    ext_ign = frozenset(e.lower() for e in extensoes_ignoradas)
+    nomes_ign = frozenset(nomes_ignorados)
+    raiz = os.fspath(diretorio)
+    pendentes = [raiz]
+    while pendentes:
+        atual = pendentes.pop()
+        try:
+            it = os.scandir(atual)
+        except OSError:
+            if atual == raiz:  # só subpastas sumidas/sem permissão são puladas, como no os.walk
+                raise
+            continue
+        filhas = []
+        with it:
+            for entry in it:
+                try:
+                    eh_pasta = entry.is_dir()
+                except OSError:
+                    continue
+                if eh_pasta:
+                    if podar is not None and podar(entry):
+                        continue
+                    if pastas:
+                        yield entry
+                    if recursivo and not entry.is_symlink():  # como os.walk(followlinks=False)
+                        filhas.append(entry.path)
+                    continue
+                if pastas:
+                    continue
+                nome = entry.name
+                if nome in nomes_ign or (prefixos_ignorados and nome.startswith(prefixos_ignorados)):
+                    continue
+                if ext_ign and os.path.splitext(nome)[1].lower() in ext_ign:
+                    continue
+                yield entry
+        # ordem de os.walk (de cima para baixo, subpastas em ordem de leitura)
+        pendentes.extend(reversed(filhas))
+
+
+def arquivos(diretorio: str | os.PathLike, **filtros) -> Iterator[os.DirEntry]:
+    """Só os arquivos diretamente em diretorio (sem descer), com os mesmos filtros de varrer."""
+    return varrer(diretorio, recursivo=False, **filtros)
+
+
+def subpastas(diretorio: str | os.PathLike, podar: Optional[Callable[[os.DirEntry], bool]] = None
+              ) -> Iterator[os.DirEntry]:
+    return varrer(diretorio, recursivo=False, pastas=True, podar=podar)
+
+
+def nome_normalizado(nome: str) -> str:
+    """Nome de pasta sem caixa, espaços e '-', '_', '.' (ex.: '1 - Entregas' == '1.ENTREGAS')."""
+    return nome.lower().replace(" ", "").replace("-", "").replace("_", "").replace(".", "")
@@ -0,0 +1,235 @@
+from __future__ import annotations
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+from utils import entrega
+from utils.file_operations import EXTENSOES_IGNORADAS, NOMES_IGNORADOS, PREFIXOS_IGNORADOS
+from utils.hash_cache import CACHE_HASHES_NOME, salvar_caches
+from utils.hashing import hashes_por_caminho
+from utils.nomenclatura import compilar_nomenclatura
+from utils.precalculo import precalculo_para_pasta, assinatura_esquema
+from utils.varredura import arquivos, subpastas
+
+VIGIA_DEBOUNCE_S = 2.0        # silêncio na pasta antes de pré-calcular (cópias grandes geram muitos eventos)
+VIGIA_INTERVALO_S = 5.0       # polling: intervalo entre as conferências das pastas
+# arquivos escritos pelo próprio pré-cálculo não contam como mudança
+_NOMES_PROPRIOS = (CACHE_HASHES_NOME, CACHE_HASHES_NOME + ".tmp")
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x040, 0x080, 0x100, 0x200
+IN_DELETE_SELF, IN_MOVE_SELF, IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x400, 0x800, 0x4000, 0x8000, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+_MASCARA = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+_EVENTO = struct.Struct("iIII")
+
+
+class FonteInotify:
+    """Eventos do kernel (Linux) via libc/ctypes. Não funciona em drives de rede."""
+
+    def __init__(self, pastas):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._pastas: dict[int, str] = {}
+        for p in pastas:
+            wd = self._add_watch(self._fd, os.fsencode(p), _MASCARA)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch {p}")
+            self._pastas[wd] = p
+
+    def esperar(self, timeout: float) -> set[str]:
+        """Pastas com mudança nos próximos `timeout` segundos (vazio se nada aconteceu)."""
+        prontos, _, _ = select.select([self._fd], [], [], max(timeout, 0))
+        if not prontos:
+            return set()
+        try:
+            dados = os.read(self._fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return set()
+            raise
+        mudaram, pos = set(), 0
+        while pos < len(dados):
+            wd, mascara, _, tam = _EVENTO.unpack_from(dados, pos)
+            nome = dados[pos + _EVENTO.size: pos + _EVENTO.size + tam].rstrip(b"\0")
+            pos += _EVENTO.size + tam
+            if mascara & IN_Q_OVERFLOW:
+                mudaram.update(self._pastas.values())
+            elif mascara & IN_ISDIR or mascara & IN_IGNORED or os.fsdecode(nome) in _NOMES_PROPRIOS:
+                continue  # subpastas de entrega (AP/PE) e o cache de hashes não interessam
+            elif wd in self._pastas:
+                mudaram.add(self._pastas[wd])
+        return mudaram
+
+    def fechar(self) -> None:
+        os.close(self._fd)
+
+
+class FontePolling:
+    """Conferência periódica de nome/tamanho/mtime dos arquivos de cada pasta (qualquer SO/drive)."""
+
+    def __init__(self, pastas, intervalo_s: float = VIGIA_INTERVALO_S):
+        self._pastas = list(pastas)
+        self._intervalo = intervalo_s
+        self._fotos = {p: self._foto(p) for p in self._pastas}
+        self._proxima = time.monotonic() + intervalo_s
+
+    @staticmethod
+    def _foto(pasta: str) -> Optional[frozenset]:
+        foto = set()
+        try:
+            for e in arquivos(pasta, nomes_ignorados=_NOMES_PROPRIOS):
+                st = e.stat()
+                foto.add((e.name, st.st_size, st.st_mtime_ns))
+        except OSError:
+            return None
+        return frozenset(foto)
+
+    def esperar(self, timeout: float) -> set[str]:
+        espera = self._proxima - time.monotonic()
+        if espera > timeout:
+            time.sleep(max(timeout, 0))
+            return set()
+        time.sleep(max(espera, 0))
+        self._proxima = time.monotonic() + self._intervalo
+        mudaram = set()
+        for p in self._pastas:
+            foto = self._foto(p)
+            if foto != self._fotos[p]:
+                self._fotos[p] = foto
+                mudaram.add(p)
+        return mudaram
+
+    def fechar(self) -> None:
+        pass
+
+
+def preparar_pasta(pasta_entregas: str | Path, esquema: dict) -> dict:
+    """
+    Faz antes da entrega o trabalho caro sobre os arquivos de uma 1.ENTREGAS:
+    hashes (no CacheHashes da pasta), códigos de validação dos tokens e chaves de
+    revisão (no PreCalculo). Só nomes novos são validados; só arquivos alterados
+    são lidos de novo.
+    """
+    t0 = time.perf_counter()
+    entradas = list(arquivos(pasta_entregas, extensoes_ignoradas=EXTENSOES_IGNORADAS,
+                             nomes_ignorados=NOMES_IGNORADOS + _NOMES_PROPRIOS,
+                             prefixos_ignorados=PREFIXOS_IGNORADOS))
+    nomes = [e.name for e in entradas]
+    pre = precalculo_para_pasta(pasta_entregas)
+    pre.definir_regras(assinatura_esquema(esquema))
+    pre.podar(nomes)
+    novos = pre.faltantes(nomes)
+    if novos:
+        validador = compilar_nomenclatura(esquema)
+        for nome, cod in zip(novos, validador.validar_lote(novos)):
+            pre.registrar(nome, cod, entrega.chave_revisao(nome, validador))
+    pre.salvar()
+    hashes_por_caminho([Path(e.path) for e in entradas])
+    salvar_caches()
+    return {"pasta": str(pasta_entregas), "arquivos": len(entradas), "nomes_novos": len(novos),
+            "segundos": round(time.perf_counter() - t0, 4)}
+
+
+def pastas_de_entrega(projetos: dict[str, str]) -> dict[str, str]:
+    """pasta 1.ENTREGAS → número do projeto, para todas as disciplinas dos projetos."""
+    pastas = {}
+    for num, caminho in projetos.items():
+        pasta_disc = Path(caminho) / entrega.PASTA_DISCIPLINAS
+        try:
+            disciplinas = list(subpastas(pasta_disc))
+        except OSError:
+            logging.warning("Projeto %s sem pasta %s: %s", num, entrega.PASTA_DISCIPLINAS, caminho)
+            continue
+        for disc in disciplinas:
+            nome_ent = entrega.localizar_pasta_entregas(disc.path)
+            if nome_ent:
+                pastas[os.path.join(disc.path, nome_ent)] = str(num)
+    return pastas
+
+
+class VigiaEntregas:
+    """
+    Serviço opcional: vigia as pastas 1.ENTREGAS e, depois de VIGIA_DEBOUNCE_S sem
+    novos eventos numa pasta, chama preparar_pasta com as regras do projeto.
+
+    Usa inotify no Linux (pastas locais) e, se não der (outro SO, drive de rede,
+    limite de watches), cai para polling. Na entrega, telas e CLI encontram os
+    hashes e a validação já prontos.
+    """
+
+    def __init__(self, pastas: dict[str, str], debounce_s: float = VIGIA_DEBOUNCE_S,
+                 intervalo_s: float = VIGIA_INTERVALO_S, usar_inotify: Optional[bool] = None,
+                 ao_preparar: Optional[Callable[[dict], None]] = None):
+        self.pastas = {os.path.abspath(p): num for p, num in pastas.items()}
+        self.debounce_s = debounce_s
+        self.intervalo_s = intervalo_s
+        self._usar_inotify = sys.platform.startswith("linux") if usar_inotify is None else usar_inotify
+        self._ao_preparar = ao_preparar
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.fonte = None
+
+    def _abrir_fonte(self):
+        if self._usar_inotify:
+            try:
+                return FonteInotify(self.pastas)
+            except (OSError, AttributeError) as e:
+                logging.warning("inotify indisponível (%s); usando polling a cada %.0f s", e, self.intervalo_s)
+        return FontePolling(self.pastas, self.intervalo_s)
+
+    def preparar(self, pasta: str) -> Optional[dict]:
+        try:
+            res = preparar_pasta(pasta, entrega.carregar_regras_nomenclatura(self.pastas[pasta]))
+        except OSError as e:
+            logging.warning("Pré-cálculo de %s falhou: %s", pasta, e)
+            return None
+        logging.info("Pré-cálculo de %s: %d arquivos (%d nomes novos) em %.2f s",
+                     pasta, res["arquivos"], res["nomes_novos"], res["segundos"])
+        if self._ao_preparar:
+            self._ao_preparar(res)
+        return res
+
+    def rodar(self) -> None:
+        """Laço do vigia (bloqueia até parar()). Prepara todas as pastas ao iniciar."""
+        self.fonte = self._abrir_fonte()
+        # pasta → instante do último evento; só é preparada depois do silêncio do debounce
+        pendentes: dict[str, float] = dict.fromkeys(self.pastas, 0.0)
+        try:
+            while not self._parar.is_set():
+                agora = time.monotonic()
+                for pasta in [p for p, t in pendentes.items() if agora - t >= self.debounce_s]:
+                    del pendentes[pasta]
+                    self.preparar(pasta)
+                    if self._parar.is_set():
+                        return
+                espera = min((t + self.debounce_s - time.monotonic() for t in pendentes.values()), default=1.0)
+                for pasta in self.fonte.esperar(min(max(espera, 0.05), 1.0)):
+                    pendentes[pasta] = time.monotonic()
+        finally:
+            self.fonte.fechar()
+
+    def iniciar(self) -> "VigiaEntregas":
+        self._thread = threading.Thread(target=self.rodar, name="vigia-entregas", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self, timeout: Optional[float] = None) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)